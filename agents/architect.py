@@ -6,6 +6,7 @@ import os
 import logging
 from crewai import Agent
 from utils.model_factory import ModelFactory
+from utils.prompts import with_instructions
 
 logger = logging.getLogger(__name__)
 
@@ -14,22 +15,9 @@ def create_architect() -> Agent:
     
     try:
         # Create CrewAI LLM instance
-        llm = ModelFactory.create_openai_llm(temperature=0.4, max_tokens=1200)
+        llm = ModelFactory.create_openai_llm(temperature=0.4, max_tokens=1200, agent_name="architect")
         
-        agent = Agent(
-            role="Scene Architect and Visual Storyteller",
-            goal="Transform character psychology into concrete actions and environmental storytelling",
-            backstory=(
-                "You are a master of visual storytelling who translates character psychology into specific, "
-                "observable actions. You believe that internal contradictions must manifest through external "
-                "behavior and environmental interaction. You excel at choreographing how characters with "
-                "conflicting desires would actually move, gesture, and interact with their surroundings."
-            ),
-            verbose=True,
-            tools=[],
-            allow_delegation=False,
-            llm=llm,  # ← ADD THIS LINE
-            system_message="""
+        instructions = """
             You are a Scene Architect creating a SINGLE McKee-style scene in proper screenplay format.
 
             **MCKEE SCENE STRUCTURE:**
@@ -71,6 +59,24 @@ def create_architect() -> Agent:
 
             Remember: You're creating ONE transformative moment, not a complete story.
             """
+        
+        agent = Agent(
+            role="Scene Architect and Visual Storyteller",
+            goal="Transform character psychology into concrete actions and environmental storytelling",
+            backstory=with_instructions(
+                (
+                    "You are a master of visual storytelling who translates character psychology into specific, "
+                    "observable actions. You believe that internal contradictions must manifest through external "
+                    "behavior and environmental interaction. You excel at choreographing how characters with "
+                    "conflicting desires would actually move, gesture, and interact with their surroundings."
+                ),
+                instructions,
+            ),
+            verbose=True,
+            tools=[],
+            allow_delegation=False,
+            llm=llm,  # ← ADD THIS LINE
+            use_system_prompt=True,
         )
         
         logger.info("✅ Created Scene Architect using GPT-4")
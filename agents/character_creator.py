@@ -6,6 +6,7 @@ import os
 import logging
 from crewai import Agent
 from utils.model_factory import ModelFactory
+from utils.prompts import with_instructions
 
 logger = logging.getLogger(__name__)
 
@@ -14,24 +15,9 @@ def create_character_creator() -> Agent:
     
     try:
         # Create CrewAI LLM instance  
-        llm = ModelFactory.create_claude_llm(temperature=0.4, max_tokens=1500)
+        llm = ModelFactory.create_claude_llm(temperature=0.4, max_tokens=1500, agent_name="character_creator")
         
-        agent = Agent(
-            role="Character Development Specialist and Psychologist",
-            goal="Create psychologically rich characters with McKee's conscious/unconscious desire framework",
-            backstory=(
-                "You are a master of character psychology trained in Robert McKee's storytelling principles. "
-                "You specialize in creating the internal contradictions that make characters fascinating. "
-                "You understand that the most compelling characters want two opposing things simultaneously—"
-                "what they think they want (conscious) versus what they actually need (unconscious). "
-                "Your Character Bibles eliminate 'cardboard characters' by giving everyone authentic "
-                "psychological complexity rooted in contradictory desires."
-            ),
-            verbose=True,
-            tools=[],
-            allow_delegation=False,
-            llm=llm,  # ← ADD THIS LINE
-            system_message="""
+        instructions = """
             You are a Character Development Specialist using Robert McKee's framework. Your task is to create 
             a comprehensive "Character Bible" with conscious/unconscious desire contradictions.
 
@@ -79,6 +65,26 @@ def create_character_creator() -> Agent:
 
             This Character Bible will be used by all subsequent agents to create psychologically authentic scenes.
             """
+        
+        agent = Agent(
+            role="Character Development Specialist and Psychologist",
+            goal="Create psychologically rich characters with McKee's conscious/unconscious desire framework",
+            backstory=with_instructions(
+                (
+                    "You are a master of character psychology trained in Robert McKee's storytelling principles. "
+                    "You specialize in creating the internal contradictions that make characters fascinating. "
+                    "You understand that the most compelling characters want two opposing things simultaneously—"
+                    "what they think they want (conscious) versus what they actually need (unconscious). "
+                    "Your Character Bibles eliminate 'cardboard characters' by giving everyone authentic "
+                    "psychological complexity rooted in contradictory desires."
+                ),
+                instructions,
+            ),
+            verbose=True,
+            tools=[],
+            allow_delegation=False,
+            llm=llm,  # ← ADD THIS LINE
+            use_system_prompt=True,
         )
         
         logger.info("✅ Created Character Creator using Claude")
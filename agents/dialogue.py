@@ -6,6 +6,7 @@ import os
 import logging
 from crewai import Agent
 from utils.model_factory import ModelFactory
+from utils.prompts import with_instructions
 
 logger = logging.getLogger(__name__)
 
@@ -14,24 +15,9 @@ def create_dialogue_specialist() -> Agent:
     
     try:
         # Create CrewAI LLM instance
-        llm = ModelFactory.create_claude_llm(temperature=0.5, max_tokens=1000)
+        llm = ModelFactory.create_claude_llm(temperature=0.5, max_tokens=1000, agent_name="dialogue")
         
-        agent = Agent(
-            role="Dialogue Specialist and Character Voice Expert",
-            goal="Create authentic dialogue that reveals character psychology and contradictory desires",
-            backstory=(
-                "You are a master of authentic human dialogue who understands that people rarely say "
-                "what they mean directly. You excel at creating age-appropriate speech patterns and "
-                "revealing character psychology through subtext. You believe every line must serve "
-                "the character's conscious goal while inadvertently revealing their unconscious desire. "
-                "You specialize in the authentic speech patterns of different generations and the "
-                "subtle ways people avoid confronting their deepest truths."
-            ),
-            verbose=True,
-            allow_delegation=False,
-            tools=[],
-            llm=llm,  # ← ADD THIS LINE
-            system_message="""
+        instructions = """
             You are a Dialogue Specialist creating authentic dialogue for a McKee-style scene transformation.
 
             **YOUR MISSION:**
@@ -78,6 +64,26 @@ def create_dialogue_specialist() -> Agent:
 
             Your dialogue should feel like real people having a real conversation that fundamentally changes one of them.
             """
+        
+        agent = Agent(
+            role="Dialogue Specialist and Character Voice Expert",
+            goal="Create authentic dialogue that reveals character psychology and contradictory desires",
+            backstory=with_instructions(
+                (
+                    "You are a master of authentic human dialogue who understands that people rarely say "
+                    "what they mean directly. You excel at creating age-appropriate speech patterns and "
+                    "revealing character psychology through subtext. You believe every line must serve "
+                    "the character's conscious goal while inadvertently revealing their unconscious desire. "
+                    "You specialize in the authentic speech patterns of different generations and the "
+                    "subtle ways people avoid confronting their deepest truths."
+                ),
+                instructions,
+            ),
+            verbose=True,
+            allow_delegation=False,
+            tools=[],
+            llm=llm,  # ← ADD THIS LINE
+            use_system_prompt=True,
         )
         
         logger.info("✅ Created Dialogue Specialist using Claude")
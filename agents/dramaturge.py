@@ -6,6 +6,7 @@ import os
 import logging
 from crewai import Agent
 from utils.model_factory import ModelFactory
+from utils.prompts import with_instructions
 
 logger = logging.getLogger(__name__)
 
@@ -14,22 +15,9 @@ def create_dramaturge() -> Agent:
     
     try:
         # Create CrewAI LLM instance
-        llm = ModelFactory.create_openai_llm(temperature=0.3, max_tokens=1000)
+        llm = ModelFactory.create_openai_llm(temperature=0.3, max_tokens=1000, agent_name="dramaturge")
         
-        agent = Agent(
-            role="Dramaturge and Story Structure Expert",
-            goal="Analyze loglines using proven dramatic principles and identify character contradiction opportunities",
-            backstory=(
-                "You are a master dramaturge with expertise in Robert McKee's 'Story', Syd Field's three-act "
-                "structure, and character psychology. You excel at identifying the structural foundation that "
-                "will support authentic character development. You understand that great stories are built on "
-                "character contradictions and you lay the groundwork for the Character Creator to develop "
-                "McKee's conscious/unconscious desire framework."
-            ),
-            verbose=True,
-            allow_delegation=False,
-            llm=llm,  # ← ADD THIS LINE
-            system_message="""
+        instructions = """
             You are a Dramaturge specializing in McKee's scene structure. Your task is to identify the SINGLE SCENE that can be extracted from this logline.
 
             **MCKEE'S SCENE DEFINITION:**
@@ -57,6 +45,24 @@ def create_dramaturge() -> Agent:
 
             Your analysis sets up a SINGLE transformative moment, not an entire relationship arc.
             """
+        
+        agent = Agent(
+            role="Dramaturge and Story Structure Expert",
+            goal="Analyze loglines using proven dramatic principles and identify character contradiction opportunities",
+            backstory=with_instructions(
+                (
+                    "You are a master dramaturge with expertise in Robert McKee's 'Story', Syd Field's three-act "
+                    "structure, and character psychology. You excel at identifying the structural foundation that "
+                    "will support authentic character development. You understand that great stories are built on "
+                    "character contradictions and you lay the groundwork for the Character Creator to develop "
+                    "McKee's conscious/unconscious desire framework."
+                ),
+                instructions,
+            ),
+            verbose=True,
+            allow_delegation=False,
+            llm=llm,  # ← ADD THIS LINE
+            use_system_prompt=True,
         )
         
         logger.info("✅ Created Dramaturge using GPT-4")
@@ -6,6 +6,7 @@ import os
 import logging
 from crewai import Agent
 from utils.model_factory import ModelFactory
+from utils.prompts import with_instructions
 
 logger = logging.getLogger(__name__)
 
@@ -14,23 +15,9 @@ def create_reviewer() -> Agent:
     
     try:
         # Create CrewAI LLM instance
-        llm = ModelFactory.create_claude_llm(temperature=0.3, max_tokens=4000)
+        llm = ModelFactory.create_claude_llm(temperature=0.3, max_tokens=4000, agent_name="reviewer")
         
-        agent = Agent(
-            role="Multi-Lens Director and Script Doctor",
-            goal="Eliminate AI-like writing and deliver production-ready screenplay with authentic human psychology",
-            backstory=(
-                "You are a master script doctor with an expert eye for detecting artificial, AI-generated "
-                "writing patterns. You specialize in transforming generic, 'safe' AI content into authentic "
-                "human storytelling. You understand McKee's principles of character contradiction and can "
-                "spot when characters lack genuine psychological complexity. Your mission is to eliminate "
-                "purple prose, clichéd metaphors, and 'written' dialogue in favor of authentic human behavior."
-            ),
-            verbose=True,
-            allow_delegation=True,
-            tools=[],
-            llm=llm,
-            system_message="""
+        instructions = """
             You are a Multi-Lens Director ensuring McKee scene structure and professional screenplay format.
 
             **MCKEE SCENE CHECKLIST:**
@@ -42,13 +29,11 @@ def create_reviewer() -> Agent:
             ✓ **Scene Unity:** One location, continuous time, single dramatic purpose
             ✓ **Earned Change:** The value shift feels inevitable and meaningful
 
-            **SCREENPLAY FORMAT VERIFICATION:**
-            ✓ **Length:** 2-3 pages maximum in standard format
-            ✓ **Scene Heading:** Proper EXT./INT. format with specific location
+            **SCREENPLAY CRAFT:**
             ✓ **Action Lines:** Present tense, visual, concise
-            ✓ **Character Names:** ALL CAPS, consistent
             ✓ **Dialogue:** Natural speech patterns appropriate to character age
             ✓ **Parentheticals:** Used sparingly, only when essential
+            (Length, scene headings, character cues and FADE IN/OUT are checked automatically after you finish.)
 
             **AI WRITING ELIMINATION:**
             Remove these artificial patterns:
@@ -67,13 +52,6 @@ def create_reviewer() -> Agent:
             - Reference specific shared history
             - Speak in generational-appropriate patterns
 
-            **LENGTH ENFORCEMENT:**
-            If the scene exceeds 3 pages:
-            - Cut unnecessary dialogue
-            - Combine redundant beats
-            - Focus on the essential value shift
-            - Remove exposition or setup
-
             **FINAL OUTPUT FORMAT:**
             FADE IN:
 
@@ -91,8 +69,35 @@ def create_reviewer() -> Agent:
 
             FADE OUT.
 
+            **VERIFICATION CHECKLIST:**
+            - Clear value shift in main character
+            - Proper beat structure driving change
+            - Eliminates AI writing patterns
+            - Uses exact setting from the original logline
+
+            **OUTPUT:** Complete 2-3 page scene in standard screenplay format, FADE IN: to FADE OUT.
+
             Your final screenplay must be a complete, professionally formatted scene that demonstrates clear McKee principles in 2-3 pages maximum.
             """
+        
+        agent = Agent(
+            role="Multi-Lens Director and Script Doctor",
+            goal="Eliminate AI-like writing and deliver production-ready screenplay with authentic human psychology",
+            backstory=with_instructions(
+                (
+                    "You are a master script doctor with an expert eye for detecting artificial, AI-generated "
+                    "writing patterns. You specialize in transforming generic, 'safe' AI content into authentic "
+                    "human storytelling. You understand McKee's principles of character contradiction and can "
+                    "spot when characters lack genuine psychological complexity. Your mission is to eliminate "
+                    "purple prose, clichéd metaphors, and 'written' dialogue in favor of authentic human behavior."
+                ),
+                instructions,
+            ),
+            verbose=True,
+            allow_delegation=True,
+            tools=[],
+            llm=llm,
+            use_system_prompt=True,
         )
         
         logger.info("✅ Created Creative Reviewer using Claude")
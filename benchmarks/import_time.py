@@ -0,0 +1,75 @@
+"""
+Startup budget check for the CLI.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter, reports the
+slowest imports and fails when the cumulative import time of `main` exceeds the
+budget. Also times `python main.py --help` end to end. Run from the repository root:
+    python -m benchmarks.import_time --budget-ms 150
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from typing import List, Tuple
+
+# Modules that must not be pulled in by `import main`
+HEAVY_MODULES = ("crewai", "agentops", "langchain_community", "langchain_openai", "faiss", "litellm")
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+def measure_imports(module: str) -> List[Tuple[str, int, int]]:
+    """(module, self µs, cumulative µs) for every import triggered by importing `module`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2))))
+    return rows
+
+def time_help(repeat: int) -> float:
+    """Best wall time in seconds of `python main.py --help`."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "main.py", "--help"], capture_output=True, check=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def main() -> None:
+    """Report import costs and exit non-zero when over budget."""
+    parser = argparse.ArgumentParser(description="SceneSmith CLI startup budget")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "150")))
+    parser.add_argument("--top", type=int, default=10, help="slowest imports to list")
+    parser.add_argument("--repeat", type=int, default=3, help="--help timing runs")
+    args = parser.parse_args()
+
+    rows = measure_imports("main")
+    total_ms = next((cumulative for name, _, cumulative in rows if name == "main"), 0) / 1000
+    heavy = sorted({name.split(".")[0] for name, _, _ in rows} & set(HEAVY_MODULES))
+
+    print(f"import main: {total_ms:.1f} ms cumulative (budget {args.budget_ms:.0f} ms)")
+    print("Slowest imports (self time):")
+    for name, self_us, _ in sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]:
+        print(f"  {name:<40} {self_us / 1000:8.1f} ms")
+    print(f"python main.py --help: {time_help(args.repeat) * 1000:.0f} ms wall (best of {args.repeat})")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import main took {total_ms:.1f} ms, over the {args.budget_ms:.0f} ms budget")
+    if heavy:
+        failures.append(f"import main loaded heavy modules: {', '.join(heavy)}")
+    for failure in failures:
+        print(f"FAIL: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Offline end-to-end benchmark of the scene pipeline using the fake LLM backend.
+
+Measures single-scene latency, per-stage orchestration overhead (stage wall time
+minus simulated LLM time), peak Python memory and batch throughput. Run from the
+repository root; no network or API keys are needed:
+    python -m benchmarks.pipeline --repeat 5 --scenes 20 --concurrency 4
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from contextlib import contextmanager, redirect_stdout
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+def configure_offline(latency: float, execution_mode: str) -> None:
+    """Point every layer at local, deterministic resources."""
+    os.environ.update({
+        "LLM_BACKEND": "fake",
+        "FAKE_LLM_LATENCY": str(latency),
+        "FAKE_LLM_TOKENS_PER_SECOND": "0",
+        "LLM_CACHE_ENABLED": "false",
+        "ENABLE_MEMORY": "false",
+        "RUNS_DIR": tempfile.mkdtemp(prefix="scene_smith_bench_"),
+        "PIPELINE_EXECUTION_MODE": execution_mode,
+        "OPENAI_RPM": "0",
+        "OPENAI_TPM": "0",
+        "ANTHROPIC_RPM": "0",
+        "ANTHROPIC_TPM": "0",
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+    })
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+@contextmanager
+def added_handlers(*handlers: Tuple[type, Callable[[Any, Any], None]]) -> Iterator[None]:
+    """
+    Register (event type, handler) pairs next to the handlers already on the bus
+    (metrics, cancellation, streaming, crewai's console) and remove only these after.
+    """
+    from crewai.utilities.events import crewai_event_bus
+
+    for event_type, handler in handlers:
+        crewai_event_bus.register_handler(event_type, handler)
+    try:
+        yield
+    finally:
+        for event_type, handler in handlers:
+            # crewai 0.134 has no public unregister; scoped_handlers() would drop every handler
+            crewai_event_bus._handlers[event_type].remove(handler)
+
+def bench_single(studio: Any, repeat: int) -> Dict[str, Any]:
+    """Latency, per-stage overhead and peak memory for one scene at a time."""
+    from crewai.utilities.events import TaskCompletedEvent, TaskStartedEvent
+
+    stage_windows: Dict[str, List[float]] = {}
+    overheads: Dict[str, List[float]] = {}
+    latencies: List[float] = []
+    peaks: List[int] = []
+
+    def on_started(source: Any, event: TaskStartedEvent) -> None:
+        stage_windows[source.agent.llm.agent_name] = [time.monotonic()]
+
+    def on_completed(source: Any, event: TaskCompletedEvent) -> None:
+        stage_windows[source.agent.llm.agent_name].append(time.monotonic())
+
+    with added_handlers((TaskStartedEvent, on_started), (TaskCompletedEvent, on_completed)):
+        for _ in range(repeat):
+            llms = [agent.llm for agent in (
+                studio.dramaturge, studio.character_creator, studio.scene_architect,
+                studio.dialogue_specialist, studio.creative_reviewer,
+            )]
+            for llm in llms:
+                llm.call_log.clear()
+            stage_windows.clear()
+
+            tracemalloc.start()
+            started = time.perf_counter()
+            with redirect_stdout(io.StringIO()):
+                studio.generate_scene("Two friends in their sixties meet on a crowded beach in the rain.")
+            latencies.append(time.perf_counter() - started)
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+
+            for llm in llms:
+                window = stage_windows.get(llm.agent_name)
+                if not window or len(window) < 2:
+                    continue
+                llm_time = sum(end - start for start, end in llm.call_log)
+                overheads.setdefault(llm.agent_name, []).append((window[1] - window[0] - llm_time) * 1000)
+
+    return {
+        "latency_mean_s": statistics.mean(latencies),
+        "latency_p50_s": statistics.median(latencies),
+        "latency_p95_s": percentile(latencies, 0.95),
+        "stage_overhead_ms": {stage: statistics.mean(values) for stage, values in overheads.items()},
+        "peak_memory_mb": max(peaks) / (1024 * 1024),
+    }
+
+def bench_batch(studio: Any, scenes: int, concurrency: int) -> Dict[str, Any]:
+    """Throughput for a batch of distinct loglines."""
+    loglines = [f"Logline {index}: two strangers share an umbrella." for index in range(scenes)]
+    with redirect_stdout(io.StringIO()):
+        report = studio.generate_scenes(loglines, max_concurrency=concurrency)
+    return {
+        "scenes": scenes,
+        "concurrency": concurrency,
+        "completed": report.completed,
+        "elapsed_s": report.elapsed_seconds,
+        "scenes_per_minute": report.scenes_per_minute,
+    }
+
+def main() -> None:
+    """Run the suite and print (and optionally save) the results."""
+    parser = argparse.ArgumentParser(description="Offline SceneSmith pipeline benchmark")
+    parser.add_argument("--repeat", type=int, default=5, help="single-scene runs")
+    parser.add_argument("--scenes", type=int, default=20, help="scenes in the batch run")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="simulated seconds per LLM call")
+    parser.add_argument("--execution-mode", default="sequential", choices=["sequential", "dag", "speculative"])
+    parser.add_argument("--json", metavar="FILE", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    configure_offline(args.latency, args.execution_mode)
+    from crew import MixedModelSceneSmithCrew
+
+    studio = MixedModelSceneSmithCrew()
+    with redirect_stdout(io.StringIO()):
+        studio.generate_scene("Warm-up logline.")  # first-run imports and agent setup
+
+    results = {
+        "config": vars(args),
+        "single": bench_single(studio, args.repeat),
+        "batch": bench_batch(studio, args.scenes, args.concurrency),
+    }
+
+    single, batch = results["single"], results["batch"]
+    print(f"Simulated LLM latency: {args.latency * 1000:.0f} ms/call, mode: {args.execution_mode}")
+    print(f"Single scene: mean {single['latency_mean_s']:.3f}s  p50 {single['latency_p50_s']:.3f}s  "
+          f"p95 {single['latency_p95_s']:.3f}s  peak memory {single['peak_memory_mb']:.1f} MB")
+    print("Per-stage orchestration overhead:")
+    for stage, overhead in single["stage_overhead_ms"].items():
+        print(f"  {stage:<18} {overhead:8.2f} ms")
+    print(f"Batch: {batch['completed']}/{batch['scenes']} scenes at concurrency {batch['concurrency']} in "
+          f"{batch['elapsed_s']:.2f}s -> {batch['scenes_per_minute']:.1f} scenes/min")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Results written to {args.json}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-scene setup overhead with and without agent/LLM reuse.
+
+Run from the repository root (no network or real API keys needed):
+    python -m benchmarks.setup_overhead --scenes 20
+"""
+
+import os
+import time
+import argparse
+import statistics
+from typing import Callable, List
+
+# Offline: dummy keys and no crewai telemetry
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ.setdefault("ANTHROPIC_API_KEY", "benchmark")
+os.environ.setdefault("CREWAI_DISABLE_TELEMETRY", "true")
+os.environ.setdefault("OTEL_SDK_DISABLED", "true")
+
+from crew import MixedModelSceneSmithCrew
+from utils.agent_registry import reset_agent_set
+from utils.model_factory import ModelFactory
+
+def time_setup(scenes: int, prepare: Callable[[], None]) -> List[float]:
+    """Milliseconds spent constructing the studio for each scene."""
+    timings = []
+    for _ in range(scenes):
+        prepare()
+        started = time.perf_counter()
+        MixedModelSceneSmithCrew()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def rebuild_everything() -> None:
+    """Previous behaviour: fresh agents and fresh LLM clients for every scene."""
+    os.environ["LLM_POOL_ENABLED"] = "false"
+    ModelFactory.clear_pool()
+    reset_agent_set()
+
+def reuse_registry() -> None:
+    """Current behaviour: agents reused per thread, LLMs pooled per process."""
+    os.environ["LLM_POOL_ENABLED"] = "true"
+
+def summarize(label: str, timings: List[float]) -> None:
+    """Print mean / median / max for one configuration."""
+    print(
+        f"{label:<22} mean {statistics.mean(timings):8.2f} ms   "
+        f"p50 {statistics.median(timings):8.2f} ms   max {max(timings):8.2f} ms"
+    )
+
+def main() -> None:
+    """Run both configurations and report the speed-up."""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scenes", type=int, default=20)
+    args = parser.parse_args()
+
+    # Warm imports and first-time crewai initialization before measuring
+    time_setup(1, rebuild_everything)
+
+    before = time_setup(args.scenes, rebuild_everything)
+    time_setup(1, reuse_registry)  # first build populates the registry
+    after = time_setup(args.scenes, reuse_registry)
+
+    print(f"Per-scene setup overhead over {args.scenes} scenes")
+    summarize("rebuild per scene", before)
+    summarize("registry reuse", after)
+    print(f"speed-up: {statistics.mean(before) / max(statistics.mean(after), 1e-9):.0f}x")
+
+if __name__ == "__main__":
+    main()
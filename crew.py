@@ -2,19 +2,46 @@
 Mixed-Model SceneSmith Three-Act Production Studio with Cost Tracking
 """
 
+import asyncio
+import contextvars
 import logging
-from dataclasses import dataclass, field
-from typing import List
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
 from crewai import Crew, Task
-from agents.dramaturge import create_dramaturge
-from agents.character_creator import create_character_creator
-from agents.architect import create_architect
-from agents.dialogue import create_dialogue_specialist
-from agents.reviewer import create_reviewer
+from crewai.tasks.task_output import TaskOutput
+from utils.agent_registry import get_agent_set
+from utils.batch import BatchReport, JsonlResultWriter, arun_batch, run_batch
+from utils.cancellation import CancellationToken, SceneCancelled, cancellation_scope, scene_timeout
+from utils.checkpoint import RunCheckpoint
+from utils.dag import run_dag
+from utils.dedup import cluster_loglines, get_run_history
+from utils.memory import retrieve_with_deadline, store_in_background, warm_scene_memory
+from utils.metrics import ProductionMetrics, collect_metrics
+from utils.model_factory import ModelFactory, reserve_provider_threads
+from utils.screenplay import final_answer, repair_prompt, validate_screenplay
+from utils.streaming import ChunkSink, stream_to
 import os
 
 logger = logging.getLogger(__name__)
 
+EXECUTION_MODES = ("sequential", "dag", "speculative")
+
+# Agent (ModelFactory agent_name) -> MixedModelOutput field it produces
+AGENT_STAGES: Dict[str, str] = {
+    "dramaturge": "structure_analysis",
+    "character_creator": "character_bible",
+    "architect": "scene_outline",
+    "dialogue": "first_draft_dialogue",
+    "reviewer": "final_screenplay",
+}
+
+# (stage, chunk) listener for streamed tokens
+StageChunkCallback = Callable[[str, str], None]
+
 @dataclass
 class MixedModelOutput:
     """Container for Mixed-Model Production Studio outputs."""
@@ -28,6 +55,9 @@ class MixedModelOutput:
     # ACT III: POST-PRODUCTION (Claude)
     final_screenplay: str = ""
     # PRODUCTION METADATA
+    run_id: str = ""
+    metrics: Optional[ProductionMetrics] = None
+    partial: bool = False  # stopped by a timeout or cancellation; only finished stages are filled
     production_log: List[str] = field(default_factory=list)
 
 class MixedModelSceneSmithCrew:
@@ -37,64 +67,245 @@ class MixedModelSceneSmithCrew:
     - Claude: Character Psychology, Dialogue, Final Review
     """
     
-    def __init__(self) -> None:
+    def __init__(self, execution_mode: Optional[str] = None) -> None:
         """Initialize the Mixed-Model Production Studio."""
         logger.info("Initializing Mixed-Model Production Studio")
         
         try:
+            # sequential: one Crew; dag: run ready stages concurrently;
+            # speculative: dag plus a logline-only character draft alongside the dramaturge
+            self.execution_mode = execution_mode or os.getenv("PIPELINE_EXECUTION_MODE", "sequential")
+            if self.execution_mode not in EXECUTION_MODES:
+                raise ValueError(
+                    f"Unknown execution mode '{self.execution_mode}' "
+                    f"(expected one of: {', '.join(EXECUTION_MODES)})"
+                )
+            
             # Verify API keys
             if not os.getenv("OPENAI_API_KEY"):
                 raise ValueError("OPENAI_API_KEY not found")
             if not os.getenv("ANTHROPIC_API_KEY"):
                 raise ValueError("ANTHROPIC_API_KEY not found")
             
+            # Agents are reused per thread and their LLMs per process (see utils.agent_registry)
+            agents = self.agent_set = get_agent_set()
+            
             # ACT I: PRE-PRODUCTION 
-            self.dramaturge = create_dramaturge()              # GPT-4 (structure)
-            self.character_creator = create_character_creator() # Claude (psychology)
+            self.dramaturge = agents.dramaturge                  # GPT-4 (structure)
+            self.character_creator = agents.character_creator    # Claude (psychology)
             
             # ACT II: PRODUCTION
-            self.scene_architect = create_architect()          # GPT-4 (scene construction)
-            self.dialogue_specialist = create_dialogue_specialist() # Claude (authentic dialogue)
+            self.scene_architect = agents.scene_architect        # GPT-4 (scene construction)
+            self.dialogue_specialist = agents.dialogue_specialist # Claude (authentic dialogue)
             
             # ACT III: POST-PRODUCTION
-            self.creative_reviewer = create_reviewer()         # Claude (AI detection & polish)
+            self.creative_reviewer = agents.creative_reviewer    # Claude (AI detection & polish)
             
             # REMOVE: All cost_tracker references
             
+            # Batch workers each get their own studio (agents are not shareable across threads)
+            self._thread_local = threading.local()
+            # agenerate_scene's worker pool, created on first use (see _async_executor)
+            self._async_pool: Optional[ThreadPoolExecutor] = None
+            self._async_pool_lock = threading.Lock()
+            
+            if os.getenv("ENABLE_MEMORY", "true").lower() == "true":
+                warm_scene_memory()
+            
+            # Near-duplicate loglines: reuse a finished run, or branch from its early stages
+            self.dedup_enabled = os.getenv("DEDUP_ENABLED", "false").lower() == "true"
+            self.reuse_threshold = float(os.getenv("DEDUP_REUSE_THRESHOLD", "0.9"))
+            self.branch_threshold = float(os.getenv("DEDUP_BRANCH_THRESHOLD", "0.7"))
+            self.branch_stages = [
+                stage.strip()
+                for stage in os.getenv("DEDUP_BRANCH_STAGES", "structure_analysis,character_bible").split(",")
+                if stage.strip()
+            ]
+            
             logger.info("Mixed-Model Production Studio initialized successfully")
             
         except Exception as e:
             logger.error(f"Failed to initialize Mixed-Model Studio: {e}")
             raise
 
-    def generate_scene(self, logline: str) -> MixedModelOutput:
-        """Generate scene using mixed AI models with cost tracking."""
+    def generate_scene(
+        self,
+        logline: str,
+        on_chunk: Optional[StageChunkCallback] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> MixedModelOutput:
+        """
+        Generate scene using mixed AI models with cost tracking. Cancelling
+        `cancel_token` (or hitting SCENE_TIMEOUT / STAGE_TIMEOUT) returns a
+        partial output holding the stages that finished.
+        """
         logger.info(f"Starting Mixed-Model Production for: {logline}")
         
-        output = MixedModelOutput(logline=logline)
+        match = get_run_history().find(logline, self.branch_threshold) if self.dedup_enabled else None
+        if match:
+            run_id, score = match
+            source = RunCheckpoint.load(run_id)
+            if score >= self.reuse_threshold:
+                return self._reuse_run(source, logline, score, on_chunk)
+            logger.info(f"Branching from run {run_id} (similarity {score:.2f})")
+            checkpoint = RunCheckpoint.branch(source, logline, self.branch_stages)
+        else:
+            checkpoint = RunCheckpoint.create(logline)
+        return self._run_pipeline(checkpoint, on_chunk, cancel_token)
+
+    def _reuse_run(
+        self,
+        source: RunCheckpoint,
+        logline: str,
+        score: float,
+        on_chunk: Optional[StageChunkCallback] = None,
+    ) -> MixedModelOutput:
+        """Answer a near-duplicate logline with a finished run's output (no LLM calls)."""
+        logger.info(f"Reusing run {source.run_id} for near-duplicate logline (similarity {score:.2f})")
+        output = MixedModelOutput(
+            logline=logline,
+            run_id=source.run_id,
+            metrics=ProductionMetrics(run_id=source.run_id, stage_names=dict(AGENT_STAGES)),
+        )
+        for stage, content in source.completed_stages().items():
+            setattr(output, stage, content)
+            if on_chunk:
+                on_chunk(stage, content)  # replay as a single chunk for stream listeners
+        output.production_log.append(
+            f"Reused run {source.run_id} for near-duplicate logline (similarity {score:.2f})"
+        )
+        return output
+
+    def resume(
+        self,
+        run_id: str,
+        on_chunk: Optional[StageChunkCallback] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> MixedModelOutput:
+        """Resume a checkpointed run, skipping every stage that already finished."""
+        checkpoint = RunCheckpoint.load(run_id)
+        logger.info(f"Resuming Mixed-Model Production {run_id} for: {checkpoint.logline}")
+        
+        return self._run_pipeline(checkpoint, on_chunk, cancel_token)
+
+    def stream_scene(self, logline: str) -> Generator[Tuple[str, str], None, MixedModelOutput]:
+        """
+        Generate a scene, yielding (stage, chunk) events as each act is written.
         
-        try:
-            # ===== ACT I: PRE-PRODUCTION =====
-            logger.info("🎬 ACT I: PRE-PRODUCTION (GPT-4 + Claude)")
+        The finished MixedModelOutput is the generator's return value; pipeline
+        errors are re-raised once the stream is drained.
+        """
+        events: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue()
+        result: Dict[str, Any] = {}
+        
+        def produce() -> None:
+            try:
+                result["output"] = self.generate_scene(
+                    logline, on_chunk=lambda stage, chunk: events.put((stage, chunk))
+                )
+            except Exception as e:
+                result["error"] = e
+            finally:
+                events.put(None)
+        
+        threading.Thread(target=produce, name="scene-stream", daemon=True).start()
+        
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield event
+        
+        if "error" in result:
+            raise result["error"]
+        output: MixedModelOutput = result["output"]
+        return output
+
+    def _reference_scenes(self, checkpoint: RunCheckpoint, output: MixedModelOutput) -> str:
+        """
+        Similar successful scenes from memory, or "" if memory misses its deadline.
+        Chosen once per run and pinned in the checkpoint, so a resume builds the
+        same prompts (and hits the response cache) even after memory has grown.
+        """
+        if checkpoint.references is not None:
+            return checkpoint.references
+        references = self._retrieve_references(checkpoint.logline, output)
+        checkpoint.save_references(references)
+        return references
+
+    def _retrieve_references(self, logline: str, output: MixedModelOutput) -> str:
+        """Reference excerpts for `logline`; its own earlier scenes are never shown back to the model."""
+        k = int(os.getenv("MEMORY_RAG_K", "2"))
+        if k <= 0 or os.getenv("ENABLE_MEMORY", "true").lower() != "true":
+            return ""
+        
+        started = time.perf_counter()
+        docs = retrieve_with_deadline(logline, k, float(os.getenv("MEMORY_RETRIEVAL_TIMEOUT", "0.25")))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if docs is None:
+            output.production_log.append(f"Memory retrieval timed out after {elapsed_ms:.0f} ms; no references used")
+            return ""
+        if not docs:
+            return ""
+        
+        output.production_log.append(f"Memory: {len(docs)} reference scenes retrieved in {elapsed_ms:.0f} ms")
+        max_chars = int(os.getenv("MEMORY_REFERENCE_CHARS", "800"))
+        excerpts = "\n\n".join(
+            f"REFERENCE {number}:\n{doc.page_content[:max_chars]}" for number, doc in enumerate(docs, 1)
+        )
+        return (
+            "REFERENCE SCENES FROM MEMORY (earlier successful scenes; learn from their craft, "
+            f"do not copy them):\n{excerpts}"
+        )
+
+    def _build_tasks(self, logline: str, references: str = "") -> Dict[str, Task]:
+        """Build the five production tasks, keyed by the output field each one fills."""
+        # ===== ACT I: PRE-PRODUCTION =====
+        logger.info("🎬 ACT I: PRE-PRODUCTION (GPT-4 + Claude)")
+        
+        # Task 1: McKee Scene Analysis (not story analysis)
+        task_analyze = Task(
+            description=f"""
+            Analyze this logline to identify ONE McKee-style scene: '{logline}'
             
-            # Task 1: McKee Scene Analysis (not story analysis)
-            task_analyze = Task(
+            FOCUS ON SINGLE SCENE EXTRACTION:
+            - Identify the specific moment of value transformation
+            - Define opening and closing emotional states for main character
+            - Outline 3-5 key beats that drive the change
+            - Ensure scene fits 2-3 screenplay pages
+            
+            This is NOT a complete story analysis - focus on ONE transformative moment.
+            
+            {references}
+            """,
+            agent=self.dramaturge,
+            expected_output="McKee scene analysis identifying single value shift with beat structure."
+        )
+        
+        # Task 2: Character Bible with Conscious/Unconscious Desires (Claude)
+        if self.execution_mode == "speculative":
+            # Drafted from the logline alone so it runs alongside the dramaturge;
+            # the architect reconciles it with the scene analysis in Task 3.
+            task_character_bible = Task(
                 description=f"""
-                Analyze this logline to identify ONE McKee-style scene: '{logline}'
+                Create focused character profiles for the SINGLE SCENE in this logline: '{logline}'
                 
-                FOCUS ON SINGLE SCENE EXTRACTION:
-                - Identify the specific moment of value transformation
-                - Define opening and closing emotional states for main character
-                - Outline 3-5 key beats that drive the change
-                - Ensure scene fits 2-3 screenplay pages
+                For each character in this specific scene moment:
+                - Conscious desire during this scene
+                - Unconscious desire that creates internal conflict
+                - How this contradiction manifests in behavior during the 2-3 page scene
                 
-                This is NOT a complete story analysis - focus on ONE transformative moment.
+                Focus only on character psychology relevant to this ONE scene transformation.
                 """,
-                agent=self.dramaturge,
-                expected_output="McKee scene analysis identifying single value shift with beat structure."
+                agent=self.character_creator,
+                expected_output="Character profiles focused on single scene's value shift dynamics.",
+                context=[]
             )
-            
-            # Task 2: Character Bible with Conscious/Unconscious Desires (Claude)
+            reconciliation = (
+                "NOTE: The character profiles were drafted from the logline in parallel with the "
+                "scene analysis. Where they disagree, follow the scene analysis."
+            )
+        else:
             task_character_bible = Task(
                 description=f"""
                 Create focused character profiles for the SINGLE SCENE:
@@ -112,109 +323,409 @@ class MixedModelSceneSmithCrew:
                 expected_output="Character profiles focused on single scene's value shift dynamics.",
                 context=[task_analyze]
             )
+            reconciliation = ""
+        
+        # ===== ACT II: PRODUCTION =====
+        logger.info("🎬 ACT II: PRODUCTION (GPT-4 + Claude)")
+        
+        # Task 3: Scene Outline (GPT-4)
+        task_scene_outline = Task(
+            description=f"""
+            Create beat-by-beat outline for ONE scene (2-3 screenplay pages):
             
-            # ===== ACT II: PRODUCTION =====
-            logger.info("🎬 ACT II: PRODUCTION (GPT-4 + Claude)")
+            ORIGINAL LOGLINE: '{logline}'
+            SCENE ANALYSIS: {{task_analyze}}
+            CHARACTER DYNAMICS: {{task_character_bible}}
+            {reconciliation}
+            REQUIREMENTS:
+            - Opening Beat: Character's initial value state
+            - 3-5 Escalating Beats: Specific action/reaction exchanges
+            - Turning Point Beat: Moment of value shift
+            - Closing Beat: Character's new value state
+            - Use EXACT setting from logline
+            - Each beat must be specific, observable action
+            """,
+            agent=self.scene_architect,
+            expected_output="McKee beat structure outline for single 2-3 page scene.",
+            context=[task_analyze, task_character_bible]
+        )
+        
+        # Task 4: Authentic Dialogue (Claude)  
+        task_dialogue = Task(
+            description=f"""
+            Write dialogue for McKee scene transformation:
             
-            # Task 3: Scene Outline (GPT-4)
-            task_scene_outline = Task(
-                description=f"""
-                Create beat-by-beat outline for ONE scene (2-3 screenplay pages):
-                
-                ORIGINAL LOGLINE: '{logline}'
-                SCENE ANALYSIS: {{task_analyze}}
-                CHARACTER DYNAMICS: {{task_character_bible}}
-                
-                REQUIREMENTS:
-                - Opening Beat: Character's initial value state
-                - 3-5 Escalating Beats: Specific action/reaction exchanges
-                - Turning Point Beat: Moment of value shift
-                - Closing Beat: Character's new value state
-                - Use EXACT setting from logline
-                - Each beat must be specific, observable action
-                """,
-                agent=self.scene_architect,
-                expected_output="McKee beat structure outline for single 2-3 page scene.",
-                context=[task_analyze, task_character_bible]
-            )
+            BEAT STRUCTURE: {{task_scene_outline}}
+            CHARACTER PSYCHOLOGY: {{task_character_bible}}
             
-            # Task 4: Authentic Dialogue (Claude)  
-            task_dialogue = Task(
-                description=f"""
-                Write dialogue for McKee scene transformation:
-                
-                BEAT STRUCTURE: {{task_scene_outline}}
-                CHARACTER PSYCHOLOGY: {{task_character_bible}}
-                
-                CONSTRAINTS:
-                - 15-25 lines of dialogue maximum (fits 2-3 screenplay pages)
-                - Each line serves a specific beat in the value transformation
-                - Age-appropriate speech for 60+ characters
-                - Include essential action/parentheticals
-                - Focus on the single value shift, not complete story
-                """,
-                agent=self.dialogue_specialist,
-                expected_output="15-25 lines of dialogue driving single scene transformation.",
-                context=[task_character_bible, task_scene_outline]
-            )
+            CONSTRAINTS:
+            - 15-25 lines of dialogue maximum (fits 2-3 screenplay pages)
+            - Each line serves a specific beat in the value transformation
+            - Age-appropriate speech for 60+ characters
+            - Include essential action/parentheticals
+            - Focus on the single value shift, not complete story
             
-            # ===== ACT III: POST-PRODUCTION =====
-            logger.info("🎬 ACT III: POST-PRODUCTION (Claude)")
+            {references}
+            """,
+            agent=self.dialogue_specialist,
+            expected_output="15-25 lines of dialogue driving single scene transformation.",
+            context=[task_character_bible, task_scene_outline]
+        )
+        
+        # ===== ACT III: POST-PRODUCTION =====
+        logger.info("🎬 ACT III: POST-PRODUCTION (Claude)")
+        
+        # Task 5: AI Detection & Final Polish (Claude)
+        task_final_scene = Task(
+            description=f"""
+            Create final screenplay ensuring McKee scene principles:
             
-            # Task 5: AI Detection & Final Polish (Claude)
-            task_final_scene = Task(
-                description=f"""
-                Create final screenplay ensuring McKee scene principles:
-                
-                ORIGINAL LOGLINE: '{logline}'
-                SCENE STRUCTURE: {{task_scene_outline}}
-                DIALOGUE: {{task_dialogue}}
-                
-                VERIFICATION CHECKLIST:
-                - Clear value shift in main character
-                - Proper beat structure driving change
-                - 2-3 pages maximum in screenplay format
-                - Eliminates AI writing patterns
-                - Uses exact setting from logline
-                
-                OUTPUT: Complete, professionally formatted scene with FADE IN/FADE OUT.
-                """,
-                agent=self.creative_reviewer,
-                expected_output="Professional 2-3 page screenplay scene with clear McKee structure.",
-                context=[task_character_bible, task_scene_outline, task_dialogue]
-            )
+            ORIGINAL LOGLINE: '{logline}'
+            SCENE STRUCTURE: {{task_scene_outline}}
+            DIALOGUE: {{task_dialogue}}
+            """,
+            agent=self.creative_reviewer,
+            expected_output="Professional 2-3 page screenplay scene with clear McKee structure.",
+            context=[task_character_bible, task_scene_outline, task_dialogue]
+        )
+        
+        return {
+            "structure_analysis": task_analyze,
+            "character_bible": task_character_bible,
+            "scene_outline": task_scene_outline,
+            "first_draft_dialogue": task_dialogue,
+            "final_screenplay": task_final_scene,
+        }
+
+    def _run_pipeline(
+        self,
+        checkpoint: RunCheckpoint,
+        on_chunk: Optional[StageChunkCallback] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> MixedModelOutput:
+        """Run every stage not yet checkpointed, saving each one as soon as it finishes."""
+        metrics = ProductionMetrics(run_id=checkpoint.run_id, stage_names=dict(AGENT_STAGES))
+        output = MixedModelOutput(logline=checkpoint.logline, run_id=checkpoint.run_id, metrics=metrics)
+        token = (cancel_token or CancellationToken(external=False)).child(scene_timeout())
+        self.agent_set.reset_execution_state()  # every scene gets the full task retry budget
+        
+        sink: Optional[ChunkSink] = None
+        if on_chunk is not None:
+            listener = on_chunk
             
-            # Execute Mixed-Model Process
-            tasks = [task_analyze, task_character_bible, task_scene_outline, task_dialogue, task_final_scene]
-            
-            crew = Crew(
-                agents=[
-                    self.dramaturge, 
-                    self.character_creator, 
-                    self.scene_architect, 
-                    self.dialogue_specialist, 
-                    self.creative_reviewer
-                ],
-                tasks=tasks,
-                verbose=True
-            )
+            def sink(agent_name: str, chunk: str) -> None:
+                listener(AGENT_STAGES.get(agent_name, agent_name), chunk)
+        
+        try:
+            with stream_to(sink), collect_metrics(metrics), cancellation_scope(token):
+                return self._execute_stages(checkpoint, output)
+        finally:
+            # Failed runs keep their metrics too, so the cost of a partial run is visible
+            checkpoint.save_metrics(metrics.to_json())
+
+    def _execute_stages(self, checkpoint: RunCheckpoint, output: MixedModelOutput) -> MixedModelOutput:
+        """Kick off the pending stages and collect every stage's output."""
+        try:
+            tasks = self._build_tasks(checkpoint.logline, self._reference_scenes(checkpoint, output))
+            completed = checkpoint.completed_stages()
+            
+            # Finished stages keep their saved output so downstream context still resolves
+            pending_tasks = []
+            for stage, task in tasks.items():
+                if stage in completed:
+                    task.output = TaskOutput(
+                        description=task.description,
+                        raw=completed[stage],
+                        agent=task.agent.role,
+                    )
+                else:
+                    task.callback = self._checkpoint_callback(checkpoint, stage)
+                    pending_tasks.append(task)
             
-            final_result = crew.kickoff()
+            if completed:
+                logger.info(f"Skipping {len(completed)} checkpointed stages: {', '.join(completed)}")
+                if checkpoint.branched_from:
+                    output.production_log.append(
+                        f"Branched from run {checkpoint.branched_from}: reused {', '.join(completed)}"
+                    )
+                else:
+                    output.production_log.append(f"Resumed run {checkpoint.run_id}: reused {', '.join(completed)}")
+            
+            # Execute Mixed-Model Process
+            if pending_tasks and self.execution_mode != "sequential":
+                self._run_tasks_as_dag(tasks, pending_tasks)
+            elif pending_tasks:
+                crew = Crew(
+                    agents=[
+                        self.dramaturge, 
+                        self.character_creator, 
+                        self.scene_architect, 
+                        self.dialogue_specialist, 
+                        self.creative_reviewer
+                    ],
+                    tasks=pending_tasks,
+                    verbose=True
+                )
+                
+                crew.kickoff()
             
             # Extract outputs
-            output.structure_analysis = str(tasks[0].output)
-            output.character_bible = str(tasks[1].output)
-            output.scene_outline = str(tasks[2].output)
-            output.first_draft_dialogue = str(tasks[3].output)
-            output.final_screenplay = str(tasks[4].output)
+            for stage, task in tasks.items():
+                setattr(output, stage, str(task.output))
+            self._check_format(checkpoint, output)
             
-            # Add cost tracking data
+            if output.metrics and output.metrics.total_prompt_tokens_saved:
+                output.production_log.append(
+                    f"Context compaction saved {output.metrics.total_prompt_tokens_saved} prompt tokens"
+                )
             output.production_log.append("Mixed-Model Production completed successfully")
+            checkpoint.mark_status("completed")
+            store_in_background(output)  # later scenes can reference this one
 
             logger.info("Mixed-Model Production completed successfully")
             return output
                         
+        except SceneCancelled as e:
+            # Bounded tail latency: hand back what finished instead of waiting or raising
+            finished = checkpoint.completed_stages()
+            for stage, content in finished.items():
+                setattr(output, stage, content)
+            output.partial = True
+            output.production_log.append(
+                f"Production stopped early ({e}); completed stages: {', '.join(finished) or 'none'}"
+            )
+            checkpoint.mark_status("cancelled", str(e))
+            logger.warning(f"Mixed-Model Production stopped early (run {checkpoint.run_id}): {e}")
+            return output
+        
         except Exception as e:
-            logger.error(f"Mixed-Model Production failed: {e}")
+            logger.error(f"Mixed-Model Production failed (run {checkpoint.run_id}): {e}")
             output.production_log.append(f"Production failed: {str(e)}")
-            raise
\ No newline at end of file
+            checkpoint.mark_status("failed", str(e))
+            raise
+
+    def _check_format(self, checkpoint: RunCheckpoint, output: MixedModelOutput) -> None:
+        """Validate the final screenplay locally; ask the reviewer for a targeted repair only if it fails."""
+        report = validate_screenplay(output.final_screenplay)
+        if report.valid:
+            output.production_log.append(f"Format check passed ({report.pages:.1f} pages)")
+            return
+        
+        codes = ", ".join(sorted({issue.code for issue in report.issues}))
+        logger.info(f"Final screenplay failed format check ({codes}); {len(report.issues)} issues")
+        if os.getenv("SCREENPLAY_REPAIR_ENABLED", "true").lower() != "true":
+            output.production_log.append(f"Format check failed ({codes}); repair disabled")
+            return
+        
+        try:
+            repaired = final_answer(str(self.creative_reviewer.llm.call([
+                {"role": "system", "content": "You are a screenplay formatter. You fix format, never story."},
+                {"role": "user", "content": repair_prompt(output.final_screenplay, report)},
+            ])))
+        except Exception as e:
+            logger.warning(f"Format repair failed: {e}")
+            output.production_log.append(f"Format check failed ({codes}); repair call failed")
+            return
+        
+        repaired_report = validate_screenplay(repaired)
+        if len(repaired_report.issues) >= len(report.issues):
+            output.production_log.append(f"Format check failed ({codes}); repair did not improve it, kept original")
+            return
+        output.final_screenplay = repaired
+        checkpoint.save_stage("final_screenplay", repaired)
+        output.production_log.append(
+            f"Format repair fixed {len(report.issues) - len(repaired_report.issues)} of {len(report.issues)} "
+            f"issues ({repaired_report.pages:.1f} pages)"
+        )
+
+    def _run_tasks_as_dag(self, tasks: Dict[str, Task], pending_tasks: List[Task]) -> None:
+        """Run pending tasks as a DAG built from each Task's context, every ready task at once."""
+        stage_of = {id(task): stage for stage, task in tasks.items()}
+        pending_ids = {id(task) for task in pending_tasks}
+        dependencies = {
+            stage_of[id(task)]: [
+                stage_of[id(context_task)]
+                for context_task in (task.context if isinstance(task.context, list) else [])
+                if id(context_task) in pending_ids
+            ]
+            for task in pending_tasks
+        }
+        logger.info(f"Running stages as DAG ({self.execution_mode}): {dependencies}")
+        
+        def execute(stage: str) -> None:
+            # Context tasks outside this one-task crew resolve from their finished output
+            task = tasks[stage]
+            Crew(agents=[task.agent], tasks=[task], verbose=True).kickoff()
+        
+        run_dag(dependencies, execute)
+
+    @staticmethod
+    def _checkpoint_callback(checkpoint: RunCheckpoint, stage: str) -> Callable[[TaskOutput], None]:
+        """Task callback that saves the stage output to the run directory."""
+        def save(task_output: TaskOutput) -> None:
+            checkpoint.save_stage(stage, task_output.raw)
+        return save
+
+    def _studio_for_current_thread(self) -> "MixedModelSceneSmithCrew":
+        """Return the studio owned by the calling batch worker thread."""
+        studio = getattr(self._thread_local, "studio", None)
+        if studio is None:
+            studio = MixedModelSceneSmithCrew(execution_mode=self.execution_mode)
+            self._thread_local.studio = studio
+        return studio
+
+    def _generate_in_worker(
+        self,
+        logline: str,
+        on_chunk: Optional[StageChunkCallback] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> MixedModelOutput:
+        """Generate a scene with the calling worker thread's own studio."""
+        if cancel_token is not None and cancel_token.cancelled:
+            raise SceneCancelled(f"not started: {cancel_token.reason}")  # queued behind a cancelled batch
+        return self._studio_for_current_thread().generate_scene(logline, on_chunk=on_chunk, cancel_token=cancel_token)
+
+    def _plan_batch(self, loglines: List[str]) -> Tuple[List[str], List[List[int]]]:
+        """
+        Collapse near-duplicate loglines: returns the loglines to generate and, for
+        each of them, the input positions it answers (itself first).
+        """
+        if not self.dedup_enabled:
+            return list(loglines), [[index] for index in range(len(loglines))]
+        
+        canonical = cluster_loglines(loglines, self.reuse_threshold)
+        groups: Dict[int, List[int]] = {}
+        for index, representative in enumerate(canonical):
+            groups.setdefault(representative, []).append(index)
+        if len(groups) < len(loglines):
+            logger.info(f"Batch dedup: {len(loglines)} loglines -> {len(groups)} distinct scenes")
+        return [loglines[representative] for representative in groups], list(groups.values())
+
+    @staticmethod
+    def _duplicate_output(output: MixedModelOutput, logline: str) -> MixedModelOutput:
+        """Copy of `output` answering a near-duplicate logline (its cost is not counted twice)."""
+        return replace(
+            output,
+            logline=logline,
+            metrics=None,
+            production_log=output.production_log + [f"Reused run {output.run_id} for near-duplicate logline"],
+        )
+
+    def _fan_out_results(
+        self,
+        loglines: List[str],
+        groups: List[List[int]],
+        on_result: Optional[Callable[[int, str, Any, Optional[str]], None]],
+    ) -> Optional[Callable[[int, str, Any, Optional[str]], None]]:
+        """Report each distinct scene's result for every input position it answers."""
+        if on_result is None:
+            return None
+        
+        def fan_out(unique_index: int, logline: str, output: Any, error: Optional[str]) -> None:
+            for position in groups[unique_index]:
+                result = output
+                if output is not None and loglines[position] != logline:
+                    result = self._duplicate_output(output, loglines[position])
+                on_result(position, loglines[position], result, error)
+        
+        return fan_out
+
+    def _expand_report(self, loglines: List[str], groups: List[List[int]], report: BatchReport) -> BatchReport:
+        """BatchReport over the original inputs from the report over distinct loglines."""
+        if len(groups) == len(loglines):
+            return report
+        expanded = BatchReport(total=len(loglines), results=[None] * len(loglines), elapsed_seconds=report.elapsed_seconds)
+        for unique_index, positions in enumerate(groups):
+            output = report.results[unique_index]
+            for position in positions:
+                if unique_index in report.errors:
+                    expanded.errors[position] = report.errors[unique_index]
+                elif output is not None:
+                    same = loglines[position] == output.logline
+                    expanded.results[position] = output if same else self._duplicate_output(output, loglines[position])
+        return expanded
+
+    def generate_scenes(
+        self,
+        loglines: List[str],
+        max_concurrency: Optional[int] = None,
+        output_path: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> BatchReport:
+        """
+        Generate scenes for many loglines concurrently, streaming results to JSONL.
+        Cancelling `cancel_token` stops in-flight scenes (returned as partial) and
+        skips the ones not yet started.
+        """
+        concurrency = max_concurrency or int(os.getenv("BATCH_CONCURRENCY", "4"))
+        reserve_provider_threads(concurrency * ModelFactory.max_calls_per_scene(AGENT_STAGES))
+        writer = JsonlResultWriter(output_path) if output_path else None
+        unique, groups = self._plan_batch(loglines)
+        
+        try:
+            report = run_batch(
+                unique,
+                lambda logline: self._generate_in_worker(logline, cancel_token=cancel_token),
+                max_concurrency=concurrency,
+                on_result=self._fan_out_results(loglines, groups, writer.write if writer else None),
+            )
+            return self._expand_report(loglines, groups, report)
+        finally:
+            if writer:
+                writer.close()
+
+    async def agenerate_scene(
+        self,
+        logline: str,
+        on_chunk: Optional[StageChunkCallback] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> MixedModelOutput:
+        """
+        Async variant of `generate_scene` for event-loop services.
+        
+        crewai 0.134 has no async LLM path (its kickoff_async is a thread hop too),
+        so the pipeline runs on a worker thread with its own studio; `on_chunk` is
+        called from that thread.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._async_executor(),
+            contextvars.copy_context().run, self._generate_in_worker, logline, on_chunk, cancel_token,
+        )
+
+    def _async_executor(self) -> ThreadPoolExecutor:
+        """
+        Pool running agenerate_scene calls: BATCH_CONCURRENCY workers, so concurrent
+        awaits queue here instead of each taking a default-executor thread and studio.
+        """
+        with self._async_pool_lock:
+            if self._async_pool is None:
+                concurrency = int(os.getenv("BATCH_CONCURRENCY", "4"))
+                reserve_provider_threads(concurrency * ModelFactory.max_calls_per_scene(AGENT_STAGES))
+                self._async_pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="ascene")
+            return self._async_pool
+
+    async def agenerate_scenes(
+        self,
+        loglines: List[str],
+        max_concurrency: Optional[int] = None,
+        output_path: Optional[str] = None,
+        cancel_token: Optional[CancellationToken] = None,
+    ) -> BatchReport:
+        """Async variant of `generate_scenes` with at most `max_concurrency` scenes in flight."""
+        concurrency = max_concurrency or int(os.getenv("BATCH_CONCURRENCY", "4"))
+        reserve_provider_threads(concurrency * ModelFactory.max_calls_per_scene(AGENT_STAGES))
+        writer = JsonlResultWriter(output_path) if output_path else None
+        unique, groups = self._plan_batch(loglines)
+        
+        try:
+            report = await arun_batch(
+                unique,
+                lambda logline: self._generate_in_worker(logline, cancel_token=cancel_token),
+                max_concurrency=concurrency,
+                on_result=self._fan_out_results(loglines, groups, writer.write if writer else None),
+            )
+            return self._expand_report(loglines, groups, report)
+        finally:
+            if writer:
+                writer.close()
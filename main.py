@@ -3,12 +3,21 @@ Mixed-Model SceneSmith CLI with Cost Tracking
 """
 
 import os
+import signal
+import argparse
 import logging
-from typing import Optional
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Iterator, List, Optional
 from dotenv import load_dotenv
-from crew import MixedModelSceneSmithCrew, MixedModelOutput
+from utils.batch import BatchReport, load_loglines
 from utils.logging_config import setup_logging
-import agentops
+
+# crewai, the agents and agentops take seconds to import; they are loaded only
+# once a scene is actually produced so --help and input validation stay instant
+if TYPE_CHECKING:
+    from crew import MixedModelOutput
+    from utils.cancellation import CancellationToken
+    from utils.metrics import ProductionMetrics
 
 def setup_environment() -> bool:
     """Setup environment variables and logging."""
@@ -31,6 +40,13 @@ def setup_environment() -> bool:
     
     return True
 
+def start_tracking() -> Any:
+    """Import and initialize AgentOps, returning the module for ending the session."""
+    import agentops
+    
+    agentops.init(api_key=os.getenv("AGENTOPS_API_KEY"))
+    return agentops
+
 def get_user_input() -> Optional[str]:
     """Get logline input from user."""
     print("🎬 SceneSmith Mixed-Model Production Studio")
@@ -43,12 +59,14 @@ def get_user_input() -> Optional[str]:
     logline = input("\nEnter your logline: ").strip()
     return logline if logline else None
 
-def display_mixed_model_results(output: MixedModelOutput) -> None:
+def display_mixed_model_results(output: "MixedModelOutput") -> None:
     """Display Mixed-Model Production results."""
     
     print("\n" + "=" * 80)
     print("🎭 MIXED-MODEL PRODUCTION RESULTS")
     print("=" * 80)
+    if output.partial:
+        print(f"⚠️  PARTIAL RESULT: {output.production_log[-1]}")
     
     # ACT I
     print("\n🎬 ACT I: PRE-PRODUCTION")
@@ -75,41 +93,266 @@ def display_mixed_model_results(output: MixedModelOutput) -> None:
     print("=" * 40)
     print(output.final_screenplay)
     
-    print("\n💰 Cost tracking available in AgentOps dashboard")
+    if output.metrics:
+        display_metrics(output.metrics)
+    print(f"📁 Run ID: {output.run_id} (stages checkpointed for --resume)")
     print("=" * 80)
 
+def display_metrics(metrics: "ProductionMetrics") -> None:
+    """Display per-stage latency, tokens and estimated cost."""
+    
+    print("\n💰 PRODUCTION METRICS")
+    print("-" * 40)
+    print(f"{'Stage':<22}{'Wall':>8}{'Queue':>8}{'Calls':>7}{'Tokens':>9}{'Cost':>10}")
+    for stage in metrics.stages():
+        tokens = stage.prompt_tokens + stage.completion_tokens
+        print(
+            f"{stage.stage:<22}{stage.wall_time:>7.1f}s{stage.queue_time:>7.1f}s"
+            f"{stage.llm_calls:>7}{tokens:>9}{stage.cost_usd:>9.4f}$"
+        )
+    print(f"{'TOTAL':<22}{metrics.total_wall_time:>7.1f}s{'':>15}{metrics.total_tokens:>9}{metrics.total_cost_usd:>9.4f}$")
+    if metrics.total_prompt_tokens_saved:
+        print(f"✂️  Context compaction saved {metrics.total_prompt_tokens_saved} prompt tokens")
+    if metrics.total_cache_read_tokens:
+        for stage in metrics.stages():
+            if stage.cache_read_tokens or stage.cache_write_tokens:
+                fresh = stage.prompt_tokens - stage.cache_read_tokens - stage.cache_write_tokens
+                print(
+                    f"🗄️  {stage.stage}: {stage.cache_read_tokens} cache-read / "
+                    f"{stage.cache_write_tokens} cache-write / {fresh} fresh input tokens"
+                )
+
+def write_metrics(metrics: "ProductionMetrics", path: str) -> None:
+    """Export metrics as Prometheus text (.prom) or JSON (anything else)."""
+    content = metrics.to_prometheus() if path.endswith(".prom") else metrics.to_json()
+    with open(path, "w", encoding="utf-8") as handle:
+        handle.write(content)
+    print(f"📈 Metrics written to {path}")
+
+STAGE_TITLES = {
+    "structure_analysis": "📋 DRAMATURGE (GPT-4): Structure Analysis",
+    "character_bible": "👥 CHARACTER CREATOR (Claude): McKee's Framework",
+    "scene_outline": "🏗️ SCENE ARCHITECT (GPT-4): Visual Storytelling",
+    "first_draft_dialogue": "💬 DIALOGUE SPECIALIST (Claude): Authentic Voices",
+    "final_screenplay": "🎯 FINAL SCREENPLAY (Claude - AI Detection & Polish)",
+}
+
+def make_stream_printer() -> Callable[[str, str], None]:
+    """Build a (stage, chunk) callback that prints each act as it is generated."""
+    current = {"stage": ""}
+    
+    def print_chunk(stage: str, chunk: str) -> None:
+        if stage != current["stage"]:
+            current["stage"] = stage
+            print(f"\n\n{STAGE_TITLES.get(stage, stage)}")
+            print("-" * 40)
+        print(chunk, end="", flush=True)
+    
+    return print_chunk
+
+def display_batch_report(report: BatchReport, output_path: str) -> None:
+    """Display a summary of a batch production run."""
+    
+    print("\n" + "=" * 80)
+    print("🎭 BATCH PRODUCTION RESULTS")
+    print("=" * 80)
+    print(f"✅ Completed: {report.completed}/{report.total}")
+    if report.partial:
+        print(f"⚠️  Partial (stopped early): {report.partial}")
+    print(f"❌ Failed: {report.failed}")
+    print(f"⏱️  Elapsed: {report.elapsed_seconds:.1f}s")
+    print(f"🚀 Throughput: {report.scenes_per_minute:.2f} scenes/minute")
+    print(f"📁 Results: {output_path}")
+    print("=" * 80)
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="SceneSmith Mixed-Model Production Studio")
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="JSONL file of loglines (a JSON string or {\"logline\": ...} per line)",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=None,
+        help="Maximum scenes in flight in batch mode (default: BATCH_CONCURRENCY or 4)",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        help="JSONL file to stream batch results to (default: <batch>.results.jsonl)",
+    )
+    parser.add_argument(
+        "--execution-mode",
+        choices=["sequential", "dag", "speculative"],
+        default=None,
+        help="Stage scheduling (default: PIPELINE_EXECUTION_MODE or sequential)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print each stage's tokens as they are generated",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Resume a checkpointed run, skipping stages that already finished",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        metavar="FILE",
+        help="Write the scene's latency/token/cost metrics (.prom for Prometheus text, otherwise JSON)",
+    )
+    parser.add_argument(
+        "--candidates",
+        type=int,
+        default=None,
+        help="Sample N dialogue and final-review candidates concurrently and keep the best "
+             "(default: LLM_CANDIDATES or 1)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Stop each scene after SECONDS and keep the stages that finished (default: SCENE_TIMEOUT or none)",
+    )
+    parser.add_argument(
+        "--rebuild-memory-index",
+        metavar="TYPE",
+        nargs="?",
+        const="",
+        default=None,
+        help="Retrain scene memory as flat, ivf, ivfpq, hnsw or a faiss.index_factory string "
+             "(default: MEMORY_INDEX_TYPE) and exit",
+    )
+    return parser.parse_args(argv)
+
+def rebuild_memory_index(index_type: Optional[str]) -> None:
+    """Rebuild the scene memory's FAISS index and report the layout used."""
+    from utils.memory import SceneMemory
+    
+    try:
+        description = SceneMemory(mmap=False).rebuild_index(index_type or None)
+        print(f"✅ Scene memory index rebuilt as {description}")
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Memory index rebuild failed: {e}", exc_info=True)
+        print(f"❌ Could not rebuild memory index: {e}")
+
+@contextmanager
+def cancel_on_interrupt(token: "CancellationToken") -> Iterator["CancellationToken"]:
+    """
+    First Ctrl-C cancels `token` so running scenes return what they have;
+    a second one interrupts immediately.
+    """
+    def handle(signum: int, frame: Any) -> None:
+        if token.cancelled:
+            raise KeyboardInterrupt
+        print("\n⏹️  Stopping: keeping completed stages (Ctrl-C again to abort)...")
+        token.cancel("interrupted")
+    
+    previous = signal.signal(signal.SIGINT, handle)
+    try:
+        yield token
+    finally:
+        signal.signal(signal.SIGINT, previous)
+
+def run_batch_mode(args: argparse.Namespace) -> None:
+    """Generate scenes for every logline in a batch file."""
+    logger = logging.getLogger(__name__)
+    
+    try:
+        loglines = load_loglines(args.batch)
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not read batch file: {e}")
+        return
+    
+    if not loglines:
+        print("Error: Batch file contains no loglines.")
+        return
+    
+    output_path = args.output or f"{os.path.splitext(args.batch)[0]}.results.jsonl"
+    print(f"\n🚀 Starting batch production of {len(loglines)} loglines...")
+    
+    agentops = start_tracking()
+    try:
+        from crew import MixedModelSceneSmithCrew
+        from utils.cancellation import CancellationToken
+        
+        studio = MixedModelSceneSmithCrew(execution_mode=args.execution_mode)
+        with cancel_on_interrupt(CancellationToken()) as token:
+            report = studio.generate_scenes(
+                loglines,
+                max_concurrency=args.concurrency,
+                output_path=output_path,
+                cancel_token=token,
+            )
+        display_batch_report(report, output_path)
+        agentops.end_session('Success' if not (report.failed or report.partial) else 'Indeterminate')
+        
+    except Exception as e:
+        logger.error(f"Batch production error: {str(e)}", exc_info=True)
+        print(f"\n❌ Batch Production Error: {str(e)}")
+        agentops.end_session('Failed')
+
 def main() -> None:
     """Main CLI entry point with AgentOps tracking."""
+    args = parse_args()
     if not setup_environment():
         return
     
     logger = logging.getLogger(__name__)
     logger.info("Starting Mixed-Model SceneSmith")
+    if args.candidates:
+        os.environ["LLM_CANDIDATES"] = str(args.candidates)
+    if args.timeout is not None:
+        os.environ["SCENE_TIMEOUT"] = str(args.timeout)
     
-    # Initialize AgentOps ONCE at the start
-    agentops.init(api_key=os.getenv("AGENTOPS_API_KEY"))
+    if args.rebuild_memory_index is not None:
+        rebuild_memory_index(args.rebuild_memory_index)
+        return
     
-    logline = get_user_input()
-    if not logline:
-        print("Error: Please provide a valid logline.")
-        agentops.end_trace('Failed')  # ← UPDATED METHOD
+    if args.batch:
+        run_batch_mode(args)
         return
     
-    print(f"\n🚀 Starting Mixed-Model Production...")
+    logline = None
+    if not args.resume:
+        logline = get_user_input()
+        if not logline:
+            print("Error: Please provide a valid logline.")
+            return
+    
+    print(f"\n🚀 {'Resuming' if args.resume else 'Starting'} Mixed-Model Production...")
     print("🤖 Using GPT-4 for structure, Claude for psychology & dialogue")
-    print("📊 Cost tracking via AgentOps")
+    print("📊 Cost tracking via local metrics and AgentOps")
     
+    # Initialize AgentOps ONCE, only when there is a scene to track
+    agentops = start_tracking()
     try:
-        studio = MixedModelSceneSmithCrew()
-        output = studio.generate_scene(logline)
+        from crew import MixedModelSceneSmithCrew
+        from utils.cancellation import CancellationToken
+        
+        studio = MixedModelSceneSmithCrew(execution_mode=args.execution_mode)
+        on_chunk = make_stream_printer() if args.stream else None
+        with cancel_on_interrupt(CancellationToken()) as token:
+            if logline is None:
+                output = studio.resume(args.resume, on_chunk=on_chunk, cancel_token=token)
+            else:
+                output = studio.generate_scene(logline, on_chunk=on_chunk, cancel_token=token)
         display_mixed_model_results(output)
+        if args.metrics_out and output.metrics:
+            write_metrics(output.metrics, args.metrics_out)
         
         # End AgentOps session successfully
-        agentops.end_session('Success')  # ← CORRECTED METHOD
+        agentops.end_session('Indeterminate' if output.partial else 'Success')  # ← CORRECTED METHOD
         
     except Exception as e:
         logger.error(f"Production error: {str(e)}", exc_info=True)
         print(f"\n❌ Production Error: {str(e)}")
+        print("💾 Finished stages are checkpointed; pass the run ID from the log to --resume.")
         
         # End AgentOps session with failure
         agentops.end_session('Failed')  # ← CORRECTED METHOD
@@ -0,0 +1,31 @@
+"""
+Shared fixtures: the pipeline on the offline fake LLM backend.
+"""
+
+import pytest
+
+from utils.model_factory import ModelFactory
+
+@pytest.fixture
+def offline(monkeypatch, tmp_path):
+    """Run the pipeline offline with a fresh fake prompt cache and LLM pool."""
+    monkeypatch.setenv("LLM_BACKEND", "fake")
+    monkeypatch.setenv("FAKE_LLM_LATENCY", "0")
+    monkeypatch.setenv("LLM_CACHE_ENABLED", "false")
+    monkeypatch.setenv("ENABLE_MEMORY", "false")
+    monkeypatch.setenv("RUNS_DIR", str(tmp_path))
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("OPENAI_TPM", "0")
+    monkeypatch.setenv("ANTHROPIC_TPM", "0")
+    monkeypatch.setenv("CREWAI_DISABLE_TELEMETRY", "true")
+    monkeypatch.setenv("OTEL_SDK_DISABLED", "true")
+    from utils import agent_registry
+    from utils.fake_llm import fake_prompt_cache
+
+    ModelFactory.clear_pool()
+    agent_registry.reset_agent_set()
+    fake_prompt_cache.clear()
+    yield
+    ModelFactory.clear_pool()
+    agent_registry.reset_agent_set()
@@ -0,0 +1,61 @@
+"""
+The scene pipeline end to end on the fake LLM backend.
+"""
+
+import os
+
+import pytest
+
+from utils.fake_llm import FakeLLM
+
+LOGLINE = "Two friends in their sixties meet on a crowded beach in the rain."
+AGENTS = ("dramaturge", "character_creator", "architect", "dialogue", "reviewer")
+STAGES = ("structure_analysis", "character_bible", "scene_outline", "first_draft_dialogue", "final_screenplay")
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Agent names of every simulated provider round trip, in order."""
+    made = []
+    original = FakeLLM._complete
+
+    def record(self, *args):
+        made.append(self.agent_name)
+        return original(self, *args)
+
+    monkeypatch.setattr(FakeLLM, "_complete", record)
+    return made
+
+@pytest.mark.parametrize("execution_mode", ["sequential", "dag", "speculative"])
+def test_every_execution_mode_fills_every_stage(offline, calls, execution_mode):
+    from crew import MixedModelSceneSmithCrew
+
+    output = MixedModelSceneSmithCrew(execution_mode=execution_mode).generate_scene(LOGLINE)
+
+    assert all(getattr(output, stage) for stage in STAGES), execution_mode
+    assert "FADE IN:" in output.final_screenplay
+    assert not output.partial
+    assert sorted(calls) == sorted(AGENTS)  # one round trip per stage
+    assert {stage.agent for stage in output.metrics.stages()} == set(AGENTS)
+
+def test_resume_reruns_only_unfinished_stages(offline, calls, monkeypatch, tmp_path):
+    from crew import MixedModelSceneSmithCrew
+
+    monkeypatch.setenv("FAKE_LLM_DOWN_MODELS", "claude-3-5-sonnet-20241022")
+    with pytest.raises(Exception):
+        MixedModelSceneSmithCrew().generate_scene(LOGLINE)
+    (run_id,) = os.listdir(tmp_path)
+    assert calls[0] == "dramaturge"
+
+    from utils import agent_registry
+    from utils.model_factory import ModelFactory
+
+    monkeypatch.delenv("FAKE_LLM_DOWN_MODELS")
+    ModelFactory.clear_pool()  # FakeLLM reads the outage list when it is built
+    agent_registry.reset_agent_set()
+    calls.clear()
+    output = MixedModelSceneSmithCrew().resume(run_id)
+
+    assert output.run_id == run_id
+    assert all(getattr(output, stage) for stage in STAGES)
+    assert "dramaturge" not in calls
+    assert calls[0] == "character_creator"
@@ -0,0 +1,37 @@
+"""
+Prompt budget compaction of crewai's task context.
+"""
+
+from utils.prompt_budget import CONTEXT_DIVIDER, CONTEXT_MARKER, compact_messages, prompt_budget
+from utils.tokens import count_tokens
+
+MODEL = "gpt-4o"
+
+def task_prompt(*sections: str) -> list:
+    """A crewai-style user prompt whose context holds `sections` in order."""
+    context = CONTEXT_DIVIDER.join(sections)
+    return [{"role": "user", "content": f"Current Task: polish\n\n{CONTEXT_MARKER}{context}\n\nBegin! Go."}]
+
+def bible(lines: int) -> str:
+    """A long character bible with a few structural lines."""
+    return "## CHARACTER BIBLE\n" + "\n".join(f"Rocky remembers the pier, winter number {n}." for n in range(lines))
+
+def test_compaction_is_off_by_default(monkeypatch):
+    monkeypatch.delenv("PROMPT_BUDGET_ENABLED", raising=False)
+    monkeypatch.delenv("PROMPT_BUDGET_REVIEWER", raising=False)
+    messages = task_prompt(bible(400), bible(400))
+
+    assert prompt_budget("reviewer") == 0
+    assert compact_messages(messages, "reviewer", MODEL)[0] is messages
+
+def test_latest_section_is_never_trimmed(monkeypatch):
+    monkeypatch.setenv("PROMPT_BUDGET_REVIEWER", "500")
+    latest = "ROCKY\n" + "\n".join(f"Listen, line {n} of the dialogue draft." for n in range(200))
+    assert count_tokens(latest, MODEL) > 500
+
+    compacted, result = compact_messages(task_prompt(bible(200), latest), "reviewer", MODEL)
+
+    content = compacted[0]["content"]
+    assert content.endswith(latest + "\n\nBegin! Go.")
+    assert "winter number 150" not in content  # the older section was condensed to its digest
+    assert result.saved_tokens > 0
@@ -0,0 +1,45 @@
+"""
+Prompt caching through the real agents and crewai's prompt assembly (fake LLM backend).
+"""
+
+from utils.model_factory import SceneSmithLLM
+
+def test_agents_send_their_instructions_as_a_system_message(offline, monkeypatch):
+    """crewai drops Agent(system_message=...); the instructions must still reach the model."""
+    from crew import MixedModelSceneSmithCrew
+
+    sent = {}
+    original = SceneSmithLLM._mark_cacheable_prefix
+
+    def record(self, messages):
+        sent.setdefault(self.agent_name, messages)
+        return original(self, messages)
+
+    monkeypatch.setattr(SceneSmithLLM, "_mark_cacheable_prefix", record)
+    MixedModelSceneSmithCrew().generate_scene("A chef discovers her rival is her long-lost sister")
+
+    assert set(sent) == {"dramaturge", "character_creator", "architect", "dialogue", "reviewer"}
+    for agent_name, messages in sent.items():
+        assert messages[0]["role"] == "system", agent_name
+    assert "McKee's scene structure" in sent["dramaturge"][0]["content"]
+    assert "AI WRITING ELIMINATION" in sent["reviewer"][0]["content"]
+
+def test_repeat_scenes_read_the_reviewer_prompt_from_cache(offline):
+    """Only the reviewer's system prompt reaches the cacheable minimum; the second scene reads it back."""
+    from crew import MixedModelSceneSmithCrew
+
+    studio = MixedModelSceneSmithCrew()
+    first = studio.generate_scene("A chef discovers her rival is her long-lost sister")
+    second = studio.generate_scene("A lighthouse keeper finds a letter from her future self")
+
+    def stage(output, agent_name):
+        return next(metrics for metrics in output.metrics.stages() if metrics.agent == agent_name)
+
+    def reviewer(output):
+        return stage(output, "reviewer")
+
+    assert reviewer(first).cache_write_tokens > 0
+    assert reviewer(second).cache_read_tokens > 0
+    assert reviewer(second).cost_usd < reviewer(first).cost_usd
+    for agent_name in ("character_creator", "dialogue"):
+        assert stage(first, agent_name).cache_write_tokens == 0, agent_name
@@ -0,0 +1,69 @@
+"""
+Process-level registry of production agents, reused across scenes.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, fields
+from typing import List
+from crewai import Agent
+from agents.dramaturge import create_dramaturge
+from agents.character_creator import create_character_creator
+from agents.architect import create_architect
+from agents.dialogue import create_dialogue_specialist
+from agents.reviewer import create_reviewer
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class AgentSet:
+    """The five agents one scene pipeline needs."""
+    dramaturge: Agent
+    character_creator: Agent
+    scene_architect: Agent
+    dialogue_specialist: Agent
+    creative_reviewer: Agent
+
+    def agents(self) -> List[Agent]:
+        """Every agent in pipeline order."""
+        return [getattr(self, item.name) for item in fields(self)]
+
+    def reset_execution_state(self) -> None:
+        """
+        Clear state crewai accumulates across executions and never resets:
+        the retry counter (which would otherwise use up `max_retry_limit`
+        over a worker's lifetime) and tool results.
+        """
+        for agent in self.agents():
+            agent._times_executed = 0
+            agent.tools_results = []
+
+_local = threading.local()
+
+def get_agent_set() -> AgentSet:
+    """
+    Return the calling thread's agents, building them on first use.
+
+    crewai agents keep per-execution state, so a set is never shared between
+    threads; their LLMs come from ModelFactory's process-wide pool instead.
+    """
+    agents = getattr(_local, "agents", None)
+    if agents is None:
+        agents = build_agent_set()
+        _local.agents = agents
+        logger.info(f"Built agent set for thread {threading.current_thread().name}")
+    return agents
+
+def build_agent_set() -> AgentSet:
+    """Build a fresh set of agents (LLMs are still pooled by ModelFactory)."""
+    return AgentSet(
+        dramaturge=create_dramaturge(),
+        character_creator=create_character_creator(),
+        scene_architect=create_architect(),
+        dialogue_specialist=create_dialogue_specialist(),
+        creative_reviewer=create_reviewer(),
+    )
+
+def reset_agent_set() -> None:
+    """Drop the calling thread's agents so the next scene rebuilds them."""
+    _local.agents = None
@@ -0,0 +1,182 @@
+"""
+Bounded concurrent batch scheduler for SceneSmith.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, asdict, is_dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class BatchReport:
+    """Summary of a batch run, with results kept in input order."""
+    total: int
+    results: List[Any] = field(default_factory=list)
+    errors: Dict[int, str] = field(default_factory=dict)
+    elapsed_seconds: float = 0.0
+
+    @property
+    def completed(self) -> int:
+        """Number of loglines that produced a scene."""
+        return sum(1 for result in self.results if result is not None)
+
+    @property
+    def partial(self) -> int:
+        """Number of scenes stopped early by a timeout or cancellation (counted as completed)."""
+        return sum(1 for result in self.results if getattr(result, "partial", False))
+
+    @property
+    def failed(self) -> int:
+        """Number of loglines whose pipeline raised."""
+        return len(self.errors)
+
+    @property
+    def scenes_per_minute(self) -> float:
+        """Completed scenes per minute of wall-clock time."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.completed * 60.0 / self.elapsed_seconds
+
+def load_loglines(path: str) -> List[str]:
+    """Load loglines from a JSONL file (one JSON string or {"logline": ...} per line)."""
+    loglines: List[str] = []
+
+    with open(path, "r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_number}: invalid JSON ({e})")
+
+            logline = record.get("logline") if isinstance(record, dict) else record
+            if not isinstance(logline, str) or not logline.strip():
+                raise ValueError(f"{path}:{line_number}: expected a non-empty logline")
+            loglines.append(logline.strip())
+
+    return loglines
+
+class JsonlResultWriter:
+    """Thread-safe JSONL sink that appends each result as soon as it finishes."""
+
+    def __init__(self, path: str) -> None:
+        """Open the output file for appending."""
+        self.path = path
+        self._lock = threading.Lock()
+        self._handle = open(path, "a", encoding="utf-8")
+
+    def write(self, index: int, logline: str, output: Any, error: Optional[str] = None) -> None:
+        """Write one finished (or failed) scene and flush it to disk."""
+        record: Dict[str, Any] = {
+            "index": index,
+            "logline": logline,
+            "status": "failed" if error else "partial" if getattr(output, "partial", False) else "completed",
+            "output": asdict(output) if is_dataclass(output) and not isinstance(output, type) else output,
+            "error": error,
+        }
+        metrics = getattr(output, "metrics", None)
+        if metrics is not None and hasattr(metrics, "to_dict"):
+            record["output"]["metrics"] = metrics.to_dict()  # summary rather than raw fields
+        line = json.dumps(record, ensure_ascii=False)
+
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        """Close the underlying file."""
+        with self._lock:
+            self._handle.close()
+
+def run_batch(
+    loglines: List[str],
+    worker: Callable[[str], Any],
+    max_concurrency: int,
+    on_result: Optional[Callable[[int, str, Any, Optional[str]], None]] = None,
+) -> BatchReport:
+    """Run `worker` over every logline with at most `max_concurrency` in flight."""
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    report = BatchReport(total=len(loglines), results=[None] * len(loglines))
+    logger.info(f"Starting batch of {len(loglines)} loglines (concurrency={max_concurrency})")
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="scene") as pool:
+        futures = {
+            pool.submit(worker, logline): index
+            for index, logline in enumerate(loglines)
+        }
+
+        for future in as_completed(futures):
+            index = futures[future]
+            logline = loglines[index]
+            output: Any = None
+            error: Optional[str] = None
+
+            try:
+                output = future.result()
+                report.results[index] = output
+            except Exception as e:
+                error = str(e)
+                report.errors[index] = error
+                logger.error(f"Batch item {index} failed: {e}")
+
+            if on_result:
+                on_result(index, logline, output, error)
+
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        f"Batch finished: {report.completed}/{report.total} scenes in "
+        f"{report.elapsed_seconds:.1f}s ({report.scenes_per_minute:.2f} scenes/min)"
+    )
+    return report
+
+async def arun_batch(
+    loglines: List[str],
+    worker: Callable[[str], Any],
+    max_concurrency: int,
+    on_result: Optional[Callable[[int, str, Any, Optional[str]], None]] = None,
+) -> BatchReport:
+    """Async counterpart of `run_batch`: awaits blocking `worker` calls on a bounded pool."""
+    if max_concurrency < 1:
+        raise ValueError("max_concurrency must be at least 1")
+
+    report = BatchReport(total=len(loglines), results=[None] * len(loglines))
+    logger.info(f"Starting async batch of {len(loglines)} loglines (concurrency={max_concurrency})")
+    loop = asyncio.get_running_loop()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="ascene") as pool:
+
+        async def run_one(index: int, logline: str) -> None:
+            output: Any = None
+            error: Optional[str] = None
+            try:
+                output = await loop.run_in_executor(pool, worker, logline)
+                report.results[index] = output
+            except Exception as e:
+                error = str(e)
+                report.errors[index] = error
+                logger.error(f"Batch item {index} failed: {e}")
+
+            if on_result:
+                on_result(index, logline, output, error)
+
+        await asyncio.gather(*(run_one(index, logline) for index, logline in enumerate(loglines)))
+
+    report.elapsed_seconds = time.perf_counter() - started
+    logger.info(
+        f"Async batch finished: {report.completed}/{report.total} scenes in "
+        f"{report.elapsed_seconds:.1f}s ({report.scenes_per_minute:.2f} scenes/min)"
+    )
+    return report
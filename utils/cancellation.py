@@ -0,0 +1,133 @@
+"""
+Cooperative cancellation and deadlines for scene production.
+
+A CancellationToken is bound to the scene's context (like metrics and stream
+sinks), so every LLM call made for the scene, on any thread, can check it.
+SceneSmithLLM checks the token before queueing, after the rate limiter and
+while waiting on the provider; a cancelled call stops waiting at once and the
+abandoned HTTP request ends at the client timeout (LLM_HTTP_TIMEOUT). Calls
+that nothing can cancel mid-flight skip the wait and run inline.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from crewai.utilities.events import TaskStartedEvent, crewai_event_bus
+
+logger = logging.getLogger(__name__)
+
+class SceneCancelled(TimeoutError):
+    """
+    The scene was cancelled or ran past a deadline. Subclasses TimeoutError
+    because crewai propagates that without retrying the task.
+    """
+
+class CancellationToken:
+    """Cancellation flag with an optional scene deadline and per-stage deadlines."""
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        parent: Optional["CancellationToken"] = None,
+        external: bool = True,
+    ) -> None:
+        """
+        Create a token expiring `timeout` seconds from now (None or 0 = no
+        deadline). `external` is False for a token only the scene itself holds,
+        which nothing outside can cancel.
+        """
+        self.parent = parent
+        self.external = external
+        self.timeout = timeout or None
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.reason = ""
+        self._event = threading.Event()
+        self._stage_deadlines: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def child(self, timeout: Optional[float] = None) -> "CancellationToken":
+        """Token cancelled with this one, with its own (optional) deadline."""
+        return CancellationToken(timeout, parent=self, external=False)
+
+    def cancel(self, reason: str = "cancelled") -> None:
+        """Cancel every call checking this token (and its children)."""
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+            logger.info(f"Cancellation requested: {reason}")
+
+    @property
+    def cancelled(self) -> bool:
+        """True once cancelled, past the deadline, or the parent is cancelled."""
+        if self._event.is_set():
+            return True
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(f"scene timed out after {self.timeout:g}s")
+            return True
+        if self.parent is not None and self.parent.cancelled:
+            self.cancel(self.parent.reason)
+            return True
+        return False
+
+    def can_cancel(self, agent_name: str = "") -> bool:
+        """True if an in-flight call for `agent_name` could be cancelled: a deadline or an outside holder."""
+        token: Optional[CancellationToken] = self
+        while token is not None:
+            with token._lock:
+                stage_deadline = agent_name in token._stage_deadlines
+            if token.external or token.deadline is not None or stage_deadline:
+                return True
+            token = token.parent
+        return False
+
+    def start_stage(self, agent_name: str, timeout: float) -> None:
+        """Start the clock on `agent_name`'s stage (timeout 0 = none)."""
+        with self._lock:
+            if timeout:
+                self._stage_deadlines[agent_name] = time.monotonic() + timeout
+            else:
+                self._stage_deadlines.pop(agent_name, None)
+
+    def check(self, agent_name: str = "") -> None:
+        """Raise SceneCancelled if the scene or `agent_name`'s stage should stop."""
+        if self.cancelled:
+            raise SceneCancelled(self.reason)
+        with self._lock:
+            stage_deadline = self._stage_deadlines.get(agent_name)
+        if stage_deadline is not None and time.monotonic() >= stage_deadline:
+            raise SceneCancelled(f"stage {agent_name} timed out after {stage_timeout(agent_name):g}s")
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("scene_smith_cancellation", default=None)
+
+@contextmanager
+def cancellation_scope(token: CancellationToken) -> Iterator[CancellationToken]:
+    """Make `token` visible to every LLM call in this context (and its copies)."""
+    handle = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(handle)
+
+def current_token() -> Optional[CancellationToken]:
+    """The active scene's token, if any."""
+    return _current_token.get()
+
+def scene_timeout() -> float:
+    """Seconds a whole scene may take (SCENE_TIMEOUT, 0 = unbounded)."""
+    return float(os.getenv("SCENE_TIMEOUT", "0"))
+
+def stage_timeout(agent_name: str) -> float:
+    """Seconds one stage may take: STAGE_TIMEOUT_<AGENT>, else STAGE_TIMEOUT (0 = unbounded)."""
+    return float(os.getenv(f"STAGE_TIMEOUT_{agent_name.upper()}", os.getenv("STAGE_TIMEOUT", "0")))
+
+@crewai_event_bus.on(TaskStartedEvent)
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    """Tasks start on the thread that runs them, so the scene's token is live here."""
+    token = current_token()
+    agent_name = getattr(getattr(getattr(source, "agent", None), "llm", None), "agent_name", None)
+    if token is not None and agent_name:
+        token.start_stage(agent_name, stage_timeout(agent_name))
@@ -0,0 +1,169 @@
+"""
+Per-run stage checkpoints for the SceneSmith production pipeline.
+"""
+
+import os
+import json
+import uuid
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+def _atomic_write(path: str, content: str) -> None:
+    """Write a file so readers never observe a partial write."""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(content)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+class RunCheckpoint:
+    """
+    Run directory holding `run.json` plus one `<stage>.md` per finished stage.
+
+    Layout:
+        runs/<run_id>/run.json
+        runs/<run_id>/structure_analysis.md
+        ...
+    """
+
+    def __init__(self, run_id: str, logline: str, runs_dir: Optional[str] = None) -> None:
+        """Bind to a run directory (use `create` / `load` instead of calling directly)."""
+        self.run_id = run_id
+        self.logline = logline
+        self.runs_dir = runs_dir if runs_dir else os.getenv("RUNS_DIR", "./runs")
+        self.directory = os.path.join(self.runs_dir, run_id)
+        self._lock = threading.Lock()
+        self._state: Dict[str, Any] = {
+            "run_id": run_id,
+            "logline": logline,
+            "status": "running",
+            "completed_stages": [],
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "error": None,
+        }
+
+    @classmethod
+    def create(cls, logline: str, runs_dir: Optional[str] = None) -> "RunCheckpoint":
+        """Start a new run directory for `logline`."""
+        run_id = f"{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        checkpoint = cls(run_id, logline, runs_dir)
+        os.makedirs(checkpoint.directory, exist_ok=True)
+        checkpoint._write_state()
+        logger.info(f"Created run {run_id} in {checkpoint.directory}")
+        return checkpoint
+
+    @classmethod
+    def branch(
+        cls,
+        source: "RunCheckpoint",
+        logline: str,
+        stages: List[str],
+        runs_dir: Optional[str] = None,
+    ) -> "RunCheckpoint":
+        """Start a run for `logline` that reuses `stages` of `source` instead of regenerating them."""
+        checkpoint = cls.create(logline, runs_dir)
+        with checkpoint._lock:
+            checkpoint._state["branched_from"] = source.run_id
+            checkpoint._write_state()
+        completed = source.completed_stages()
+        for stage in stages:
+            if stage in completed:
+                checkpoint.save_stage(stage, completed[stage])
+        logger.info(f"Branched run {checkpoint.run_id} from {source.run_id}")
+        return checkpoint
+
+    @classmethod
+    def load(cls, run_id: str, runs_dir: Optional[str] = None) -> "RunCheckpoint":
+        """Open an existing run directory."""
+        directory = os.path.join(runs_dir if runs_dir else os.getenv("RUNS_DIR", "./runs"), run_id)
+        state_path = os.path.join(directory, "run.json")
+        if not os.path.exists(state_path):
+            raise ValueError(f"Run '{run_id}' not found in {os.path.dirname(directory)}")
+
+        with open(state_path, "r", encoding="utf-8") as handle:
+            state = json.load(handle)
+
+        checkpoint = cls(run_id, state["logline"], runs_dir)
+        checkpoint._state.update(state)
+        return checkpoint
+
+    def _write_state(self) -> None:
+        """Persist run.json."""
+        _atomic_write(os.path.join(self.directory, "run.json"), json.dumps(self._state, indent=2))
+
+    def _stage_path(self, stage: str) -> str:
+        """Location of a stage's saved output."""
+        return os.path.join(self.directory, f"{stage}.md")
+
+    @property
+    def status(self) -> str:
+        """Current run status: running, completed, failed or cancelled (resumable)."""
+        status: str = self._state["status"]
+        return status
+
+    @property
+    def branched_from(self) -> Optional[str]:
+        """Run this one reused early stages from, if it was branched."""
+        return self._state.get("branched_from")
+
+    @property
+    def references(self) -> Optional[str]:
+        """Memory references pinned for this run's prompts, or None before they are chosen."""
+        return self._state.get("references")
+
+    def save_references(self, references: str) -> None:
+        """Pin the memory references so resumed stages see the same prompts."""
+        with self._lock:
+            self._state["references"] = references
+            self._write_state()
+
+    def save_stage(self, stage: str, content: str) -> None:
+        """Save a finished stage's output and mark it complete."""
+        with self._lock:
+            _atomic_write(self._stage_path(stage), content)
+            if stage not in self._state["completed_stages"]:
+                self._state["completed_stages"].append(stage)
+            self._write_state()
+        logger.info(f"Checkpointed stage '{stage}' for run {self.run_id}")
+
+    def completed_stages(self) -> Dict[str, str]:
+        """Outputs of every stage already finished, keyed by stage name."""
+        completed: Dict[str, str] = {}
+        for stage in self._state["completed_stages"]:
+            path = self._stage_path(stage)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as handle:
+                    completed[stage] = handle.read()
+        return completed
+
+    def mark_status(self, status: str, error: Optional[str] = None) -> None:
+        """Record the run's final status."""
+        with self._lock:
+            self._state["status"] = status
+            self._state["error"] = error
+            self._write_state()
+
+    def save_metrics(self, metrics_json: str) -> None:
+        """Save the run's latency/token/cost metrics next to its stages."""
+        with self._lock:
+            _atomic_write(os.path.join(self.directory, "metrics.json"), metrics_json)
+
+def list_runs(runs_dir: Optional[str] = None) -> List[str]:
+    """All run ids under the runs directory, oldest first."""
+    directory = runs_dir if runs_dir else os.getenv("RUNS_DIR", "./runs")
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if os.path.exists(os.path.join(directory, name, "run.json"))
+    )
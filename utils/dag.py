@@ -0,0 +1,58 @@
+"""
+Minimal dependency-graph executor for running pipeline stages concurrently.
+"""
+
+import logging
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+def run_dag(
+    dependencies: Dict[str, List[str]],
+    execute: Callable[[str], None],
+    max_workers: Optional[int] = None,
+) -> None:
+    """
+    Run `execute(node)` for every node once all of its dependencies have finished.
+
+    Every node whose dependencies are satisfied runs at the same time. The first
+    failure stops new nodes from starting and is re-raised once in-flight nodes end.
+    """
+    unknown = {dep for deps in dependencies.values() for dep in deps} - set(dependencies)
+    if unknown:
+        raise ValueError(f"Unknown dependencies: {', '.join(sorted(unknown))}")
+
+    remaining: Dict[str, Set[str]] = {node: set(deps) for node, deps in dependencies.items()}
+    running: Dict[Future, str] = {}
+    error: Optional[BaseException] = None
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(dependencies) or 1, thread_name_prefix="stage") as pool:
+        while remaining or running:
+            if error is None:
+                ready = [node for node, deps in remaining.items() if not deps]
+                for node in ready:
+                    del remaining[node]
+                    logger.debug(f"DAG starting {node}")
+                    # Copy the caller's context so per-scene context vars follow the stage
+                    running[pool.submit(contextvars.copy_context().run, execute, node)] = node
+
+            if not running:
+                if remaining and error is None:
+                    raise ValueError(f"Dependency cycle among: {', '.join(sorted(remaining))}")
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                node = running.pop(future)
+                exc = future.exception()
+                if exc is not None:
+                    logger.error(f"DAG node {node} failed: {exc}")
+                    error = error or exc
+                    continue
+                for deps in remaining.values():
+                    deps.discard(node)
+
+    if error is not None:
+        raise error
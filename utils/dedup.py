@@ -0,0 +1,150 @@
+"""
+Near-duplicate logline detection with MinHash signatures and LSH banding.
+"""
+
+import os
+import re
+import zlib
+import logging
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+import numpy as np
+from utils.checkpoint import RunCheckpoint, list_runs
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 128
+BANDS = 32  # 4 rows per band: pairs above ~0.5 Jaccard almost always share a band
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+# Fixed seed so signatures are comparable across processes and runs
+_rng = np.random.RandomState(1729)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+def normalize_logline(text: str) -> str:
+    """Lowercase words only, so punctuation and spacing never make loglines differ."""
+    return " ".join(re.findall(r"[a-z0-9']+", text.lower()))
+
+def _shingles(text: str) -> Set[str]:
+    """Word unigrams and bigrams of a normalized logline."""
+    words = normalize_logline(text).split()
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature; the fraction of equal entries estimates Jaccard similarity."""
+    shingles = _shingles(text)
+    if not shingles:
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+    # (a*x + b) mod p for every permutation and shingle at once
+    permuted = (np.outer(hashes, _PERM_A) + _PERM_B) % _MERSENNE_PRIME & _MAX_HASH
+    signature: np.ndarray = permuted.min(axis=0)
+    return signature
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(first == second))
+
+class LoglineIndex:
+    """LSH index over MinHash signatures: candidate lookup is O(bands), not O(entries)."""
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Number of indexed loglines."""
+        return len(self._signatures)
+
+    @staticmethod
+    def _bands(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        """Bucket keys of a signature, one per band."""
+        return [(band, rows.tobytes()) for band, rows in enumerate(np.split(signature, BANDS))]
+
+    def add(self, key: str, text: str, signature: Optional[np.ndarray] = None) -> None:
+        """Index `text` under `key`."""
+        signature = minhash_signature(text) if signature is None else signature
+        with self._lock:
+            self._signatures[key] = signature
+            for bucket in self._bands(signature):
+                self._buckets.setdefault(bucket, []).append(key)
+
+    def query(self, text: str, threshold: float, signature: Optional[np.ndarray] = None) -> Optional[Tuple[str, float]]:
+        """Most similar indexed key with similarity >= threshold, or None."""
+        signature = minhash_signature(text) if signature is None else signature
+        with self._lock:
+            candidates = {key for bucket in self._bands(signature) for key in self._buckets.get(bucket, ())}
+            scored = [(key, similarity(signature, self._signatures[key])) for key in candidates]
+        best = max(scored, key=lambda item: item[1], default=None)
+        return best if best and best[1] >= threshold else None
+
+def cluster_loglines(loglines: List[str], threshold: float) -> List[int]:
+    """Index of each logline's canonical (first similar) logline; itself when unique."""
+    index = LoglineIndex()
+    canonical: List[int] = []
+    for position, logline in enumerate(loglines):
+        signature = minhash_signature(logline)
+        match = index.query(logline, threshold, signature)
+        if match is None:
+            index.add(str(position), logline, signature)
+            canonical.append(position)
+        else:
+            canonical.append(int(match[0]))
+    return canonical
+
+class RunHistory:
+    """Completed runs under RUNS_DIR, indexed by logline and refreshed incrementally."""
+
+    def __init__(self, runs_dir: Optional[str] = None) -> None:
+        """Bind to a runs directory (read lazily)."""
+        self.runs_dir = runs_dir if runs_dir else os.getenv("RUNS_DIR", "./runs")
+        self._index = LoglineIndex()
+        self._seen: Set[str] = set()
+        # (mtime, size) of each run.json read but not indexed, so unchanged ones are not read again
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def refresh(self) -> None:
+        """Index completed runs not seen before (each run.json is read once per change)."""
+        with self._lock:
+            for run_id in list_runs(self.runs_dir):
+                if run_id in self._seen:
+                    continue
+                try:
+                    stat = os.stat(os.path.join(self.runs_dir, run_id, "run.json"))
+                except OSError:
+                    continue
+                stamp = (stat.st_mtime_ns, stat.st_size)
+                if self._stamps.get(run_id) == stamp:
+                    continue
+                self._stamps[run_id] = stamp
+                try:
+                    checkpoint = RunCheckpoint.load(run_id, self.runs_dir)
+                except (OSError, ValueError) as e:
+                    logger.debug(f"Skipping unreadable run {run_id}: {e}")
+                    continue
+                if checkpoint.status != "completed":
+                    continue  # running, failed and cancelled runs can still be resumed to completion
+                del self._stamps[run_id]
+                self._seen.add(run_id)
+                self._index.add(run_id, checkpoint.logline)
+
+    def find(self, logline: str, threshold: float) -> Optional[Tuple[str, float]]:
+        """(run_id, similarity) of the closest completed run at or above threshold."""
+        self.refresh()
+        return self._index.query(logline, threshold)
+
+_histories: Dict[str, RunHistory] = {}
+_histories_lock = threading.Lock()
+
+def get_run_history(runs_dir: Optional[str] = None) -> RunHistory:
+    """Process-wide RunHistory for a runs directory."""
+    directory = runs_dir if runs_dir else os.getenv("RUNS_DIR", "./runs")
+    with _histories_lock:
+        if directory not in _histories:
+            _histories[directory] = RunHistory(directory)
+        return _histories[directory]
@@ -0,0 +1,254 @@
+"""
+Embedding clients for SceneMemory, with a persistent content-addressed vector cache.
+"""
+
+import os
+import re
+import json
+import zlib
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+fcntl: Optional[ModuleType]
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# One line of the keys file: a sha256 hex digest and a newline
+KEY_RECORD_BYTES = 65
+
+class EmbeddingCache:
+    """
+    Append-only content-hash -> float32 vector store for one embedding model.
+
+    Vectors live in `<namespace>.f32` as raw float32 rows and their keys (sha256 of
+    the text) in `<namespace>.keys`, one per line and in the same order, so a cache
+    of N vectors of dimension D costs N*D*4 bytes plus 65 bytes per key. Writers
+    in any process append both files under one flock, so rows and keys stay paired.
+    """
+
+    def __init__(self, namespace: str, directory: Optional[str] = None) -> None:
+        """Open (or create) the cache files for `namespace`."""
+        if not directory:
+            directory = os.getenv("EMBEDDING_CACHE_DIR", "./embedding_cache")
+        self.directory = directory
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", namespace)
+        self._keys_path = os.path.join(self.directory, f"{slug}.keys")
+        self._vectors_path = os.path.join(self.directory, f"{slug}.f32")
+        self._meta_path = os.path.join(self.directory, f"{slug}.json")
+        self._file_lock_path = os.path.join(self.directory, f"{slug}.lock")
+        self._lock = threading.Lock()
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self.dimension = 0
+        self._load()
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """Content hash of one text."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Exclusive lock shared by every process writing this cache."""
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._file_lock_path, "a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _load(self) -> None:
+        """Read existing vectors, dropping any partially written tail."""
+        if not os.path.exists(self._meta_path):
+            return
+        try:
+            with open(self._meta_path, "r", encoding="utf-8") as handle:
+                self.dimension = int(json.load(handle)["dimension"])
+            with open(self._keys_path, "r", encoding="utf-8") as handle:
+                data = handle.read()
+            keys = data[: len(data) // KEY_RECORD_BYTES * KEY_RECORD_BYTES].split()
+            flat = np.fromfile(self._vectors_path, dtype=np.float32)
+            count = min(len(keys), len(flat) // self.dimension)
+            self._vectors = flat[: count * self.dimension].reshape(count, self.dimension)
+            self._rows = {key: row for row, key in enumerate(keys[:count])}
+            logger.info(f"Loaded {count} cached embeddings from {self.directory}")
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Ignoring unreadable embedding cache {self._meta_path}: {e}")
+            self._rows, self.dimension = {}, 0
+
+    def __len__(self) -> int:
+        """Number of cached vectors."""
+        return len(self._rows)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        """Cached vector for `key`, or None."""
+        row = self._rows.get(key)
+        return None if row is None else self._vectors[row].tolist()
+
+    def put_many(self, keys: List[str], vectors: List[List[float]]) -> None:
+        """Append new vectors (already cached keys are skipped)."""
+        with self._lock:
+            fresh = [(key, vector) for key, vector in zip(keys, vectors) if key not in self._rows]
+            if not fresh:
+                return
+            block = np.asarray([vector for _, vector in fresh], dtype=np.float32)
+            with self._file_lock():
+                if not self.dimension:
+                    self._adopt_dimension(block.shape[1])
+                if block.shape[1] != self.dimension:
+                    logger.warning(
+                        f"Not caching embeddings of dimension {block.shape[1]} (cache uses {self.dimension})"
+                    )
+                    return
+
+                self._align_files()
+                # Vectors first: a crash between the writes leaves unmatched rows, which
+                # _load drops and the next writer truncates
+                with open(self._vectors_path, "ab") as handle:
+                    handle.write(block.tobytes())
+                with open(self._keys_path, "a", encoding="utf-8") as handle:
+                    handle.write("".join(f"{key}\n" for key, _ in fresh))
+
+            start = len(self._vectors)
+            self._vectors = np.concatenate([self._vectors, block])
+            for offset, (key, _) in enumerate(fresh):
+                self._rows[key] = start + offset
+
+    def _adopt_dimension(self, dimension: int) -> None:
+        """Use the dimension another process already recorded, else record `dimension` (file lock held)."""
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path, "r", encoding="utf-8") as handle:
+                dimension = int(json.load(handle)["dimension"])
+        else:
+            with open(self._meta_path, "w", encoding="utf-8") as handle:
+                json.dump({"dimension": dimension}, handle)
+        self.dimension = dimension
+        self._vectors = np.zeros((0, dimension), dtype=np.float32)
+
+    def _align_files(self) -> None:
+        """Cut both files back to their complete, paired rows before appending (file lock held)."""
+        row_bytes = self.dimension * 4
+        vector_rows = os.path.getsize(self._vectors_path) // row_bytes if os.path.exists(self._vectors_path) else 0
+        key_rows = os.path.getsize(self._keys_path) // KEY_RECORD_BYTES if os.path.exists(self._keys_path) else 0
+        rows = min(vector_rows, key_rows)
+        for path, size in ((self._vectors_path, rows * row_bytes), (self._keys_path, rows * KEY_RECORD_BYTES)):
+            if os.path.exists(path) and os.path.getsize(path) != size:
+                logger.warning(f"Dropping an unpaired tail from {path} left by an interrupted write")
+                os.truncate(path, size)
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings client that only sends texts it has never embedded before."""
+
+    def __init__(self, inner: Embeddings, cache: EmbeddingCache) -> None:
+        """Wrap `inner` with `cache`."""
+        self.inner = inner
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed `texts`, batching every cache miss into one request."""
+        keys = [EmbeddingCache.make_key(text) for text in texts]
+        vectors = [self.cache.get(key) for key in keys]
+        missing = [index for index, vector in enumerate(vectors) if vector is None]
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            # Duplicate texts within one batch are embedded once
+            unique = list(dict.fromkeys(texts[index] for index in missing))
+            embedded = dict(zip(unique, self.inner.embed_documents(unique)))
+            self.cache.put_many([EmbeddingCache.make_key(text) for text in unique], [embedded[text] for text in unique])
+            for index in missing:
+                vectors[index] = list(embedded[texts[index]])
+        filled = [vector for vector in vectors if vector is not None]
+        assert len(filled) == len(texts), "every text must have a cached or fresh vector"
+        return filled
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a query string (fixed queries are served from the cache after the first call)."""
+        key = EmbeddingCache.make_key(text)
+        vector = self.cache.get(key)
+        if vector is not None:
+            self.hits += 1
+            return vector
+        self.misses += 1
+        vector = self.inner.embed_query(text)
+        self.cache.put_many([key], [vector])
+        return vector
+
+class HashedNgramEmbeddings(Embeddings):
+    """
+    CPU-only, deterministic embeddings: word unigrams/bigrams and character
+    trigrams hashed into `dimension` signed buckets, L2-normalised. No network,
+    no model download; quality is lexical rather than semantic.
+    """
+
+    def __init__(self, dimension: Optional[int] = None) -> None:
+        """Create the embedder (MEMORY_EMBEDDING_DIM buckets by default)."""
+        self.dimension = dimension or int(os.getenv("MEMORY_EMBEDDING_DIM", "512"))
+
+    @staticmethod
+    def _features(text: str) -> List[str]:
+        """Hashed features of one text."""
+        words = re.findall(r"[a-z0-9']+", text.lower())
+        features = [f"w:{word}" for word in words]
+        features += [f"b:{first} {second}" for first, second in zip(words, words[1:])]
+        for word in words:
+            padded = f" {word} "
+            features += [f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2)]
+        return features
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of texts in one NumPy pass."""
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        rows: List[int] = []
+        hashes: List[int] = []
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                rows.append(row)
+                hashes.append(zlib.crc32(feature.encode("utf-8")))
+        if hashes:
+            hashed = np.asarray(hashes, dtype=np.uint32)
+            # Low bits pick the bucket, the top bit the sign (keeps collisions unbiased)
+            signs = np.where(hashed >> np.uint32(31), -1.0, 1.0).astype(np.float32)
+            np.add.at(matrix, (np.asarray(rows), hashed % np.uint32(self.dimension)), signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        vectors: List[List[float]] = (matrix / np.maximum(norms, 1e-12)).tolist()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed one query string."""
+        return self.embed_documents([text])[0]
+
+def get_embeddings() -> Embeddings:
+    """
+    Embeddings client for SceneMemory selected by MEMORY_EMBEDDINGS: `openai`
+    (cached unless EMBEDDING_CACHE_ENABLED=false) or the offline `local` backend.
+    """
+    backend = os.getenv("MEMORY_EMBEDDINGS", "openai").lower()
+    if backend == "local":
+        return HashedNgramEmbeddings()
+    if backend != "openai":
+        raise ValueError(f"Unknown MEMORY_EMBEDDINGS '{backend}' (expected 'openai' or 'local')")
+
+    from langchain_openai import OpenAIEmbeddings
+
+    inner = OpenAIEmbeddings()
+    if os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() != "true":
+        return inner
+    namespace = f"openai-{getattr(inner, 'model', 'embeddings')}"
+    return CachedEmbeddings(inner, EmbeddingCache(namespace))
@@ -0,0 +1,231 @@
+"""
+Deterministic offline LLM backend for benchmarks and local runs (LLM_BACKEND=fake).
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+from litellm.exceptions import ServiceUnavailableError
+from litellm.types.utils import Usage
+from utils.model_factory import SceneSmithLLM, estimate_prompt_tokens
+
+logger = logging.getLogger(__name__)
+
+CANNED_OUTPUTS: Dict[str, str] = {
+    "dramaturge": """
+SCENE BOUNDARIES: From Rocky's arrival at the bench until Cordelia leaves the beach.
+OPENING VALUE: Hope edged with fear.
+CLOSING VALUE: Regret disguised as relief.
+CENTRAL CONFLICT: Rocky wants to confess; Cordelia wants the friendship unchanged.
+KEY BEATS:
+1. Rocky rehearses under his breath and is caught.
+2. Cordelia steers the talk to the weather.
+3. Rocky starts the confession; a gull steals his sandwich.
+4. Cordelia laughs, and the moment passes.
+SCENE QUESTION: Will Rocky risk the friendship for love?
+""",
+    "character_creator": """
+## CHARACTER BIBLE
+
+### ROCKY
+* **Conscious Desire:** To tell Cordelia he loves her.
+* **Unconscious Desire:** To keep the safety of their friendship.
+* **Core Fear:** Being alone after being refused.
+* **Vocal Tic:** Starts sentences with "Listen".
+
+### CORDELIA
+* **Conscious Desire:** A quiet afternoon with an old friend.
+* **Unconscious Desire:** To be chosen, plainly and out loud.
+* **Core Fear:** Losing the one person who still knows her history.
+* **Vocal Tic:** Answers questions with questions.
+""",
+    "architect": """
+**Opening Beat:** Rocky sits on the bench, smoothing a folded note on his knee.
+**Beat 1:** Cordelia arrives with two coffees and sees the note; he pockets it.
+**Beat 2:** She talks about the rain; he keeps checking the horizon.
+**Beat 3:** He says "Listen" twice and stops twice.
+**Beat 4:** A gull steals his sandwich; she laughs; he laughs too late.
+**Closing Beat:** She leaves; he unfolds the note and lets the wind take it.
+""",
+    "dialogue": """
+ROCKY
+Listen. Cordelia. There's something.
+
+CORDELIA
+(handing him a coffee)
+Is it the weather? Because it's about to rain.
+
+ROCKY
+Listen, it's not the weather.
+
+CORDELIA
+Then what is it, Rocky?
+
+ROCKY
+(watching the gull)
+Nothing. The sandwich. It's gone.
+""",
+    "reviewer": """
+FADE IN:
+
+EXT. CROWDED BEACH - AFTERNOON
+
+Grey sky. ROCKY (60s) sits on a bench, a folded note on his knee.
+
+CORDELIA (60s) arrives with two coffees. Rocky pockets the note.
+
+CORDELIA
+Is it the weather? Because it's about to rain.
+
+ROCKY
+Listen. It's not the weather.
+
+A gull lands, snatches his sandwich. Cordelia laughs.
+
+ROCKY (CONT'D)
+(too late)
+Nothing. It's nothing.
+
+Cordelia squeezes his shoulder and walks off. Rocky unfolds the note. The wind takes it.
+
+FADE OUT.
+""",
+}
+
+DEFAULT_OUTPUT = "A deterministic placeholder response from the offline backend."
+
+# Anthropic prompt-cache rules the fake enforces on cache_control markers
+MAX_CACHE_BREAKPOINTS = 4
+PROMPT_CACHE_TTL = 300.0  # "ephemeral" entries live five minutes
+
+class FakePromptCache:
+    """Process-wide stand-in for Anthropic's prompt cache, keyed by model and cached prefix."""
+
+    def __init__(self) -> None:
+        """Start empty."""
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, model: str, prefix: str) -> bool:
+        """True on a hit; a miss writes the prefix. Either way the entry's TTL is refreshed."""
+        key = hashlib.sha256(f"{model}\0{prefix}".encode("utf-8")).hexdigest()
+        now = time.monotonic()
+        with self._lock:
+            hit = self._expires.get(key, 0.0) > now
+            self._expires[key] = now + PROMPT_CACHE_TTL
+        return hit
+
+    def clear(self) -> None:
+        """Forget every cached prefix."""
+        with self._lock:
+            self._expires.clear()
+
+fake_prompt_cache = FakePromptCache()
+
+def cacheable_prefix(messages: Union[str, List[Dict[str, Any]]]) -> str:
+    """
+    Text up to and including the last cache_control block, validated like the
+    Messages API: markers must be {"type": "ephemeral"} and at most four per request.
+    """
+    if isinstance(messages, str):
+        return ""
+    prefix: List[str] = []
+    cached_length = 0
+    breakpoints = 0
+    for message in messages:
+        content = message.get("content", "")
+        blocks = content if isinstance(content, list) else [{"type": "text", "text": str(content)}]
+        for block in blocks:
+            prefix.append(block.get("text", ""))
+            marker = block.get("cache_control")
+            if marker is None:
+                continue
+            if marker != {"type": "ephemeral"}:
+                raise ValueError(f"Invalid cache_control {marker!r} (expected {{'type': 'ephemeral'}})")
+            breakpoints += 1
+            cached_length = len(prefix)
+    if breakpoints > MAX_CACHE_BREAKPOINTS:
+        raise ValueError(f"{breakpoints} cache_control blocks (the API allows {MAX_CACHE_BREAKPOINTS})")
+    return "".join(prefix[:cached_length])
+
+class FakeLLM(SceneSmithLLM):
+    """
+    SceneSmithLLM whose network round trip is replaced by a canned response.
+
+    Caching, rate limiting and every other layer still run, so benchmarks measure
+    orchestration overhead. Latency = FAKE_LLM_LATENCY + completion tokens divided
+    by FAKE_LLM_TOKENS_PER_SECOND (0 disables the per-token term). Models listed in
+    FAKE_LLM_DOWN_MODELS answer with a 503, to exercise routing failover.
+    """
+
+    def __init__(self, provider: str, **kwargs: Any) -> None:
+        """Create the stub; accepts every ModelFactory parameter."""
+        super().__init__(provider, **kwargs)
+        self.latency = float(os.getenv("FAKE_LLM_LATENCY", "0.05"))
+        self.tokens_per_second = float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "0"))
+        self.outputs = dict(CANNED_OUTPUTS)
+        self.down = self.model.split("/")[-1] in {
+            name.strip() for name in os.getenv("FAKE_LLM_DOWN_MODELS", "").split(",") if name.strip()
+        }
+        # (start, end) monotonic timestamps of each simulated round trip
+        self.call_log: List[Tuple[float, float]] = []
+
+    def _complete(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]],
+        callbacks: List[Any],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> Union[str, Any]:
+        """Sleep for the configured latency, stream if enabled, report usage, answer."""
+        started = time.monotonic()
+        if self.down:
+            time.sleep(self.latency)
+            raise ServiceUnavailableError("Simulated outage", llm_provider=self.provider, model=self.model)
+        answer = self.outputs.get(self.agent_name, DEFAULT_OUTPUT).strip()
+        response = f"Thought: I now can give a great answer\nFinal Answer: {answer}"
+        prompt_tokens = estimate_prompt_tokens(messages)
+        completion_tokens = len(response) // 4 + 1
+        cache_read_tokens, cache_write_tokens = self._prompt_cache_usage(messages)
+
+        delay = self.latency
+        if self.tokens_per_second > 0:
+            delay += completion_tokens / self.tokens_per_second
+
+        if self.stream:
+            # Spread the delay across word-sized chunks like a real token stream
+            chunks = response.split(" ")
+            for index, word in enumerate(chunks):
+                time.sleep(delay / len(chunks))
+                chunk = word if index == len(chunks) - 1 else word + " "
+                crewai_event_bus.emit(self, event=LLMStreamChunkEvent(chunk=chunk))
+        else:
+            time.sleep(delay)
+
+        usage = Usage(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            cache_read_input_tokens=cache_read_tokens,
+            cache_creation_input_tokens=cache_write_tokens,
+        )
+        for callback in callbacks:
+            if hasattr(callback, "log_success_event"):
+                callback.log_success_event(kwargs={}, response_obj={"usage": usage}, start_time=0, end_time=0)
+
+        self.call_log.append((started, time.monotonic()))
+        return response
+
+    def _prompt_cache_usage(self, messages: Union[str, List[Dict[str, Any]]]) -> Tuple[int, int]:
+        """(cache read, cache write) prompt tokens, simulating Anthropic's prompt cache."""
+        prefix = cacheable_prefix(messages)
+        if not prefix or self.provider != "anthropic":
+            return 0, 0
+        tokens = estimate_prompt_tokens(prefix)
+        if tokens < self.cache_min_tokens:
+            return 0, 0  # the API silently ignores prefixes below the minimum
+        return (tokens, 0) if fake_prompt_cache.lookup(self.model, prefix) else (0, tokens)
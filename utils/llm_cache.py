@@ -0,0 +1,121 @@
+"""
+Content-addressed on-disk cache for LLM responses.
+"""
+
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class ResponseCache:
+    """
+    Disk cache mapping sha256(prompt + model parameters) to the response text.
+
+    Entries are single JSON files; their mtime doubles as the LRU clock, and the
+    least recently used entries are evicted once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None) -> None:
+        """Open (or create) the cache directory and measure its current size."""
+        self.directory = directory if directory else os.getenv("LLM_CACHE_DIR", "./llm_cache")
+        self.max_bytes = max_bytes or int(float(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024)
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(entry.stat().st_size for entry in self._entries())
+
+    @staticmethod
+    def make_key(params: Dict[str, Any]) -> str:
+        """Hash the full request (messages + model parameters) into a cache key."""
+        canonical = json.dumps(params, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        """Location of the entry for `key`."""
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _entries(self) -> List[os.DirEntry]:
+        """All cache entry files currently on disk."""
+        return [
+            entry for entry in os.scandir(self.directory)
+            if entry.is_file() and entry.name.endswith(".json")
+        ]
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as handle:
+                response: str = json.load(handle)["response"]
+            os.utime(path)  # mark as recently used
+            return response
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Discarding unreadable cache entry {key}: {e}")
+            return None
+
+    def put(self, key: str, response: str, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Store a response atomically, then evict LRU entries if over budget."""
+        payload = json.dumps({"response": response, "metadata": metadata or {}}, ensure_ascii=False)
+        path = self._path(key)
+
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                handle.write(payload)
+            previous = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._size += os.path.getsize(path) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until the cache fits `max_bytes`."""
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        self._size = sum(entry.stat().st_size for entry in entries)
+        target = self.max_bytes * 0.9  # leave headroom so we don't evict on every put
+
+        for entry in entries:
+            if self._size <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.remove(entry.path)
+                self._size -= size
+            except OSError:
+                continue
+
+        logger.info(f"LLM cache evicted down to {self._size / (1024 * 1024):.1f} MB")
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            for entry in self._entries():
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    continue
+            self._size = 0
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """Return the process-wide response cache, or None when caching is disabled."""
+    global _cache
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() != "true":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = ResponseCache()
+        return _cache
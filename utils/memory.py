@@ -3,147 +3,502 @@ Memory utilities for SceneSmith using LangChain vector storage.
 """
 
 import os
+import time
+import atexit
 import logging
-from typing import List, Dict, Any, Optional
-from langchain_community.vectorstores import FAISS
-from langchain_openai import OpenAIEmbeddings
-from langchain.schema import Document
-from dataclasses import asdict
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from dataclasses import fields, is_dataclass
+
+# FAISS and the LangChain integrations are imported when a SceneMemory is built,
+# not when this module is imported
+if TYPE_CHECKING:
+    import faiss
+    from langchain_community.vectorstores import FAISS
+    from langchain.schema import Document
 
 logger = logging.getLogger(__name__)
 
+# Metadata fields kept in SceneMemory's side index for exact filtered search
+INDEXED_FIELDS = ("type", "genre", "retry_count", "logline")
+
+# MEMORY_INDEX_TYPE shorthands; any other value is passed to faiss.index_factory as is
+INDEX_TYPES = {
+    "flat": "Flat",
+    "hnsw": "HNSW32",
+    "ivf": "IVF{nlist},Flat",
+    "ivfpq": "IVF{nlist},PQ{subquantizers}x{nbits}",
+}
+
+# PQ codebooks have 2**nbits centroids and need at least that many training vectors
+PQ_MAX_NBITS = 8
+PQ_MIN_NBITS = 4
+
+# Attempts at loading a matching index.faiss / index.pkl pair while a flush swaps them
+LOAD_ATTEMPTS = 5
+
+def resolve_index_type(index_type: str, count: int, dimension: int) -> str:
+    """faiss.index_factory description for `index_type`, sized for `count` vectors."""
+    template = INDEX_TYPES.get(index_type.lower(), index_type)
+    # ~4*sqrt(n) lists, with at least 39 training points per list
+    nlist = max(1, min(4 * int(count ** 0.5), count // 39))
+    subquantizers = next(m for m in (64, 32, 16, 8, 4, 2, 1) if dimension % m == 0)
+    # Smaller codebooks when there are too few vectors to train 256 centroids per subquantizer
+    nbits = min(PQ_MAX_NBITS, max(count, 1).bit_length() - 1)
+    if "{nbits}" in template and nbits < PQ_MIN_NBITS:
+        logger.warning(
+            f"{count} vectors cannot train a product quantizer (needs {2 ** PQ_MIN_NBITS}+); using IVF,Flat"
+        )
+        template = INDEX_TYPES["ivf"]
+    elif "{nbits}" in template and nbits < PQ_MAX_NBITS:
+        logger.info(f"Only {count} vectors: PQ codebooks sized to {2 ** nbits} centroids ({nbits} bits)")
+    return template.format(nlist=nlist, subquantizers=subquantizers, nbits=nbits)
+
 class SceneMemory:
     """Vector-based memory system for storing and retrieving scene information."""
     
-    def __init__(self, persist_directory: Optional[str] = None) -> None:
+    def __init__(self, persist_directory: Optional[str] = None, mmap: Optional[bool] = None) -> None:
         """Initialize the memory system with FAISS vector store."""
-        self.persist_directory = persist_directory or os.getenv("MEMORY_PERSIST_DIR", "./scene_memory")
+        if not persist_directory:
+            persist_directory = os.getenv("MEMORY_PERSIST_DIR", "./scene_memory")
+        self.persist_directory = persist_directory
         self.enabled = os.getenv("ENABLE_MEMORY", "true").lower() == "true"
-        self.vectorstore: Optional[FAISS] = None
+        self.vectorstore: Optional["FAISS"] = None
+        # Index layout and search breadth (see rebuild_index)
+        self.index_type = os.getenv("MEMORY_INDEX_TYPE", "flat")
+        self.nprobe = int(os.getenv("MEMORY_NPROBE", "16"))
+        self.ef_search = int(os.getenv("MEMORY_HNSW_EF_SEARCH", "64"))
+        self.exact_filter_max = int(os.getenv("MEMORY_EXACT_FILTER_MAX", "4096"))
+        # Memory-mapped indexes are shared read-only between worker processes
+        if mmap is None:
+            mmap = os.getenv("MEMORY_MMAP", "false").lower() == "true"
+        self.mmap = mmap
+        self.read_only = False
+        # Write-behind persistence (see store_scenes)
+        self.flush_every = int(os.getenv("MEMORY_FLUSH_EVERY", "50"))
+        self.flush_interval = float(os.getenv("MEMORY_FLUSH_INTERVAL", "30"))
+        self._unsaved = 0
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+        # (field, value) -> FAISS positions of the documents carrying that value
+        self._metadata_index: Dict[tuple, set] = {}
         
         if not self.enabled:
             logger.info("Memory system disabled by configuration")
             return
             
         try:
-            self.embeddings = OpenAIEmbeddings()
+            from utils.embeddings import get_embeddings
+            
+            self.embeddings = get_embeddings()
             self._initialize_vectorstore()
+            atexit.register(self.flush)
         except Exception as e:
             logger.warning(f"Could not initialize memory system: {e}")
             self.enabled = False
     
     def _initialize_vectorstore(self) -> None:
         """Initialize or load existing vector store."""
+        from langchain_community.vectorstores import FAISS
+        from langchain.schema import Document
+        
         try:
             if os.path.exists(self.persist_directory):
-                self.vectorstore = FAISS.load_local(
-                    self.persist_directory, 
-                    self.embeddings,
-                    allow_dangerous_deserialization=True
-                )
-                logger.info(f"Loaded existing memory from {self.persist_directory}")
+                self._load_persisted()
             else:
                 # Create empty vectorstore with dummy document
                 dummy_doc = Document(page_content="SceneSmith memory initialized", metadata={"type": "system"})
                 self.vectorstore = FAISS.from_documents([dummy_doc], self.embeddings)
                 logger.info("Created new memory system")
+            assert self.vectorstore is not None
+            self._configure_index(self.vectorstore.index)
+            self._rebuild_metadata_index()
         except Exception as e:
             logger.error(f"Failed to initialize vector store: {e}")
             raise
     
-    def store_scene(self, scene_meta: Any) -> None:
-        """Store a scene in memory for future reference."""
-        if not self.enabled or not self.vectorstore:
-            return
+    def _load_persisted(self) -> None:
+        """
+        Load index.faiss and index.pkl as a matching pair. flush() replaces them one
+        after the other, so a load in between can pair the new index with the old
+        docstore; the vector count gives that away and the load is retried.
+        """
+        from langchain_community.vectorstores import FAISS
+        
+        for attempt in range(LOAD_ATTEMPTS):
+            if self.mmap and self._load_mmap():
+                source = "Memory-mapped existing memory from {} (read-only)"
+            else:
+                self.vectorstore = FAISS.load_local(
+                    self.persist_directory, 
+                    self.embeddings,
+                    allow_dangerous_deserialization=True
+                )
+                source = "Loaded existing memory from {}"
+            assert self.vectorstore is not None
+            vectors = self.vectorstore.index.ntotal
+            documents = len(self.vectorstore.index_to_docstore_id)
+            if vectors == documents:
+                logger.info(source.format(self.persist_directory))
+                return
+            logger.info(f"Memory index ({vectors}) and docstore ({documents}) differ mid-flush; reloading")
+            time.sleep(0.05 * (attempt + 1))
+        raise ValueError(
+            f"{self.persist_directory}: index holds {vectors} vectors but the docstore maps {documents}"
+        )
+    
+    def _load_mmap(self) -> bool:
+        """Map the saved index read-only instead of reading it into RAM; False if unsupported."""
+        import pickle
+        import faiss
+        from langchain_community.vectorstores import FAISS
         
         try:
-            # Convert scene to document
-            scene_dict = asdict(scene_meta) if hasattr(scene_meta, '__dict__') else scene_meta.__dict__
+            index = faiss.read_index(
+                os.path.join(self.persist_directory, "index.faiss"),
+                faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY,
+            )
+            with open(os.path.join(self.persist_directory, "index.pkl"), "rb") as handle:
+                docstore, index_to_docstore_id = pickle.load(handle)
+        except Exception as e:
+            logger.warning(f"Could not memory-map {self.persist_directory}, loading into RAM: {e}")
+            return False
+        
+        self.vectorstore = FAISS(self.embeddings, index, docstore, index_to_docstore_id)
+        self.read_only = True
+        return True
+    
+    def _configure_index(self, index: Any) -> None:
+        """Apply search breadth settings and allow reconstructing vectors by position."""
+        import faiss
+        
+        try:
+            ivf = faiss.extract_index_ivf(index)
+            ivf.nprobe = self.nprobe
+            ivf.make_direct_map()
+        except RuntimeError:
+            pass  # not an IVF index
+        if hasattr(index, "hnsw"):
+            index.hnsw.efSearch = self.ef_search
+    
+    def rebuild_index(self, index_type: Optional[str] = None) -> str:
+        """
+        Rebuild the FAISS index as `index_type` (default MEMORY_INDEX_TYPE), training it
+        on the stored vectors, and persist it. Positions are preserved, so the docstore
+        and metadata index stay valid. Returns the faiss.index_factory description used.
+        """
+        import faiss
+        
+        if not self.enabled or not self.vectorstore:
+            raise ValueError("Memory is disabled; nothing to rebuild")
+        if self.read_only:
+            raise ValueError("Memory is memory-mapped read-only; rebuild it with MEMORY_MMAP=false")
+        
+        with self._lock:
+            index = self.vectorstore.index
+            vectors = index.reconstruct_n(0, index.ntotal)
+            description = resolve_index_type(index_type or self.index_type, index.ntotal, index.d)
             
-            content = f"""
-            Logline: {scene_dict.get('logline', '')}
-            Structure: {scene_dict.get('structure', '')}
-            Outline: {scene_dict.get('scene_outline', '')}
-            Dialogue: {scene_dict.get('dialogue', '')}
-            Review: {scene_dict.get('review', '')}
-            """
+            rebuilt = faiss.index_factory(index.d, description)
+            if not rebuilt.is_trained:
+                rebuilt.train(vectors)
+            rebuilt.add(vectors)
+            self._configure_index(rebuilt)
             
-            doc = Document(
-                page_content=content.strip(),
-                metadata={
-                    "type": "scene",
-                    "logline": scene_dict.get('logline', ''),
-                    "genre": self._extract_genre(scene_dict.get('structure', '')),
-                    "retry_count": scene_dict.get('retry_count', 0)
-                }
-            )
+            self.vectorstore.index = rebuilt
+            self._unsaved += 1  # force the flush below
+            self.flush()
+        
+        logger.info(f"Rebuilt memory index as {description} over {len(vectors)} vectors")
+        return description
+    
+    def _rebuild_metadata_index(self) -> None:
+        """Index the metadata of every stored document by FAISS position."""
+        self._metadata_index = {}
+        assert self.vectorstore is not None
+        for position, doc_id in self.vectorstore.index_to_docstore_id.items():
+            doc = self.vectorstore.docstore.search(doc_id)
+            if hasattr(doc, "metadata"):
+                self._index_metadata(position, doc.metadata)
+    
+    def _index_metadata(self, position: int, metadata: Dict[str, Any]) -> None:
+        """Add one document's indexed fields to the side index."""
+        for name in INDEXED_FIELDS:
+            if name in metadata:
+                value = metadata[name]
+                key = (name, value.lower() if isinstance(value, str) else value)
+                self._metadata_index.setdefault(key, set()).add(position)
+    
+    def _before_read(self) -> None:
+        """Hook run before every search (the shared store picks up other writers here)."""
+    
+    def _matching_positions(
+        self,
+        doc_type: str = "scene",
+        genre: Optional[str] = None,
+        max_retry_count: Optional[int] = None,
+        exclude_logline: Optional[str] = None,
+    ) -> set:
+        """FAISS positions of the documents that satisfy every given filter."""
+        self._before_read()
+        with self._lock:
+            positions = set(self._metadata_index.get(("type", doc_type), ()))
+            if genre is not None:
+                positions &= self._metadata_index.get(("genre", genre.lower()), set())
+            if max_retry_count is not None:
+                allowed: set = set()
+                for (name, value), members in self._metadata_index.items():
+                    if name == "retry_count" and isinstance(value, int) and value <= max_retry_count:
+                        allowed |= members
+                positions &= allowed
+            if exclude_logline:
+                positions -= self._metadata_index.get(("logline", exclude_logline.strip().lower()), set())
+            return positions
+    
+    def _search_params(self, index: Any, selector: "faiss.IDSelector", k: int) -> "faiss.SearchParameters":
+        """
+        Filtered search parameters matching the index type. They do not keep `selector`
+        alive, so the caller must hold on to it until the search returns.
+        """
+        import faiss
+        
+        params: faiss.SearchParameters
+        try:
+            faiss.extract_index_ivf(index)
+            ivf_params = faiss.SearchParametersIVF()
+            ivf_params.nprobe = self.nprobe
+            params = ivf_params
+        except RuntimeError:
+            if hasattr(index, "hnsw"):
+                # faiss's stubs omit SearchParametersHNSW, which every build ships
+                hnsw_params = faiss.SearchParametersHNSW()  # type: ignore[attr-defined]
+                hnsw_params.efSearch = max(self.ef_search, k)
+                params = hnsw_params
+            else:
+                params = faiss.SearchParameters()
+        params.sel = selector
+        return params
+    
+    def _search_positions(self, query: str, positions: set, k: int) -> List["Document"]:
+        """Nearest neighbours of `query` among `positions` only (exact, however rare the filter)."""
+        if not positions or k <= 0:
+            return []
+        
+        import faiss
+        import numpy as np
+        from langchain.schema import Document
+        
+        vector = np.array([self.embeddings.embed_query(query)], dtype=np.float32)
+        ids = np.fromiter(positions, dtype=np.int64)
+        k = min(k, len(ids))
+        with self._lock:
+            assert self.vectorstore is not None
+            index = self.vectorstore.index
+            selector = faiss.IDSelectorBatch(ids)
+            if isinstance(index, faiss.IndexFlat):
+                params = faiss.SearchParameters()
+                params.sel = selector
+                _, found = index.search(vector, k, params=params)
+                found = found[0]
+            elif len(ids) <= self.exact_filter_max:
+                # Approximate indexes probe only part of the data and can miss rare matches;
+                # small subsets are ranked exactly from their reconstructed vectors instead
+                distances = ((index.reconstruct_batch(ids) - vector) ** 2).sum(axis=1)
+                found = ids[np.argsort(distances, kind="stable")[:k]]
+            else:
+                _, found = index.search(vector, k, params=self._search_params(index, selector, k))
+                found = found[0]
+            doc_ids = [self.vectorstore.index_to_docstore_id[int(position)] for position in found if position >= 0]
+            # The docstore answers a missing id with an error string, not a Document
+            docs = [self.vectorstore.docstore.search(doc_id) for doc_id in doc_ids]
+            return [doc for doc in docs if isinstance(doc, Document)]
+    
+    def store_scene(self, scene_meta: Any) -> None:
+        """Store a scene in memory for future reference."""
+        self.store_scenes([scene_meta])
+    
+    def store_scenes(self, scenes: List[Any]) -> int:
+        """
+        Store many scenes with a single embeddings request.
+        
+        Writes land in the in-memory index immediately; the index is persisted by
+        flush(), which runs after MEMORY_FLUSH_EVERY unsaved scenes, after
+        MEMORY_FLUSH_INTERVAL seconds, and at interpreter exit. Returns the number
+        of scenes stored.
+        """
+        if not self.enabled or not self.vectorstore or not scenes:
+            return 0
+        if self.read_only:
+            logger.warning("Memory is memory-mapped read-only; scenes were not stored")
+            return 0
+        
+        try:
+            documents = [self._scene_document(scene) for scene in scenes]
+            texts = [doc.page_content for doc in documents]
+            vectors = self.embeddings.embed_documents(texts)
             
-            # Add to vectorstore
-            self.vectorstore.add_documents([doc])
+            with self._lock:
+                self._add_to_index(texts, vectors, [doc.metadata for doc in documents])
+                self._unsaved += len(documents)
+                due = self._unsaved >= self.flush_every
             
-            # Persist changes
-            self.vectorstore.save_local(self.persist_directory)
-            logger.info("Scene stored successfully in memory")
+            logger.info(f"Stored {len(documents)} scenes in memory ({self._unsaved} awaiting flush)")
+            if due:
+                self.flush()
+            else:
+                self._schedule_flush()
+            return len(documents)
             
         except Exception as e:
-            logger.warning(f"Could not store scene in memory: {e}")
+            logger.warning(f"Could not store scenes in memory: {e}")
+            return 0
+    
+    def _add_to_index(self, texts: List[str], vectors: List[List[float]], metadatas: List[Dict[str, Any]]) -> None:
+        """Add embedded documents to the FAISS index and the metadata side index (lock held)."""
+        assert self.vectorstore is not None
+        first_position = len(self.vectorstore.index_to_docstore_id)
+        self.vectorstore.add_embeddings(list(zip(texts, vectors)), metadatas=metadatas)
+        for offset, metadata in enumerate(metadatas):
+            self._index_metadata(first_position + offset, metadata)
+    
+    def _scene_document(self, scene_meta: Any) -> "Document":
+        """Build the memory document for a scene dict, dataclass or MixedModelOutput."""
+        from langchain.schema import Document
+        
+        if isinstance(scene_meta, dict):
+            scene_dict = scene_meta
+        elif is_dataclass(scene_meta):
+            scene_dict = {f.name: getattr(scene_meta, f.name) for f in fields(scene_meta)}
+        else:
+            scene_dict = vars(scene_meta)
+        
+        def value(*keys: str) -> Any:
+            """First non-empty value among equivalent field names."""
+            return next((scene_dict[key] for key in keys if scene_dict.get(key)), "")
+        
+        # MixedModelOutput field names are accepted alongside the original ones
+        structure = value('structure', 'structure_analysis')
+        content = f"""
+            Logline: {value('logline')}
+            Structure: {structure}
+            Outline: {value('scene_outline')}
+            Dialogue: {value('dialogue', 'first_draft_dialogue')}
+            Review: {value('review', 'final_screenplay')}
+            """
+        
+        return Document(
+            page_content=content.strip(),
+            metadata={
+                "type": "scene",
+                "logline": value('logline'),
+                "genre": self._extract_genre(structure),
+                "retry_count": scene_dict.get('retry_count', 0)
+            }
+        )
+    
+    def _schedule_flush(self) -> None:
+        """Make sure unsaved scenes are persisted within MEMORY_FLUSH_INTERVAL seconds."""
+        with self._lock:
+            if self._flush_timer is not None or not self._unsaved:
+                return
+            self._flush_timer = threading.Timer(self.flush_interval, self.flush)
+            self._flush_timer.daemon = True
+            self._flush_timer.start()
     
-    def retrieve_similar_scenes(self, query: str, k: int = 3) -> List[Document]:
+    def flush(self) -> None:
+        """
+        Persist unsaved scenes: save to temporary files, then atomically rename each
+        into place (loads check the pair matches, see _load_persisted).
+        """
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._unsaved or not self.vectorstore or self.read_only:
+                return
+            
+            try:
+                os.makedirs(self.persist_directory, exist_ok=True)
+                temp_name = f"index.tmp-{os.getpid()}"
+                self.vectorstore.save_local(self.persist_directory, index_name=temp_name)
+                # Readers never see a half-written file: each one is swapped in whole
+                for suffix in (".faiss", ".pkl"):
+                    os.replace(
+                        os.path.join(self.persist_directory, temp_name + suffix),
+                        os.path.join(self.persist_directory, "index" + suffix),
+                    )
+                logger.info(f"Flushed {self._unsaved} scenes to {self.persist_directory}")
+                self._unsaved = 0
+            except Exception as e:
+                logger.warning(f"Could not persist memory: {e}")
+    
+    def retrieve_similar_scenes(self, query: str, k: int = 3) -> List["Document"]:
         """Retrieve similar scenes based on query."""
         if not self.enabled or not self.vectorstore:
             return []
         
         try:
-            docs = self.vectorstore.similarity_search(query, k=k)
-            # Filter out system documents
-            scene_docs = [doc for doc in docs if doc.metadata.get('type') == 'scene']
+            # Search scene documents only, so system documents never take a slot
+            scene_docs = self._search_positions(query, self._matching_positions(), k)
             logger.info(f"Retrieved {len(scene_docs)} similar scenes for query: {query}")
             return scene_docs
         except Exception as e:
             logger.warning(f"Could not retrieve from memory: {e}")
             return []
     
-    def get_genre_examples(self, genre: str, k: int = 2) -> List[Document]:
+    def get_genre_examples(self, genre: str, k: int = 2) -> List["Document"]:
         """Get examples of scenes from a specific genre."""
         if not self.enabled or not self.vectorstore:
             return []
         
         try:
-            # Search for genre-specific content
+            # Search for genre-specific content within that genre's scenes only
             query = f"genre {genre} story structure character"
-            docs = self.vectorstore.similarity_search(query, k=k*2)
-            
-            # Filter by genre metadata
-            genre_docs = [
-                doc for doc in docs 
-                if doc.metadata.get('genre', '').lower() == genre.lower()
-                and doc.metadata.get('type') == 'scene'
-            ]
+            genre_docs = self._search_positions(query, self._matching_positions(genre=genre), k)
             
             logger.info(f"Retrieved {len(genre_docs)} examples for genre: {genre}")
-            return genre_docs[:k]
+            return genre_docs
         except Exception as e:
             logger.warning(f"Could not retrieve genre examples: {e}")
             return []
     
-    def get_successful_patterns(self, k: int = 5) -> List[Document]:
+    def retrieve_successful_scenes(
+        self,
+        query: str,
+        k: int = 3,
+        max_retry_count: int = 1,
+        exclude_logline: Optional[str] = None,
+    ) -> List["Document"]:
+        """
+        Scenes most similar to `query` among those generated with few retries,
+        leaving out earlier scenes for `exclude_logline`.
+        """
+        if not self.enabled or not self.vectorstore:
+            return []
+        
+        try:
+            positions = self._matching_positions(max_retry_count=max_retry_count, exclude_logline=exclude_logline)
+            docs = self._search_positions(query, positions, k)
+            logger.info(f"Retrieved {len(docs)} successful scenes similar to: {query}")
+            return docs
+        except Exception as e:
+            logger.warning(f"Could not retrieve successful scenes: {e}")
+            return []
+    
+    def get_successful_patterns(self, k: int = 5) -> List["Document"]:
         """Get scenes that were generated successfully without retries."""
         if not self.enabled or not self.vectorstore:
             return []
         
         try:
-            # Get all scenes
-            all_docs = self.vectorstore.similarity_search("scene structure dialogue", k=k*2)
-            
-            # Filter for successful scenes (low retry count)
-            successful_docs = [
-                doc for doc in all_docs 
-                if doc.metadata.get('type') == 'scene' 
-                and doc.metadata.get('retry_count', 0) <= 1
-            ]
+            # Successful scenes (low retry count) only
+            successful_docs = self._search_positions(
+                "scene structure dialogue", self._matching_positions(max_retry_count=1), k
+            )
             
             logger.info(f"Retrieved {len(successful_docs)} successful scene patterns")
-            return successful_docs[:k]
+            return successful_docs
         except Exception as e:
             logger.warning(f"Could not retrieve successful patterns: {e}")
             return []
@@ -165,13 +520,72 @@ class SceneMemory:
             return
             
         try:
-            if os.path.exists(self.persist_directory):
-                import shutil
-                shutil.rmtree(self.persist_directory)
-            self._initialize_vectorstore()
+            with self._lock:
+                if os.path.exists(self.persist_directory):
+                    import shutil
+                    shutil.rmtree(self.persist_directory)
+                self._unsaved = 0
+                self._initialize_vectorstore()
             logger.info("Memory cleared successfully")
         except Exception as e:
             logger.error(f"Could not clear memory: {e}")
 
-# Global memory instance
-scene_memory = SceneMemory()
+_scene_memory: Optional[SceneMemory] = None
+_scene_memory_lock = threading.Lock()
+
+def get_scene_memory() -> SceneMemory:
+    """
+    Return the process-wide memory, building it (and loading FAISS) on first use.
+    
+    MEMORY_SHARED=true selects the multi-process store in utils.shared_memory.
+    """
+    global _scene_memory
+    if _scene_memory is None:
+        with _scene_memory_lock:
+            if _scene_memory is None:
+                if os.getenv("MEMORY_SHARED", "false").lower() == "true":
+                    from utils.shared_memory import SharedSceneMemory
+                    _scene_memory = SharedSceneMemory()
+                else:
+                    _scene_memory = SceneMemory()
+    return _scene_memory
+
+# Retrieval runs off the pipeline thread so a deadline can be enforced; writes go
+# through a single thread so background stores never race each other
+_executors: Dict[str, ThreadPoolExecutor] = {}
+
+def _executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    """Shared executor for memory work, created on first use."""
+    with _scene_memory_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"scene-memory-{name}")
+        return _executors[name]
+
+def retrieve_with_deadline(query: str, k: int, timeout: float) -> Optional[List["Document"]]:
+    """
+    Successful scenes similar to logline `query` (never earlier scenes for that same
+    logline), or None when memory does not answer within `timeout` seconds (the
+    lookup keeps running and warms memory for the next call).
+    """
+    future = _executor("read", 2).submit(
+        lambda: get_scene_memory().retrieve_successful_scenes(query, k, exclude_logline=query)
+    )
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        logger.info(f"Memory retrieval exceeded {timeout:.2f}s deadline; continuing without references")
+        return None
+
+def warm_scene_memory() -> None:
+    """Start loading memory in the background so the first retrieval meets its deadline."""
+    _executor("read", 2).submit(get_scene_memory)
+
+def store_in_background(scene: Any) -> "Future[int]":
+    """Queue a finished scene for storage without blocking the caller."""
+    return _executor("write", 1).submit(lambda: get_scene_memory().store_scenes([scene]))
+
+def __getattr__(name: str) -> Any:
+    """Keep `from utils.memory import scene_memory` working, built lazily."""
+    if name == "scene_memory":
+        return get_scene_memory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,270 @@
+"""
+Local per-stage latency, token and cost instrumentation for SceneSmith.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field, asdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from crewai.utilities.events import TaskCompletedEvent, TaskFailedEvent, TaskStartedEvent, crewai_event_bus
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M (input, output) tokens; override or extend with MODEL_PRICES='{"model": [in, out]}'
+DEFAULT_MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4": (30.00, 60.00),
+    "claude-3-5-haiku": (0.80, 4.00),
+    "claude-3-5-sonnet": (3.00, 15.00),
+    "claude-3-7-sonnet": (3.00, 15.00),
+    "claude-sonnet-4": (3.00, 15.00),
+    "claude-opus-4": (15.00, 75.00),
+}
+
+# Prompt-cache pricing relative to the input price: (cache read, cache write)
+CACHE_PRICE_MULTIPLIERS: Dict[str, Tuple[float, float]] = {
+    "claude": (0.10, 1.25),
+    "gpt": (0.50, 1.00),
+}
+
+def _model_prices() -> Dict[str, Tuple[float, float]]:
+    """Price table with MODEL_PRICES overrides applied."""
+    prices = dict(DEFAULT_MODEL_PRICES)
+    overrides = os.getenv("MODEL_PRICES")
+    if overrides:
+        try:
+            prices.update({model: tuple(price) for model, price in json.loads(overrides).items()})
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Ignoring invalid MODEL_PRICES: {e}")
+    return prices
+
+def model_price(model: str) -> Optional[Tuple[float, float]]:
+    """(input, output) USD per 1M tokens for `model`, or None if it is not in the price table."""
+    name = model.split("/")[-1]
+    prices = _model_prices()
+    # Longest matching prefix wins, so gpt-4o-mini is not priced as gpt-4o
+    matches = [key for key in prices if name.startswith(key)]
+    return prices[max(matches, key=len)] if matches else None
+
+def estimate_cost(
+    model: str,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cache_read_tokens: int = 0,
+    cache_write_tokens: int = 0,
+) -> float:
+    """Estimated USD cost of one call (0 for unknown models); prompt_tokens includes cached tokens."""
+    price = model_price(model)
+    if price is None:
+        return 0.0
+    input_price, output_price = price
+    name = model.split("/")[-1]
+    read_rate, write_rate = next(
+        (rates for prefix, rates in CACHE_PRICE_MULTIPLIERS.items() if name.startswith(prefix)), (1.0, 1.0)
+    )
+    fresh_tokens = max(0, prompt_tokens - cache_read_tokens - cache_write_tokens)
+    input_cost = input_price * (
+        fresh_tokens + cache_read_tokens * read_rate + cache_write_tokens * write_rate
+    )
+    return (input_cost + completion_tokens * output_price) / 1_000_000
+
+@dataclass
+class CallMetrics:
+    """One LLM call as seen by SceneSmithLLM."""
+    agent: str
+    model: str
+    provider: str
+    wall_time: float
+    queue_time: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+    cached: bool = False
+    token_source: str = "provider"  # provider | tiktoken
+    prompt_tokens_saved: int = 0  # removed by context compaction (utils.prompt_budget)
+    cache_read_tokens: int = 0  # prompt tokens served from the provider's prompt cache
+    cache_write_tokens: int = 0  # prompt tokens written to the provider's prompt cache
+    error: Optional[str] = None
+
+    @property
+    def fresh_prompt_tokens(self) -> int:
+        """Prompt tokens processed without the provider's prompt cache."""
+        return max(0, self.prompt_tokens - self.cache_read_tokens - self.cache_write_tokens)
+
+@dataclass
+class StageMetrics:
+    """Aggregated numbers for one pipeline stage."""
+    stage: str
+    agent: str
+    model: str
+    wall_time: float = 0.0
+    queue_time: float = 0.0
+    llm_calls: int = 0
+    cached_calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    prompt_tokens_saved: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    cost_usd: float = 0.0
+
+_record_lock = threading.Lock()
+
+@dataclass
+class ProductionMetrics:
+    """Every call and stage timing recorded while producing one scene."""
+    run_id: str = ""
+    stage_names: Dict[str, str] = field(default_factory=dict)  # agent -> stage
+    calls: List[CallMetrics] = field(default_factory=list)
+    stage_windows: Dict[str, List[float]] = field(default_factory=dict)  # agent -> [start, end]
+    total_wall_time: float = 0.0
+
+    def record_call(self, call: CallMetrics) -> None:
+        """Add one LLM call (thread-safe)."""
+        with _record_lock:
+            self.calls.append(call)
+
+    def mark_stage(self, agent: str, event: str) -> None:
+        """Record a stage start or end timestamp."""
+        with _record_lock:
+            window = self.stage_windows.setdefault(agent, [0.0, 0.0])
+            window[0 if event == "start" else 1] = time.monotonic()
+
+    def stages(self) -> List[StageMetrics]:
+        """Per-stage aggregates, in pipeline order where known."""
+        by_agent: Dict[str, StageMetrics] = {}
+        for call in self.calls:
+            stage = by_agent.setdefault(
+                call.agent,
+                StageMetrics(stage=self.stage_names.get(call.agent, call.agent), agent=call.agent, model=call.model),
+            )
+            stage.queue_time += call.queue_time
+            stage.llm_calls += 1
+            stage.cached_calls += int(call.cached)
+            stage.prompt_tokens += call.prompt_tokens
+            stage.completion_tokens += call.completion_tokens
+            stage.prompt_tokens_saved += call.prompt_tokens_saved
+            stage.cache_read_tokens += call.cache_read_tokens
+            stage.cache_write_tokens += call.cache_write_tokens
+            stage.cost_usd += call.cost_usd
+
+        for agent, (start, end) in self.stage_windows.items():
+            if agent in by_agent and start and end:
+                by_agent[agent].wall_time = end - start
+
+        order = list(self.stage_names)
+        return sorted(by_agent.values(), key=lambda s: order.index(s.agent) if s.agent in order else len(order))
+
+    @property
+    def total_cost_usd(self) -> float:
+        """Estimated cost of the whole scene."""
+        return sum(call.cost_usd for call in self.calls)
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens across all calls."""
+        return sum(call.prompt_tokens + call.completion_tokens for call in self.calls)
+
+    @property
+    def total_prompt_tokens_saved(self) -> int:
+        """Prompt tokens removed by context compaction across all calls."""
+        return sum(call.prompt_tokens_saved for call in self.calls)
+
+    @property
+    def total_cache_read_tokens(self) -> int:
+        """Prompt tokens served from provider prompt caches across all calls."""
+        return sum(call.cache_read_tokens for call in self.calls)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary suitable for JSON export."""
+        return {
+            "run_id": self.run_id,
+            "total_wall_time": self.total_wall_time,
+            "total_cost_usd": self.total_cost_usd,
+            "total_tokens": self.total_tokens,
+            "total_prompt_tokens_saved": self.total_prompt_tokens_saved,
+            "total_cache_read_tokens": self.total_cache_read_tokens,
+            "stages": [asdict(stage) for stage in self.stages()],
+            "calls": [{**asdict(call), "fresh_prompt_tokens": call.fresh_prompt_tokens} for call in self.calls],
+        }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        """JSON export."""
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format (one gauge family per stage metric)."""
+        families = [
+            ("stage_wall_seconds", "Wall time per pipeline stage", "wall_time"),
+            ("stage_queue_seconds", "Time spent waiting on provider rate limits", "queue_time"),
+            ("stage_llm_calls", "LLM calls per stage", "llm_calls"),
+            ("stage_prompt_tokens", "Prompt tokens per stage", "prompt_tokens"),
+            ("stage_completion_tokens", "Completion tokens per stage", "completion_tokens"),
+            ("stage_prompt_tokens_saved", "Prompt tokens removed by context compaction", "prompt_tokens_saved"),
+            ("stage_cache_read_tokens", "Prompt tokens served from the provider prompt cache", "cache_read_tokens"),
+            ("stage_cache_write_tokens", "Prompt tokens written to the provider prompt cache", "cache_write_tokens"),
+            ("stage_cost_usd", "Estimated cost per stage in USD", "cost_usd"),
+        ]
+        stages = self.stages()
+        lines: List[str] = []
+        for name, help_text, attribute in families:
+            lines.append(f"# HELP scenesmith_{name} {help_text}")
+            lines.append(f"# TYPE scenesmith_{name} gauge")
+            for stage in stages:
+                labels = f'run_id="{self.run_id}",stage="{stage.stage}",agent="{stage.agent}",model="{stage.model}"'
+                lines.append(f"scenesmith_{name}{{{labels}}} {getattr(stage, attribute)}")
+        lines.append("# HELP scenesmith_scene_wall_seconds Wall time for the whole scene")
+        lines.append("# TYPE scenesmith_scene_wall_seconds gauge")
+        lines.append(f'scenesmith_scene_wall_seconds{{run_id="{self.run_id}"}} {self.total_wall_time}')
+        lines.append("# HELP scenesmith_scene_cost_usd Estimated cost for the whole scene")
+        lines.append("# TYPE scenesmith_scene_cost_usd gauge")
+        lines.append(f'scenesmith_scene_cost_usd{{run_id="{self.run_id}"}} {self.total_cost_usd}')
+        return "\n".join(lines) + "\n"
+
+_current_metrics: ContextVar[Optional[ProductionMetrics]] = ContextVar("scene_smith_metrics", default=None)
+
+@contextmanager
+def collect_metrics(metrics: ProductionMetrics) -> Iterator[ProductionMetrics]:
+    """Attribute every LLM call and task in this context (and its copies) to `metrics`."""
+    token = _current_metrics.set(metrics)
+    started = time.perf_counter()
+    try:
+        yield metrics
+    finally:
+        metrics.total_wall_time = time.perf_counter() - started
+        _current_metrics.reset(token)
+
+def current_metrics() -> Optional[ProductionMetrics]:
+    """Metrics collector for the scene running in this context, if any."""
+    return _current_metrics.get()
+
+def _task_agent_name(task: Any) -> Optional[str]:
+    """ModelFactory agent_name of the agent running `task`."""
+    agent = getattr(task, "agent", None)
+    return getattr(getattr(agent, "llm", None), "agent_name", None)
+
+@crewai_event_bus.on(TaskStartedEvent)
+def _on_task_started(source: Any, event: TaskStartedEvent) -> None:
+    """Open the stage window (events fire on the executing thread)."""
+    metrics, agent = current_metrics(), _task_agent_name(source)
+    if metrics and agent:
+        metrics.mark_stage(agent, "start")
+
+@crewai_event_bus.on(TaskCompletedEvent)
+def _on_task_completed(source: Any, event: TaskCompletedEvent) -> None:
+    """Close the stage window."""
+    metrics, agent = current_metrics(), _task_agent_name(source)
+    if metrics and agent:
+        metrics.mark_stage(agent, "end")
+
+@crewai_event_bus.on(TaskFailedEvent)
+def _on_task_failed(source: Any, event: TaskFailedEvent) -> None:
+    """Close the stage window on failure too, so partial runs still report timings."""
+    _on_task_completed(source, event)
@@ -3,30 +3,596 @@ CrewAI-compatible model factory for OpenAI and Anthropic models.
 """
 
 import os
+import copy
+import time
 import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+import httpx
+import litellm
 from crewai import LLM
+from litellm.exceptions import RateLimitError
+from litellm.llms.custom_httpx.http_handler import HTTPHandler
+from litellm.integrations.custom_logger import CustomLogger
+from utils.cancellation import CancellationToken, SceneCancelled, current_token
+from utils.llm_cache import ResponseCache, get_response_cache
+from utils.metrics import CallMetrics, current_metrics, estimate_cost
+from utils.prompt_budget import compact_messages
+from utils.rate_limiter import get_rate_limiter, retry_after_seconds
+from utils.scoring import rank_candidates
+from utils.streaming import emit_chunk, has_listener, stream_to
+from utils.tokens import count_message_tokens, count_tokens
 
 logger = logging.getLogger(__name__)
 
+# How often a call waiting on the provider checks its scene's cancellation token
+CANCEL_POLL_SECONDS = 0.1
+
+def estimate_prompt_tokens(messages: Union[str, List[Dict[str, Any]]]) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) used for quota booking."""
+    if isinstance(messages, str):
+        return len(messages) // 4 + 1
+    return sum(len(_content_text(message.get("content", ""))) for message in messages) // 4 + 1
+
+def _content_text(content: Any) -> str:
+    """Text of a message content: a string or a list of content blocks."""
+    if isinstance(content, list):
+        return "".join(block.get("text", "") if isinstance(block, dict) else str(block) for block in content)
+    return str(content)
+
+def _usage_value(usage: Any, key: str) -> int:
+    """Read a usage counter from either a dict or a litellm Usage object."""
+    value = usage.get(key) if isinstance(usage, dict) else getattr(usage, key, None)
+    return int(value or 0)
+
+class UsageCollector(CustomLogger):
+    """Captures the provider-reported token usage of a single LLM call."""
+
+    def __init__(self) -> None:
+        """Start with no usage recorded."""
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cache_read_tokens = 0
+        self.cache_write_tokens = 0
+
+    def log_success_event(
+        self,
+        kwargs: Dict[str, Any],
+        response_obj: Dict[str, Any],
+        start_time: float,
+        end_time: float,
+    ) -> None:
+        """Record usage handed over by crewai after the completion returns."""
+        # litellm also calls registered loggers with a ModelResponse; crewai passes a dict
+        if not isinstance(response_obj, dict) or not response_obj.get("usage"):
+            return
+        usage = response_obj["usage"]
+        self.prompt_tokens += _usage_value(usage, "prompt_tokens")
+        self.completion_tokens += _usage_value(usage, "completion_tokens")
+        # Anthropic reports cache reads/writes; OpenAI's automatic caching only reports reads
+        details = (
+            usage.get("prompt_tokens_details") if isinstance(usage, dict)
+            else getattr(usage, "prompt_tokens_details", None)
+        )
+        self.cache_read_tokens += _usage_value(usage, "cache_read_input_tokens") or _usage_value(details, "cached_tokens")
+        self.cache_write_tokens += _usage_value(usage, "cache_creation_input_tokens")
+
+    @property
+    def total_tokens(self) -> int:
+        """Prompt plus completion tokens."""
+        return self.prompt_tokens + self.completion_tokens
+
+class SceneSmithLLM(LLM):
+    """
+    CrewAI LLM with SceneSmith's call pipeline:
+    response cache -> provider rate limiter -> provider call.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        agent_name: str = "",
+        use_cache: bool = True,
+        prompt_caching: bool = False,
+        candidates: int = 1,
+        **kwargs: Any,
+    ) -> None:
+        """Create the LLM and attach the process-wide limiter for `provider`."""
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.agent_name = agent_name
+        self.prompt_caching = prompt_caching and provider == "anthropic"
+        self.cache_min_tokens = int(os.getenv("ANTHROPIC_CACHE_MIN_TOKENS", "1024"))
+        self.candidates = max(1, candidates)
+        self.rate_limiter = get_rate_limiter(provider)
+        if provider == "anthropic" and pooled_http_handler() is not None:
+            # litellm builds a new HTTPHandler per non-streaming Anthropic call unless given one
+            self.additional_params.setdefault("client", pooled_http_handler())
+        excluded = {name.strip() for name in os.getenv("LLM_CACHE_EXCLUDE", "").split(",") if name.strip()}
+        self.use_cache = use_cache and agent_name not in excluded
+        self._streaming_copy: Optional["SceneSmithLLM"] = None
+
+    def _cache_key(self, messages: Union[str, List[Dict[str, str]]], tools: Optional[List[dict]]) -> str:
+        """Key covering everything that determines the response."""
+        return ResponseCache.make_key({
+            "model": self.model,
+            "temperature": self.temperature,
+            "max_tokens": self.max_tokens,
+            "stop": self.stop,
+            "messages": messages,
+            "tools": tools,
+        })
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        """Fit the prompt budget, serve from cache when possible, otherwise call the provider."""
+        messages, compaction = compact_messages(messages, self.agent_name, self.model)
+        messages = self._mark_cacheable_prefix(messages)
+
+        cache = get_response_cache() if self.use_cache else None
+        cache_key = self._cache_key(messages, tools) if cache else ""
+        if cache:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"LLM cache hit for {self.agent_name or self.model}")
+                self._record_metrics(wall_time=0.0, cached=True, prompt_tokens_saved=compaction.saved_tokens)
+                emit_chunk(self.agent_name, cached)  # replay as a single chunk for stream listeners
+                return cached
+
+        if self.candidates > 1 and not tools:
+            response = self._best_of_candidates(messages, callbacks, available_functions, compaction.saved_tokens)
+        else:
+            response = self._call_provider(messages, tools, callbacks, available_functions, compaction.saved_tokens)
+
+        if cache and isinstance(response, str) and response.strip():
+            cache.put(cache_key, response, {"model": self.model, "agent": self.agent_name})
+        return response
+
+    def _best_of_candidates(
+        self,
+        messages: Union[str, List[Dict[str, Any]]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+        prompt_tokens_saved: int = 0,
+    ) -> Union[str, Any]:
+        """Sample `candidates` responses concurrently and return the best by the local scorer."""
+        def sample(index: int) -> Union[str, Any]:
+            with stream_to(None):  # interleaved candidate streams are noise; the winner is replayed below
+                return self._call_provider(
+                    messages, None, callbacks, available_functions, prompt_tokens_saved if index == 0 else 0
+                )
+
+        with ThreadPoolExecutor(max_workers=self.candidates, thread_name_prefix="candidate") as pool:
+            futures = [pool.submit(contextvars.copy_context().run, sample, index) for index in range(self.candidates)]
+        responses: List[str] = []
+        errors: List[BaseException] = []
+        for future in futures:
+            try:
+                response = future.result()
+            except Exception as e:
+                errors.append(e)
+                continue
+            if isinstance(response, str) and response.strip():
+                responses.append(response)
+        if not responses:
+            if errors:
+                raise errors[0]
+            return ""
+
+        ranked = rank_candidates(responses, self.agent_name)
+        best = ranked[0]
+        logger.info(
+            f"Picked candidate {best.index + 1}/{len(responses)} for {self.agent_name or self.model} "
+            f"(score {best.total:.2f}; format {best.format_score:.2f}, length {best.length_score:.2f} "
+            f"at {best.pages:.1f} pages, freshness {best.freshness_score:.2f})"
+        )
+        emit_chunk(self.agent_name, best.text)
+        return best.text
+
+    def _mark_cacheable_prefix(self, messages: Union[str, List[Dict[str, Any]]]) -> Union[str, List[Dict[str, Any]]]:
+        """
+        Mark the static system message (role, backstory with the agent's standing
+        instructions, goal and tool descriptions) as an Anthropic prompt-cache
+        breakpoint. Prefixes shorter than the provider minimum
+        (ANTHROPIC_CACHE_MIN_TOKENS) cannot be cached, so they are sent unchanged.
+        """
+        if not self.prompt_caching or isinstance(messages, str) or not messages:
+            return messages
+        system = messages[0]
+        content = system.get("content")
+        if system.get("role") != "system" or not isinstance(content, str):
+            return messages
+        if count_tokens(content, self.model) < self.cache_min_tokens:
+            return messages
+
+        block = {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+        return [{**system, "content": [block]}, *messages[1:]]
+
+    def _call_provider(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]],
+        callbacks: Optional[List[Any]],
+        available_functions: Optional[Dict[str, Any]],
+        prompt_tokens_saved: int = 0,
+    ) -> Union[str, Any]:
+        """Wait for quota, call the provider, then reconcile the booked tokens."""
+        token = current_token()
+        if token:
+            token.check(self.agent_name)
+        estimated = estimate_prompt_tokens(messages) + (self.max_tokens or 0)
+        queue_time = self.rate_limiter.acquire(estimated)
+
+        llm = self._streaming_twin() if has_listener() and not self.stream and self.candidates == 1 else self
+        usage = UsageCollector()
+        started = time.perf_counter()
+        response: Union[str, Any] = None
+        error: Optional[str] = None
+        try:
+            if token:
+                token.check(self.agent_name)
+            if token and token.can_cancel(self.agent_name):
+                response = llm._complete_unless_cancelled(
+                    token, messages, tools, [*(callbacks or []), usage], available_functions
+                )
+            else:
+                response = llm._complete(messages, tools, [*(callbacks or []), usage], available_functions)
+            return response
+        except RateLimitError as e:
+            self.rate_limiter.penalize(retry_after_seconds(e))
+            error = type(e).__name__
+            raise
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            self.rate_limiter.reconcile(estimated, usage.total_tokens)
+            self._record_metrics(
+                wall_time=time.perf_counter() - started,
+                queue_time=queue_time,
+                usage=usage,
+                messages=messages,
+                response=response,
+                prompt_tokens_saved=prompt_tokens_saved,
+                error=error,
+            )
+
+    def _streaming_twin(self) -> "SceneSmithLLM":
+        """
+        A copy of this LLM that streams, for calls someone is listening to. Pooled
+        LLMs are shared by concurrent scenes, so `stream` is never flipped in place.
+        """
+        if self._streaming_copy is None:
+            twin = copy.copy(self)
+            twin.stream = True
+            self._streaming_copy = twin
+        return self._streaming_copy
+
+    def _record_metrics(
+        self,
+        wall_time: float,
+        queue_time: float = 0.0,
+        usage: Optional[UsageCollector] = None,
+        messages: Optional[Union[str, List[Dict[str, str]]]] = None,
+        response: Any = None,
+        cached: bool = False,
+        prompt_tokens_saved: int = 0,
+        error: Optional[str] = None,
+    ) -> None:
+        """Attribute this call to the scene being produced, if metrics are being collected."""
+        metrics = current_metrics()
+        if metrics is None:
+            return
+
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+        cache_read_tokens = usage.cache_read_tokens if usage else 0
+        cache_write_tokens = usage.cache_write_tokens if usage else 0
+        token_source = "provider"
+        if not cached and usage is not None and usage.total_tokens == 0 and error is None:
+            # Streaming responses and some providers report no usage; count locally instead
+            prompt_tokens = count_message_tokens(messages or [], self.model)
+            completion_tokens = count_tokens(response if isinstance(response, str) else "", self.model)
+            token_source = "tiktoken"
+
+        metrics.record_call(CallMetrics(
+            agent=self.agent_name,
+            model=self.model,
+            provider=self.provider,
+            wall_time=wall_time,
+            queue_time=queue_time,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=0.0 if cached else estimate_cost(
+                self.model, prompt_tokens, completion_tokens, cache_read_tokens, cache_write_tokens
+            ),
+            cached=cached,
+            token_source=token_source,
+            prompt_tokens_saved=prompt_tokens_saved,
+            cache_read_tokens=cache_read_tokens,
+            cache_write_tokens=cache_write_tokens,
+            error=error,
+        ))
+
+    def _complete_unless_cancelled(
+        self,
+        token: CancellationToken,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]],
+        callbacks: List[Any],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> Union[str, Any]:
+        """
+        Run the round trip on the provider pool and stop waiting as soon as the
+        token is cancelled; the abandoned request ends at the HTTP timeout.
+        """
+        future = get_provider_executor().submit(
+            contextvars.copy_context().run, self._complete, messages, tools, callbacks, available_functions
+        )
+        while True:
+            done, _ = wait([future], timeout=CANCEL_POLL_SECONDS)
+            if done:
+                return future.result()
+            try:
+                token.check(self.agent_name)
+            except SceneCancelled as e:
+                future.cancel()
+                logger.info(f"Abandoned in-flight {self.agent_name or self.model} call: {e}")
+                raise
+
+    def _complete(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]],
+        callbacks: List[Any],
+        available_functions: Optional[Dict[str, Any]],
+    ) -> Union[str, Any]:
+        """The network round trip itself (overridden by offline backends)."""
+        return super().call(messages, tools, callbacks, available_functions)
+
+_provider_executor: Optional[ThreadPoolExecutor] = None
+_provider_executor_size = 0
+_provider_executor_lock = threading.Lock()
+
+def get_provider_executor() -> ThreadPoolExecutor:
+    """
+    Process-wide pool for cancellable provider round trips: LLM_CALL_THREADS
+    workers, or more once reserve_provider_threads() asks for them.
+    """
+    global _provider_executor, _provider_executor_size
+    with _provider_executor_lock:
+        if _provider_executor is None:
+            _provider_executor_size = max(_provider_executor_size, int(os.getenv("LLM_CALL_THREADS", "64")))
+            _provider_executor = ThreadPoolExecutor(max_workers=_provider_executor_size, thread_name_prefix="llm-call")
+        return _provider_executor
+
+def reserve_provider_threads(calls: int) -> None:
+    """
+    Grow the provider pool so `calls` concurrent round trips never queue for a
+    thread. The old pool finishes its calls and then exits.
+    """
+    global _provider_executor, _provider_executor_size
+    with _provider_executor_lock:
+        if calls <= _provider_executor_size:
+            return
+        _provider_executor_size = calls
+        if _provider_executor is not None:
+            _provider_executor.shutdown(wait=False)
+            _provider_executor = None
+
+def http_timeout() -> float:
+    """Seconds before an LLM HTTP request is abandoned (LLM_HTTP_TIMEOUT)."""
+    return float(os.getenv("LLM_HTTP_TIMEOUT", "120"))
+
+_http_pool_configured = False
+
+def _keepalive_client() -> httpx.Client:
+    """httpx client with the shared keep-alive pool limits (HTTP_MAX_*)."""
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=int(os.getenv("HTTP_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("HTTP_MAX_KEEPALIVE", "20")),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60")),
+        ),
+        timeout=httpx.Timeout(timeout=http_timeout(), connect=5.0),
+    )
+
+def configure_http_pool() -> None:
+    """
+    Share keep-alive httpx pools across every client litellm builds: OpenAI SDK
+    clients use `litellm.client_session`; litellm's own HTTP handler (Anthropic)
+    uses `litellm.module_level_client` for streams and the handler passed per call.
+    """
+    global _http_pool_configured
+    if _http_pool_configured:
+        return
+    if litellm.client_session is None:
+        litellm.client_session = _keepalive_client()
+    litellm.module_level_client = HTTPHandler(client=_keepalive_client())
+    _http_pool_configured = True
+    logger.info("Configured shared keep-alive HTTP pools for LLM clients")
+
+def pooled_http_handler() -> Optional[HTTPHandler]:
+    """The shared handler for litellm's native (Anthropic) calls, once the pool is configured."""
+    return litellm.module_level_client if _http_pool_configured else None
+
 class ModelFactory:
     """Factory for creating CrewAI-compatible LLM instances."""
-    
+
+    # Process-wide pool: one LLM per (provider, model, parameters, agent)
+    _pool: Dict[Tuple[Any, ...], LLM] = {}
+    _pool_lock = threading.Lock()
+
+    @staticmethod
+    def _streaming_enabled(stream: Optional[bool]) -> bool:
+        """
+        Stream every call when asked explicitly or via LLM_STREAMING. Otherwise
+        only calls with a chunk listener (--stream, stream_scene) stream.
+        """
+        if stream is not None:
+            return stream
+        return os.getenv("LLM_STREAMING", "false").lower() == "true"
+
+    @staticmethod
+    def max_calls_per_scene(agent_names: Iterable[str]) -> int:
+        """Upper bound on one scene's concurrent provider calls: every stage at once, each with its candidates."""
+        return sum(ModelFactory._candidate_count(agent_name) for agent_name in agent_names)
+
+    @staticmethod
+    def _candidate_count(agent_name: str) -> int:
+        """
+        Candidates sampled per call: LLM_CANDIDATES_<AGENT> if set, otherwise
+        LLM_CANDIDATES for the agents listed in LLM_CANDIDATE_AGENTS.
+        """
+        override = os.getenv(f"LLM_CANDIDATES_{agent_name.upper()}")
+        if override is not None:
+            return max(1, int(override))
+        agents = {name.strip() for name in os.getenv("LLM_CANDIDATE_AGENTS", "dialogue,reviewer").split(",")}
+        return max(1, int(os.getenv("LLM_CANDIDATES", "1"))) if agent_name in agents else 1
+
     @staticmethod
-    def create_openai_llm(temperature: float = 0.4, max_tokens: int = 1500) -> LLM:
-        """Create OpenAI LLM for CrewAI agents."""
-        return LLM(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o"),
+    def _llm_class() -> Type[SceneSmithLLM]:
+        """LLM implementation selected by LLM_BACKEND (`live` or the offline `fake`)."""
+        backend = os.getenv("LLM_BACKEND", "live").lower()
+        if backend == "fake":
+            from utils.fake_llm import FakeLLM  # offline stub; imported lazily to avoid a cycle
+            return FakeLLM
+        if backend != "live":
+            raise ValueError(f"Unknown LLM_BACKEND '{backend}' (expected 'live' or 'fake')")
+        return SceneSmithLLM
+
+    @classmethod
+    def _get_or_create(cls, provider: str, **params: Any) -> LLM:
+        """Return the pooled LLM for these parameters, creating it on first use."""
+        llm_class = cls._llm_class()
+        if os.getenv("LLM_POOL_ENABLED", "true").lower() != "true":
+            return llm_class(provider=provider, **params)
+
+        key = (llm_class.__name__, provider, *sorted(params.items()))
+        with cls._pool_lock:
+            llm = cls._pool.get(key)
+            if llm is None:
+                configure_http_pool()
+                llm = llm_class(provider=provider, **params)
+                cls._pool[key] = llm
+            return llm
+
+    @classmethod
+    def clear_pool(cls) -> None:
+        """Forget every pooled LLM (the next create_* call builds a new one)."""
+        with cls._pool_lock:
+            cls._pool.clear()
+
+    @staticmethod
+    def create_openai_llm(
+        temperature: float = 0.4,
+        max_tokens: int = 1500,
+        agent_name: str = "",
+        use_cache: bool = True,
+        stream: Optional[bool] = None,
+        model: Optional[str] = None,
+    ) -> LLM:
+        """Create OpenAI LLM for CrewAI agents (routed per ROUTING_TABLE when routing is enabled)."""
+        if model is None and ModelFactory._routed(agent_name):
+            return ModelFactory.create_routed_llm(agent_name, temperature, max_tokens, use_cache, stream)
+        candidates = ModelFactory._candidate_count(agent_name)
+        return ModelFactory._get_or_create(
+            provider="openai",
+            agent_name=agent_name,
+            use_cache=use_cache,
+            candidates=candidates,
+            model=model or os.getenv("OPENAI_MODEL", "gpt-4o"),
             temperature=temperature,
             max_tokens=max_tokens,
-            api_key=os.getenv("OPENAI_API_KEY")
+            api_key=os.getenv("OPENAI_API_KEY"),
+            timeout=http_timeout(),
+            # Candidates are ranked only once all have finished, so they are never streamed
+            stream=ModelFactory._streaming_enabled(stream) and candidates == 1,
         )
-    
+
     @staticmethod
-    def create_claude_llm(temperature: float = 0.4, max_tokens: int = 1500) -> LLM:
-        """Create Anthropic Claude LLM for CrewAI agents."""
-        return LLM(
-            model=f"anthropic/{os.getenv('ANTHROPIC_MODEL', 'claude-3-5-sonnet-20241022')}",
+    def create_claude_llm(
+        temperature: float = 0.4,
+        max_tokens: int = 1500,
+        agent_name: str = "",
+        use_cache: bool = True,
+        stream: Optional[bool] = None,
+        prompt_caching: Optional[bool] = None,
+        model: Optional[str] = None,
+    ) -> LLM:
+        """
+        Create Anthropic Claude LLM for CrewAI agents (routed per ROUTING_TABLE
+        when routing is enabled). With prompt caching (ANTHROPIC_PROMPT_CACHING,
+        on by default) the static system prompt is marked cacheable so repeat
+        scenes read it from Anthropic's prompt cache.
+        """
+        if model is None and ModelFactory._routed(agent_name):
+            return ModelFactory.create_routed_llm(agent_name, temperature, max_tokens, use_cache, stream)
+        if prompt_caching is None:
+            prompt_caching = os.getenv("ANTHROPIC_PROMPT_CACHING", "true").lower() == "true"
+        candidates = ModelFactory._candidate_count(agent_name)
+        return ModelFactory._get_or_create(
+            provider="anthropic",
+            agent_name=agent_name,
+            use_cache=use_cache,
+            prompt_caching=prompt_caching,
+            candidates=candidates,
+            model=f"anthropic/{model or os.getenv('ANTHROPIC_MODEL', 'claude-3-5-sonnet-20241022')}",
             temperature=temperature,
             max_tokens=max_tokens,
-            api_key=os.getenv("ANTHROPIC_API_KEY")
-        )
\ No newline at end of file
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            timeout=http_timeout(),
+            stream=ModelFactory._streaming_enabled(stream) and candidates == 1,
+        )
+
+    @staticmethod
+    def _routed(agent_name: str) -> bool:
+        """True when ROUTING_ENABLED is set and the agent has a routing table entry."""
+        if os.getenv("ROUTING_ENABLED", "false").lower() != "true":
+            return False
+        from utils.routing import routing_enabled  # imports this module; loaded lazily
+        return routing_enabled(agent_name)
+
+    @staticmethod
+    def create_routed_llm(
+        agent_name: str,
+        temperature: float = 0.4,
+        max_tokens: int = 1500,
+        use_cache: bool = True,
+        stream: Optional[bool] = None,
+    ) -> LLM:
+        """LLM that picks one of the agent's routes per call, from live latency and error stats."""
+        from utils.routing import RoutedLLM, routing_table
+
+        routes = routing_table()[agent_name]
+        creators: Dict[str, Callable[..., LLM]] = {
+            "openai": ModelFactory.create_openai_llm,
+            "anthropic": ModelFactory.create_claude_llm,
+        }
+        delegates = {
+            route.key: creators[route.provider](
+                temperature=temperature,
+                max_tokens=max_tokens,
+                agent_name=agent_name,
+                use_cache=use_cache,
+                stream=stream,
+                model=route.model,
+            )
+            for route in routes
+        }
+        logger.info(f"Routing {agent_name} across {', '.join(route.key for route in routes)}")
+        return RoutedLLM(
+            agent_name,
+            routes,
+            delegates,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=delegates[routes[0].key].stream,
+        )
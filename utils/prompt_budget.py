@@ -0,0 +1,151 @@
+"""
+Per-agent prompt token budgets with compaction of upstream task context.
+
+crewai appends the outputs of a task's `context` tasks to its prompt after the
+marker below, separated by a fixed divider. Compaction is opt-in
+(PROMPT_BUDGET_ENABLED, or a PROMPT_BUDGET_<AGENT> for one agent). When an
+agent's assembled prompt is over budget, older sections are reduced to their
+headings, labels and list items. The most recent upstream output (the one the
+agent builds on) is always sent whole.
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple, Union
+from utils.tokens import count_message_tokens, count_tokens
+
+logger = logging.getLogger(__name__)
+
+# crewai i18n "task_with_context" and formatter divider (crewai 0.134)
+CONTEXT_MARKER = "This is the context you're working with:\n"
+CONTEXT_DIVIDER = "\n\n----------\n\n"
+# Text crewai appends after the context: optional memory, then the "task" slice
+CONTEXT_TERMINATORS = ("\n\n# Useful context:", "\n\nBegin! ")
+CONDENSED_NOTE = "[... condensed to fit the prompt budget ...]"
+
+# Prompt budgets in tokens once PROMPT_BUDGET_ENABLED=true; PROMPT_BUDGET_<AGENT> sets one agent's (0 disables)
+DEFAULT_PROMPT_BUDGETS: Dict[str, int] = {
+    "dramaturge": 3000,
+    "character_creator": 3000,
+    "architect": 3500,
+    "dialogue": 3500,
+    "reviewer": 4000,
+}
+
+# Lines worth keeping in a digest: headings, bold or ALL-CAPS labels, list items, scene headings
+_STRUCTURAL_LINE = re.compile(
+    r"^\s*(#{1,6}\s|\*\*[^*]+\*\*|[-*•]\s|\d+[.)]\s|[A-Z][A-Z0-9 '()/&-]{2,}:|(INT|EXT)[./])"
+)
+_MAX_DIGEST_LINE = 200
+
+@dataclass
+class CompactionResult:
+    """What compaction did to one prompt."""
+    original_tokens: int
+    final_tokens: int
+    budget: int
+
+    @property
+    def saved_tokens(self) -> int:
+        """Prompt tokens removed."""
+        return self.original_tokens - self.final_tokens
+
+def prompt_budget(agent_name: str) -> int:
+    """Token budget for an agent's prompt (0 = unlimited)."""
+    override = os.getenv(f"PROMPT_BUDGET_{agent_name.upper()}")
+    if override is not None:
+        return int(override)
+    if os.getenv("PROMPT_BUDGET_ENABLED", "false").lower() != "true":
+        return 0
+    return DEFAULT_PROMPT_BUDGETS.get(agent_name, 0)
+
+def digest_section(text: str) -> str:
+    """Structural skeleton of one upstream output (falls back to its first lines)."""
+    lines = [line.rstrip() for line in text.strip().splitlines() if line.strip()]
+    kept = [line for line in lines if _STRUCTURAL_LINE.match(line)] or lines[:5]
+    return "\n".join(
+        line if len(line) <= _MAX_DIGEST_LINE else line[:_MAX_DIGEST_LINE].rstrip() + "…"
+        for line in kept
+    )
+
+def trim_to_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Leading whole lines of `text` that fit `max_tokens`."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    kept: List[str] = []
+    used = count_tokens(CONDENSED_NOTE, model)
+    for line in text.splitlines():
+        cost = count_tokens(line, model) + 1
+        if used + cost > max_tokens:
+            break
+        kept.append(line)
+        used += cost
+    return "\n".join(kept + [CONDENSED_NOTE])
+
+def _split_context(content: str) -> Tuple[str, str, str]:
+    """(before, context, after) for a prompt containing the context marker."""
+    start = content.index(CONTEXT_MARKER) + len(CONTEXT_MARKER)
+    ends = [content.find(terminator, start) for terminator in CONTEXT_TERMINATORS]
+    end = min((position for position in ends if position != -1), default=len(content))
+    return content[:start], content[start:end], content[end:]
+
+def compact_context(context: str, max_tokens: int, model: str) -> str:
+    """Fit crewai's joined context into `max_tokens` by condensing all but the latest section."""
+    sections = context.split(CONTEXT_DIVIDER)
+    if count_tokens(context, model) <= max_tokens:
+        return context
+
+    # 1. Older sections become digests; the latest is never cut
+    older = [digest_section(section) for section in sections[:-1]]
+    latest = sections[-1]
+    divider_tokens = count_tokens(CONTEXT_DIVIDER, model) * (len(sections) - 1)
+    latest_tokens = count_tokens(latest, model)
+    room = max_tokens - divider_tokens - latest_tokens
+    if room < 0:
+        logger.warning(
+            f"Latest context section alone ({latest_tokens} tokens) is over the "
+            f"{max_tokens}-token allowance; sending it whole"
+        )
+        return CONTEXT_DIVIDER.join(older + [latest])
+
+    # 2. Older digests share what the latest section leaves, split evenly between them
+    if older and sum(count_tokens(section, model) for section in older) > room:
+        share = room // len(older)
+        older = [trim_to_tokens(section, share, model) for section in older]
+    return CONTEXT_DIVIDER.join(older + [latest])
+
+def compact_messages(
+    messages: Union[str, List[Dict[str, Any]]],
+    agent_name: str,
+    model: str,
+) -> Tuple[Union[str, List[Dict[str, Any]]], CompactionResult]:
+    """Return `messages` with their task context compacted to the agent's budget."""
+    budget = prompt_budget(agent_name)
+    original = count_message_tokens(messages, model)
+    unchanged = CompactionResult(original_tokens=original, final_tokens=original, budget=budget)
+    if not budget or original <= budget or isinstance(messages, str):
+        return messages, unchanged
+
+    for index, message in enumerate(messages):
+        content = message.get("content")
+        if not isinstance(content, str) or CONTEXT_MARKER not in content:
+            continue
+
+        before, context, after = _split_context(content)
+        context_tokens = count_tokens(context, model)
+        # Never condense the context below a quarter of the budget, even when the
+        # rest of the prompt alone is over budget: the task cannot be done without it
+        allowance = max(budget // 4, context_tokens - (original - budget))
+        compacted = compact_context(context, allowance, model)
+        if compacted == context:
+            break
+
+        updated = list(messages)
+        updated[index] = {**message, "content": before + compacted + after}
+        final = count_message_tokens(updated, model)
+        logger.info(f"Compacted {agent_name} prompt from {original} to {final} tokens (budget {budget})")
+        return updated, CompactionResult(original_tokens=original, final_tokens=final, budget=budget)
+
+    return messages, unchanged
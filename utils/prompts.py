@@ -2,6 +2,7 @@
 Prompt templates for SceneSmith agents.
 """
 
+import textwrap
 from typing import Dict, Any
 
 DRAMATURGE_PROMPTS: Dict[str, str] = {
@@ -130,3 +131,13 @@ REVIEWER_PROMPTS: Dict[str, str] = {
     **CRITICAL:** Your commands must be specific and adhere to the original logline. Do not invent treehouses. Your job is to make the original idea *better*, not to change it.
     """
 }
+
+def with_instructions(backstory: str, instructions: str) -> str:
+    """
+    Backstory that carries an agent's standing instructions.
+
+    crewai 0.134 ignores Agent(system_message=...). With use_system_prompt=True it
+    sends role, backstory and goal as a separate system message that is identical
+    for every scene, which is the prefix Anthropic prompt caching marks.
+    """
+    return f"{backstory}\n\n{textwrap.dedent(instructions).strip()}"
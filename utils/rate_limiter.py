@@ -0,0 +1,150 @@
+"""
+Process-wide per-provider rate limiting for SceneSmith LLM calls.
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Defaults are deliberately conservative; set the env vars to your account tier.
+DEFAULT_LIMITS: Dict[str, Dict[str, int]] = {
+    "openai": {"rpm": 500, "tpm": 30000},
+    "anthropic": {"rpm": 50, "tpm": 40000},
+}
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float) -> None:
+        """Create a bucket that starts full."""
+        self.capacity = float(rate_per_minute)
+        self.refill_per_second = rate_per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last update."""
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated_at = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` tokens are available (0 if available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)  # oversize requests wait for a full bucket
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.refill_per_second
+
+    def consume(self, amount: float) -> None:
+        """Take tokens out of the bucket (may go negative after reconciliation)."""
+        self.tokens -= min(amount, self.capacity)
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the fact."""
+        self.tokens = min(self.capacity, self.tokens + delta)
+
+class ProviderRateLimiter:
+    """
+    Requests/minute and tokens/minute limiter shared by every LLM of one provider.
+
+    Callers are served strictly in arrival order, so a large request is never
+    starved by a stream of small ones.
+    """
+
+    def __init__(self, provider: str, requests_per_minute: int, tokens_per_minute: int) -> None:
+        """Create the limiter; a limit of 0 disables that dimension."""
+        self.provider = provider
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._condition = threading.Condition()
+        self._queue: Deque[object] = deque()
+        self._blocked_until = 0.0
+
+    def _wait_time(self, estimated_tokens: int, now: float) -> float:
+        """Seconds until the head of the queue may proceed."""
+        wait = max(0.0, self._blocked_until - now)
+        if self.requests:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens:
+            wait = max(wait, self.tokens.wait_time(estimated_tokens, now))
+        return wait
+
+    def acquire(self, estimated_tokens: int) -> float:
+        """Block until the call fits the quota; returns seconds spent queued."""
+        ticket = object()
+        started = time.monotonic()
+
+        with self._condition:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    if self._queue[0] is ticket:
+                        wait = self._wait_time(estimated_tokens, time.monotonic())
+                        if wait <= 0:
+                            break
+                        self._condition.wait(timeout=wait)
+                    else:
+                        self._condition.wait()
+
+                if self.requests:
+                    self.requests.consume(1)
+                if self.tokens:
+                    self.tokens.consume(estimated_tokens)
+            finally:
+                self._queue.remove(ticket)
+                self._condition.notify_all()
+
+        waited = time.monotonic() - started
+        if waited > 0.05:
+            logger.debug(f"{self.provider} rate limiter queued call for {waited:.2f}s")
+        return waited
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the provider reports real usage."""
+        if not self.tokens or actual_tokens <= 0:
+            return
+        with self._condition:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+            self._condition.notify_all()
+
+    def penalize(self, seconds: float) -> None:
+        """Hold every queued caller after the provider answered 429."""
+        with self._condition:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._condition.notify_all()
+        logger.warning(f"{self.provider} rate limited; pausing calls for {seconds:.1f}s")
+
+_limiters: Dict[str, ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+def get_rate_limiter(provider: str) -> ProviderRateLimiter:
+    """Return the process-wide limiter for a provider, configured from env vars."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            defaults = DEFAULT_LIMITS.get(provider, {"rpm": 0, "tpm": 0})
+            prefix = provider.upper()
+            limiter = ProviderRateLimiter(
+                provider,
+                requests_per_minute=int(os.getenv(f"{prefix}_RPM", str(defaults["rpm"]))),
+                tokens_per_minute=int(os.getenv(f"{prefix}_TPM", str(defaults["tpm"]))),
+            )
+            _limiters[provider] = limiter
+        return limiter
+
+def retry_after_seconds(error: Exception, default: Optional[float] = None) -> float:
+    """Best-effort Retry-After extraction from a provider 429 error."""
+    fallback = default if default is not None else float(os.getenv("RATE_LIMIT_COOLDOWN", "10"))
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", fallback))
+    except (TypeError, ValueError):
+        return fallback
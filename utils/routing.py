@@ -0,0 +1,255 @@
+"""
+Per-stage model routing with live latency/error statistics and provider failover.
+
+Each agent has an ordered list of routes ("provider/model"). Every call goes to
+the first route that is healthy and whose recent p95 latency for that agent is
+inside the agent's SLO; failed calls fall through to the next route.
+Structural stages try the cheapest route inside the SLO first. A route
+that fails ROUTING_FAILURE_THRESHOLD times in a row is skipped for
+ROUTING_COOLDOWN seconds (so does one whose recent error rate exceeds
+ROUTING_MAX_ERROR_RATE) and is then tried again.
+
+Streamed output of a call that may still fail over is held back and released
+only once the call succeeds, so listeners never see a failed route's partial
+text followed by the retry.
+"""
+
+import os
+import json
+import math
+import time
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple, Union
+from crewai import LLM
+from utils.cancellation import SceneCancelled
+from utils.metrics import model_price
+from utils.model_factory import SceneSmithLLM
+from utils.streaming import held_chunks, release_chunks
+
+logger = logging.getLogger(__name__)
+
+# Per-stage latency SLOs in seconds; override with ROUTING_SLO_<AGENT>
+DEFAULT_STAGE_SLOS: Dict[str, float] = {
+    "dramaturge": 20.0,
+    "character_creator": 30.0,
+    "architect": 20.0,
+    "dialogue": 30.0,
+    "reviewer": 60.0,
+}
+
+# Structural stages (short, schema-like output) go to the cheapest route that meets the SLO
+STRUCTURAL_STAGES = ("dramaturge", "architect")
+
+@dataclass(frozen=True)
+class Route:
+    """One provider/model an agent can be served by."""
+    provider: str  # openai | anthropic
+    model: str  # model name without the provider prefix
+
+    @property
+    def key(self) -> str:
+        """"provider/model", the form used in ROUTING_TABLE."""
+        return f"{self.provider}/{self.model}"
+
+    @property
+    def cost(self) -> float:
+        """Cost tier: USD for 1M input plus 1M output tokens (inf when the model is not priced)."""
+        price = model_price(self.model)
+        return sum(price) if price else math.inf
+
+    @classmethod
+    def parse(cls, spec: str) -> "Route":
+        """Parse "provider/model" (a bare model name is assumed to be OpenAI)."""
+        provider, _, model = spec.strip().partition("/")
+        if not model:
+            provider, model = "openai", provider
+        if provider not in ("openai", "anthropic"):
+            raise ValueError(f"Unknown provider in route '{spec}' (expected openai/ or anthropic/)")
+        return cls(provider=provider, model=model)
+
+def default_routing_table() -> Dict[str, List[str]]:
+    """
+    Today's provider split first, the other provider as failover. Structural
+    stages also get the fast tier, which plan() prefers because it is cheaper.
+    """
+    openai_model = f"openai/{os.getenv('OPENAI_MODEL', 'gpt-4o')}"
+    openai_fast = f"openai/{os.getenv('OPENAI_FAST_MODEL', 'gpt-4o-mini')}"
+    claude_model = f"anthropic/{os.getenv('ANTHROPIC_MODEL', 'claude-3-5-sonnet-20241022')}"
+    table = {stage: [openai_model, openai_fast, claude_model] for stage in STRUCTURAL_STAGES}
+    table.update({stage: [claude_model, openai_model] for stage in ("character_creator", "dialogue", "reviewer")})
+    return table
+
+def routing_table() -> Dict[str, List[Route]]:
+    """
+    Routes per agent: the default table with ROUTING_TABLE applied on top
+    (inline JSON or a path to a JSON file of {"agent": ["provider/model", ...]}).
+    """
+    table = default_routing_table()
+    override = os.getenv("ROUTING_TABLE", "").strip()
+    if override:
+        try:
+            if not override.startswith("{"):
+                with open(override, "r", encoding="utf-8") as handle:
+                    override = handle.read()
+            table.update({agent: list(routes) for agent, routes in json.loads(override).items()})
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring invalid ROUTING_TABLE: {e}")
+    return {agent: [Route.parse(spec) for spec in specs] for agent, specs in table.items() if specs}
+
+def routing_enabled(agent_name: str) -> bool:
+    """True when ROUTING_ENABLED is set and the agent has routes."""
+    return os.getenv("ROUTING_ENABLED", "false").lower() == "true" and agent_name in routing_table()
+
+def stage_slo(agent_name: str) -> float:
+    """Latency SLO in seconds for one call of `agent_name` (0 = none)."""
+    return float(os.getenv(f"ROUTING_SLO_{agent_name.upper()}", str(DEFAULT_STAGE_SLOS.get(agent_name, 0.0))))
+
+@dataclass
+class RouteStats:
+    """Recent outcomes of one route."""
+    # agent -> (monotonic time, seconds) of recent successful calls
+    latencies: Dict[str, Deque[Tuple[float, float]]] = field(default_factory=dict)
+    outcomes: Deque[bool] = field(default_factory=deque)  # recent calls, True = error
+    consecutive_failures: int = 0
+    open_until: float = 0.0  # circuit breaker: skip the route until this monotonic time
+
+class Router:
+    """Chooses routes from live per-route statistics (process-wide, thread-safe)."""
+
+    def __init__(self) -> None:
+        """Read window and breaker settings."""
+        self.window = int(os.getenv("ROUTING_WINDOW", "50"))
+        self.min_samples = int(os.getenv("ROUTING_MIN_SAMPLES", "5"))
+        self.failure_threshold = int(os.getenv("ROUTING_FAILURE_THRESHOLD", "3"))
+        self.cooldown = float(os.getenv("ROUTING_COOLDOWN", "30"))
+        self.max_error_rate = float(os.getenv("ROUTING_MAX_ERROR_RATE", "0.5"))
+        # Latency samples expire, so a route demoted for being slow is measured again later
+        self.sample_ttl = float(os.getenv("ROUTING_SAMPLE_TTL", "300"))
+        self._stats: Dict[str, RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def _route_stats(self, route: Route) -> RouteStats:
+        """Stats for `route` (lock held)."""
+        stats = self._stats.get(route.key)
+        if stats is None:
+            stats = self._stats[route.key] = RouteStats(outcomes=deque(maxlen=self.window))
+        return stats
+
+    def record(self, route: Route, agent_name: str, latency: float, error: bool) -> None:
+        """Add one call outcome; trip the breaker on a failure streak or a high error rate."""
+        with self._lock:
+            stats = self._route_stats(route)
+            stats.outcomes.append(error)
+            if not error:
+                stats.consecutive_failures = 0
+                stats.latencies.setdefault(agent_name, deque(maxlen=self.window)).append((time.monotonic(), latency))
+                return
+            stats.consecutive_failures += 1
+            error_rate = sum(stats.outcomes) / len(stats.outcomes)
+            if stats.consecutive_failures >= self.failure_threshold or (
+                len(stats.outcomes) >= self.min_samples and error_rate > self.max_error_rate
+            ):
+                stats.open_until = time.monotonic() + self.cooldown
+                logger.warning(f"Route {route.key} degraded; skipping it for {self.cooldown:.0f}s")
+
+    def p95(self, route: Route, agent_name: str) -> Optional[float]:
+        """p95 latency of recent successful calls, or None with too few samples."""
+        cutoff = time.monotonic() - self.sample_ttl
+        with self._lock:
+            recent = self._route_stats(route).latencies.get(agent_name, ())
+            samples = sorted(latency for recorded, latency in recent if recorded >= cutoff)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+
+    def healthy(self, route: Route) -> bool:
+        """False while the route's breaker is open; after the cooldown it gets trial calls again."""
+        with self._lock:
+            return self._route_stats(route).open_until <= time.monotonic()
+
+    def plan(self, agent_name: str, routes: List[Route]) -> List[Route]:
+        """
+        Routes in the order to try them: healthy routes inside the SLO (table
+        order, or cheapest first for structural stages), then healthy routes
+        over it (fastest first), then degraded routes as a last resort.
+        """
+        slo = stage_slo(agent_name)
+        healthy = [route for route in routes if self.healthy(route)]
+        # Routes with too few samples count as instant, so they stay inside the SLO and get sampled
+        latency: Dict[str, float] = {}
+        for route in healthy:
+            p95 = self.p95(route, agent_name)
+            latency[route.key] = 0.0 if p95 is None else p95
+        within = [route for route in healthy if not slo or latency[route.key] <= slo]
+        if agent_name in STRUCTURAL_STAGES:
+            within.sort(key=lambda route: route.cost)  # stable, so equal tiers keep table order
+        over = sorted((route for route in healthy if route not in within), key=lambda route: latency[route.key])
+        degraded = [route for route in routes if route not in healthy]
+        return within + over + degraded
+
+_router: Optional[Router] = None
+_router_lock = threading.Lock()
+
+def get_router() -> Router:
+    """Process-wide Router."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = Router()
+        return _router
+
+class RoutedLLM(SceneSmithLLM):
+    """
+    Agent-facing LLM that serves each call from one of several delegate LLMs.
+
+    crewai sees the primary route's model; each delegate is an ordinary pooled
+    SceneSmithLLM, so caching, prompt budgets, the provider's rate limiter and
+    metrics all apply per route.
+    """
+
+    def __init__(self, agent_name: str, routes: List[Route], delegates: Dict[str, LLM], **kwargs: Any) -> None:
+        """Wrap `delegates` (keyed by Route.key) for `agent_name`."""
+        primary = delegates[routes[0].key]
+        super().__init__(provider=routes[0].provider, agent_name=agent_name, model=primary.model, **kwargs)
+        self.routes = routes
+        self.delegates = delegates
+        self.router = get_router()
+
+    def call(
+        self,
+        messages: Union[str, List[Dict[str, str]]],
+        tools: Optional[List[dict]] = None,
+        callbacks: Optional[List[Any]] = None,
+        available_functions: Optional[Dict[str, Any]] = None,
+    ) -> Union[str, Any]:
+        """Try routes in plan order, failing over on any provider error (but not on cancellation)."""
+        last_error: Optional[Exception] = None
+        plan = self.router.plan(self.agent_name, self.routes)
+        for attempt, route in enumerate(plan):
+            delegate = self.delegates[route.key]
+            # crewai adds its stop words to the agent's LLM; the delegate must honour them too
+            delegate.stop = sorted(set(delegate.stop or []) | set(self.stop or []))
+            started = time.perf_counter()
+            try:
+                if attempt == len(plan) - 1:
+                    # Nothing left to fail over to, so stream live
+                    response = delegate.call(messages, tools, callbacks, available_functions)
+                else:
+                    with held_chunks() as held:
+                        response = delegate.call(messages, tools, callbacks, available_functions)
+                    release_chunks(held)
+            except SceneCancelled:
+                raise  # the scene is out of time; another route will not help
+            except Exception as e:
+                self.router.record(route, self.agent_name, time.perf_counter() - started, error=True)
+                logger.warning(f"{self.agent_name} call on {route.key} failed ({type(e).__name__}: {e}); failing over")
+                last_error = e
+                continue
+            self.router.record(route, self.agent_name, time.perf_counter() - started, error=False)
+            if route != self.routes[0]:
+                logger.info(f"{self.agent_name} served by {route.key}")
+            return response
+        raise last_error if last_error else RuntimeError(f"No routes configured for {self.agent_name}")
@@ -0,0 +1,121 @@
+"""
+Fast local ranking of candidate screenplay text: page length, format validity
+and repeated-phrase / cliché density. No model calls; scoring N candidates
+takes milliseconds.
+"""
+
+import os
+import re
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+from utils.screenplay import final_answer, max_pages, validate_screenplay
+
+logger = logging.getLogger(__name__)
+
+# Target page range per agent; override with SCORE_PAGES_<AGENT>="min-max". The
+# reviewer writes the final scene, so its range follows SCREENPLAY_MAX_PAGES instead
+DEFAULT_TARGET_PAGES: Dict[str, Tuple[float, float]] = {
+    "dialogue": (1.0, 4.0),
+}
+
+# Pages below SCREENPLAY_MAX_PAGES the final scene may run (a 3-page limit targets 2-3)
+FINAL_SCENE_PAGE_SPAN = 1.0
+
+# Weights of (format, length, freshness) in the total score
+SCORE_WEIGHTS = (0.4, 0.3, 0.3)
+
+CLICHES = (
+    "little did",
+    "time stood still",
+    "heart pounding",
+    "tears streaming",
+    "a breath she didn't know",
+    "a breath he didn't know",
+    "let out a breath",
+    "we need to talk",
+    "it's not what it looks like",
+    "you don't understand",
+    "i have a bad feeling",
+    "are you okay",
+    "it's complicated",
+    "testament to",
+    "tapestry",
+    "palpable",
+    "delve",
+    "in that moment",
+    "something shifts",
+    "the weight of",
+    "a flicker of",
+    "eyes that held",
+)
+
+@dataclass
+class CandidateScore:
+    """Score of one candidate; every component is in [0, 1], higher is better."""
+    index: int
+    text: str
+    pages: float
+    format_score: float
+    length_score: float
+    freshness_score: float
+    total: float
+
+def target_pages(agent_name: str) -> Tuple[float, float]:
+    """(min, max) pages expected from an agent; the final scene must pass the validator's page limit."""
+    override = os.getenv(f"SCORE_PAGES_{agent_name.upper()}")
+    if override:
+        try:
+            low, high = (float(part) for part in override.split("-", 1))
+            return low, high
+        except ValueError:
+            logger.warning(f"Ignoring invalid SCORE_PAGES_{agent_name.upper()}={override!r}")
+    limit = max_pages()
+    if agent_name == "reviewer" and limit > 0:  # SCREENPLAY_MAX_PAGES=0 disables the limit
+        return max(0.5, limit - FINAL_SCENE_PAGE_SPAN), limit
+    return DEFAULT_TARGET_PAGES.get(agent_name, (0.5, 5.0))
+
+def length_score(pages: float, target: Tuple[float, float]) -> float:
+    """1 inside the target range, falling off linearly with the relative distance outside it."""
+    low, high = target
+    if low <= pages <= high:
+        return 1.0
+    distance = (low - pages) / low if pages < low else (pages - high) / high
+    return max(0.0, 1.0 - distance)
+
+def freshness_score(text: str) -> float:
+    """1 minus the density of repeated word trigrams and clichés."""
+    words = re.findall(r"[a-z']+", text.lower())
+    if len(words) < 3:
+        return 0.0
+    trigrams = Counter(zip(words, words[1:], words[2:]))
+    repeated = sum(count - 1 for count in trigrams.values() if count > 1) / max(1, len(words) - 2)
+
+    lowered = " ".join(words)
+    cliches = sum(lowered.count(cliche) for cliche in CLICHES)
+    cliche_density = cliches * 100 / len(words)  # per 100 words; 2+ is very heavy
+    return max(0.0, 1.0 - 2 * repeated - cliche_density / 2)
+
+def score_candidate(text: str, agent_name: str, index: int = 0) -> CandidateScore:
+    """Score one response of `agent_name`."""
+    body = final_answer(text)
+    # Length is scored against the target range below, not as a format rule
+    report = validate_screenplay(body, page_limit=0, full_scene=agent_name == "reviewer")
+    length = length_score(report.pages, target_pages(agent_name))
+    fresh = freshness_score(body)
+    format_weight, length_weight, fresh_weight = SCORE_WEIGHTS
+    return CandidateScore(
+        index=index,
+        text=text,
+        pages=report.pages,
+        format_score=report.format_score,
+        length_score=length,
+        freshness_score=fresh,
+        total=format_weight * report.format_score + length_weight * length + fresh_weight * fresh,
+    )
+
+def rank_candidates(texts: List[str], agent_name: str) -> List[CandidateScore]:
+    """Scores best first; ties keep the original order."""
+    scores = [score_candidate(text, agent_name, index) for index, text in enumerate(texts)]
+    return sorted(scores, key=lambda score: -score.total)
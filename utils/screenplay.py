@@ -0,0 +1,208 @@
+"""
+Deterministic screenplay parsing, page counting and format validation.
+
+Turns screenplay text into typed elements and checks the format rules the
+reviewer used to be asked to verify itself. Page counts follow standard layout
+(12pt Courier, 55 lines a page, per-element column widths), so they match a
+screenwriting app to within a fraction of a page.
+"""
+
+import os
+import re
+import logging
+from dataclasses import dataclass, field
+from typing import List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+LINES_PER_PAGE = 55
+# Characters per printed line for each element type in standard layout
+COLUMN_WIDTHS = {
+    "heading": 61,
+    "action": 61,
+    "transition": 61,
+    "character": 38,
+    "parenthetical": 19,
+    "dialogue": 35,
+}
+
+HEADING = "heading"
+ACTION = "action"
+CHARACTER = "character"
+PARENTHETICAL = "parenthetical"
+DIALOGUE = "dialogue"
+TRANSITION = "transition"
+
+_FINAL_ANSWER = "Final Answer:"
+_SCENE_HEADING = re.compile(r"^(INT|EXT|INT\./EXT|EXT\./INT|I/E)[./]\s*\S")
+_WELL_FORMED_HEADING = re.compile(r"^(INT|EXT|INT\./EXT|EXT\./INT|I/E)\.\s+\S.*\s[-–—]\s+\S")
+_TRANSITION = re.compile(r"^(FADE (IN|OUT|TO BLACK)[:.]?|[A-Z ]+TO:)$")
+_CHARACTER_CUE = re.compile(r"^[A-Z][A-Z0-9 .'-]{0,30}(\s*\([A-Z.' ]+\))?$")
+_MIXED_CASE_CUE = re.compile(r"^[A-Z][a-z]+( [A-Z][a-z]+)?(\s*\([^)]*\))?:?$")
+_INLINE_DIALOGUE = re.compile(r"^[A-Z][A-Za-z .']{1,30}:\s+\S")
+_PARENTHETICAL = re.compile(r"^\(.*\)$")
+_MARKDOWN = re.compile(r"^(\*\*.*\*\*|#{1,6}\s|[-*•]\s)|\*\*")
+
+@dataclass
+class Element:
+    """One screenplay element."""
+    kind: str  # heading | action | character | parenthetical | dialogue | transition
+    text: str
+    line: int  # 1-based source line
+
+@dataclass
+class FormatIssue:
+    """One format rule the screenplay breaks."""
+    code: str
+    message: str
+    line: Optional[int] = None
+
+@dataclass
+class ScreenplayReport:
+    """Parsed elements, page count and format issues of one screenplay."""
+    elements: List[Element]
+    pages: float
+    issues: List[FormatIssue] = field(default_factory=list)
+    checks: Set[str] = field(default_factory=set)  # rule codes that were evaluated
+
+    @property
+    def valid(self) -> bool:
+        """True when no rule is broken."""
+        return not self.issues
+
+    @property
+    def format_score(self) -> float:
+        """Share of evaluated rules the screenplay satisfies (0-1)."""
+        if not self.checks:
+            return 1.0
+        broken = {issue.code for issue in self.issues} & self.checks
+        return 1.0 - len(broken) / len(self.checks)
+
+def final_answer(text: str) -> str:
+    """The part of a crewai response after "Final Answer:" (the whole text if absent)."""
+    position = text.rfind(_FINAL_ANSWER)
+    return text[position + len(_FINAL_ANSWER):].strip() if position != -1 else text.strip()
+
+def _is_cue(line: str) -> bool:
+    """True for an ALL-CAPS character cue (not a scene heading or transition)."""
+    return (
+        bool(_CHARACTER_CUE.match(line))
+        and not _SCENE_HEADING.match(line)
+        and not _TRANSITION.match(line)
+    )
+
+def parse_screenplay(text: str) -> List[Element]:
+    """
+    Classify every non-blank line. A cue opens a dialogue block that runs until
+    the next blank line; parentheticals and dialogue lines belong to that block.
+    """
+    elements: List[Element] = []
+    in_dialogue = False
+    lines = text.splitlines()
+    for number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line:
+            in_dialogue = False
+            continue
+        if in_dialogue:
+            kind = PARENTHETICAL if _PARENTHETICAL.match(line) else DIALOGUE
+        elif _TRANSITION.match(line):
+            kind = TRANSITION
+        elif _SCENE_HEADING.match(line):
+            kind = HEADING
+        elif _is_cue(line) and number < len(lines) and lines[number].strip():
+            kind = CHARACTER
+            in_dialogue = True
+        else:
+            kind = ACTION
+        elements.append(Element(kind=kind, text=line, line=number))
+    return elements
+
+def count_pages(elements: List[Element]) -> float:
+    """Printed pages: wrapped lines per element plus the blank line standard layout puts between blocks."""
+    lines = 0
+    previous: Optional[str] = None
+    for element in elements:
+        width = COLUMN_WIDTHS[element.kind]
+        lines += max(1, -(-len(element.text) // width))
+        # Blank line before every block except within a cue/parenthetical/dialogue run
+        if previous is not None and element.kind not in (PARENTHETICAL, DIALOGUE):
+            lines += 1
+        if element.kind == HEADING and previous is not None:
+            lines += 1  # headings get an extra blank line above
+        previous = element.kind
+    return lines / LINES_PER_PAGE
+
+def max_pages() -> float:
+    """Page limit for the final screenplay (SCREENPLAY_MAX_PAGES)."""
+    return float(os.getenv("SCREENPLAY_MAX_PAGES", "3"))
+
+def validate_screenplay(
+    text: str,
+    page_limit: Optional[float] = None,
+    full_scene: bool = True,
+) -> ScreenplayReport:
+    """
+    Parse `text` and check it. A full scene must open with FADE IN:, close with
+    FADE OUT., have a well-formed scene heading and stay within `page_limit`;
+    every screenplay must use ALL-CAPS cues followed by dialogue and no markdown.
+    """
+    text = final_answer(text)
+    elements = parse_screenplay(text)
+    report = ScreenplayReport(elements=elements, pages=count_pages(elements))
+    issues = report.issues
+    report.checks.update({"character_case", "cue_without_dialogue", "markdown"})
+    for index, element in enumerate(elements):
+        following = elements[index + 1] if index + 1 < len(elements) else None
+        adjacent = following is not None and following.line == element.line + 1
+        if element.kind == ACTION and _INLINE_DIALOGUE.match(element.text):
+            issues.append(FormatIssue(
+                "character_case", f"Inline dialogue '{element.text[:40]}'; put the ALL-CAPS name on its own line",
+                element.line,
+            ))
+        elif element.kind == ACTION and adjacent and _MIXED_CASE_CUE.match(element.text):
+            issues.append(FormatIssue(
+                "character_case", f"Character cue '{element.text}' must be ALL CAPS", element.line
+            ))
+        if element.kind == CHARACTER and (following is None or following.kind not in (DIALOGUE, PARENTHETICAL)):
+            issues.append(FormatIssue("cue_without_dialogue", f"Cue {element.text} has no dialogue", element.line))
+        if _MARKDOWN.search(element.text):
+            issues.append(FormatIssue("markdown", f"Markdown formatting in '{element.text[:40]}'", element.line))
+
+    if full_scene:
+        report.checks.update({"fade_in", "fade_out", "scene_heading"})
+        if not elements or elements[0].text.rstrip(":").upper() != "FADE IN":
+            issues.append(FormatIssue("fade_in", "Scene must open with FADE IN:", 1))
+        if not elements or elements[-1].text.rstrip(".").upper() != "FADE OUT":
+            issues.append(FormatIssue("fade_out", "Scene must close with FADE OUT."))
+
+        headings = [element for element in elements if element.kind == HEADING]
+        if not headings:
+            issues.append(FormatIssue("scene_heading", "Missing scene heading (INT./EXT. LOCATION - TIME)"))
+        for heading in headings:
+            if not _WELL_FORMED_HEADING.match(heading.text):
+                issues.append(FormatIssue(
+                    "scene_heading", f"Heading '{heading.text}' should read INT./EXT. LOCATION - TIME",
+                    heading.line,
+                ))
+
+        limit = max_pages() if page_limit is None else page_limit
+        if limit:
+            report.checks.add("length")
+            if report.pages > limit:
+                issues.append(FormatIssue("length", f"{report.pages:.1f} pages; the limit is {limit:g}"))
+    return report
+
+def repair_prompt(text: str, report: ScreenplayReport) -> str:
+    """Instructions for fixing exactly the issues `report` found, nothing else."""
+    problems = "\n".join(
+        f"- {issue.message}" + (f" (line {issue.line})" if issue.line else "") for issue in report.issues
+    )
+    return (
+        "The screenplay below breaks these formatting rules:\n"
+        f"{problems}\n\n"
+        "Fix only these problems. Keep every beat, action and line of dialogue otherwise unchanged; "
+        "if it is too long, tighten action lines and cut redundant exchanges rather than whole beats. "
+        "Return only the corrected screenplay, from FADE IN: to FADE OUT.\n\n"
+        f"SCREENPLAY:\n{final_answer(text)}"
+    )
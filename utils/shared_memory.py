@@ -0,0 +1,273 @@
+"""
+Multi-process SceneMemory: immutable snapshots plus a shared append log.
+
+Layout under MEMORY_PERSIST_DIR:
+    CURRENT                  {"snapshot": id, "log": "log-<id>.jsonl"}, replaced atomically
+    LOCK                     flock()ed by writers (appends, compaction, clear, rebuild)
+    snapshots/<id>/          FAISS index + docstore, never modified after creation
+    log-<id>.jsonl           scenes stored since snapshot <id>, one JSON line each
+
+Readers never lock: they load the snapshot CURRENT names and tail its log. Every
+process replays the same snapshot and log in the same order, so FAISS positions
+(and the metadata side index) agree across processes.
+"""
+
+import os
+import json
+import time
+import uuid
+import base64
+import shutil
+import logging
+from contextlib import contextmanager
+from types import ModuleType
+from typing import IO, Any, Dict, Iterator, List, Optional
+import numpy as np
+from utils.memory import SceneMemory
+
+fcntl: Optional[ModuleType]
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Generations kept on disk: the current one plus the previous one for readers mid-switch
+KEEP_GENERATIONS = 2
+
+class SharedSceneMemory(SceneMemory):
+    """SceneMemory that many worker processes can read and write at the same time."""
+
+    def __init__(self, persist_directory: Optional[str] = None) -> None:
+        """Open (or create) the shared store."""
+        if fcntl is None:
+            raise RuntimeError("MEMORY_SHARED requires POSIX file locking (fcntl)")
+        self.refresh_interval = float(os.getenv("MEMORY_REFRESH_INTERVAL", "1.0"))
+        self._pointer: Optional[Dict[str, str]] = None
+        self._log_offset = 0
+        self._last_refresh = 0.0
+        self._lock_depth = 0
+        self._lock_handle: Optional[IO[str]] = None
+        # Snapshots must accept appended log entries, so they are always loaded into RAM
+        super().__init__(persist_directory, mmap=False)
+
+    # ----- paths and locking -----
+
+    def _path(self, *parts: str) -> str:
+        """Path inside the store."""
+        return os.path.join(self.persist_directory, *parts)
+
+    @contextmanager
+    def _writer_lock(self) -> Iterator[None]:
+        """Exclusive cross-process writer lock (re-entrant within this instance)."""
+        assert fcntl is not None  # checked in __init__
+        with self._lock:
+            if self._lock_depth == 0:
+                os.makedirs(self.persist_directory, exist_ok=True)
+                self._lock_handle = open(self._path("LOCK"), "a")
+                fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_handle is not None:
+                    fcntl.flock(self._lock_handle.fileno(), fcntl.LOCK_UN)
+                    self._lock_handle.close()
+                    self._lock_handle = None
+
+    def _read_pointer(self) -> Optional[Dict[str, str]]:
+        """The generation CURRENT points at, or None for a new store."""
+        try:
+            with open(self._path("CURRENT"), "r", encoding="utf-8") as handle:
+                pointer: Dict[str, str] = json.load(handle)
+                return pointer
+        except FileNotFoundError:
+            return None
+
+    # ----- snapshots -----
+
+    def _initialize_vectorstore(self) -> None:
+        """Create the first generation if needed (migrating a legacy index), then load it."""
+        from langchain_community.vectorstores import FAISS
+        from langchain.schema import Document
+
+        with self._writer_lock():
+            if self._read_pointer() is None:
+                if os.path.exists(self._path("index.faiss")):
+                    self.vectorstore = FAISS.load_local(
+                        self.persist_directory, self.embeddings, allow_dangerous_deserialization=True
+                    )
+                    logger.info(f"Migrating {self.persist_directory} to the shared snapshot layout")
+                else:
+                    dummy_doc = Document(page_content="SceneSmith memory initialized", metadata={"type": "system"})
+                    self.vectorstore = FAISS.from_documents([dummy_doc], self.embeddings)
+                self._write_snapshot()
+                # _write_snapshot marks this generation as loaded, so the refresh below
+                # will not index it; do that here for the vectors we already hold
+                self._configure_index(self.vectorstore.index)
+                self._rebuild_metadata_index()
+            self._refresh(force=True)
+
+    def _write_snapshot(self) -> None:
+        """Save the in-memory index as a new generation and point CURRENT at it (writer lock held)."""
+        generation = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:6]}"
+        staging = self._path("snapshots", f".tmp-{generation}")
+        assert self.vectorstore is not None
+        self.vectorstore.save_local(staging)
+        os.rename(staging, self._path("snapshots", generation))
+
+        pointer = {"snapshot": generation, "log": f"log-{generation}.jsonl"}
+        open(self._path(pointer["log"]), "a").close()
+        temp_path = self._path(f"CURRENT.tmp-{os.getpid()}")
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(pointer, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temp_path, self._path("CURRENT"))
+
+        # This process already holds everything the new generation contains
+        self._pointer, self._log_offset, self._unsaved = pointer, 0, 0
+        self._collect_garbage()
+        logger.info(f"Wrote memory snapshot {generation}")
+
+    def _collect_garbage(self) -> None:
+        """Delete generations older than the last KEEP_GENERATIONS."""
+        generations = sorted(name for name in os.listdir(self._path("snapshots")) if not name.startswith("."))
+        for generation in generations[:-KEEP_GENERATIONS]:
+            shutil.rmtree(self._path("snapshots", generation), ignore_errors=True)
+            try:
+                os.remove(self._path(f"log-{generation}.jsonl"))
+            except FileNotFoundError:
+                pass
+
+    # ----- reading -----
+
+    def _before_read(self) -> None:
+        """Pick up other processes' writes before searching."""
+        self._refresh()
+
+    def _refresh(self, force: bool = False) -> None:
+        """Load a newer snapshot if CURRENT moved, then replay new log entries."""
+        from langchain_community.vectorstores import FAISS
+
+        if not force and time.monotonic() - self._last_refresh < self.refresh_interval:
+            return
+        with self._lock:
+            self._last_refresh = time.monotonic()
+            pointer = self._read_pointer()
+            if pointer is None:
+                return
+            try:
+                if pointer != self._pointer:
+                    self.vectorstore = FAISS.load_local(
+                        self._path("snapshots", pointer["snapshot"]),
+                        self.embeddings,
+                        allow_dangerous_deserialization=True,
+                    )
+                    self._configure_index(self.vectorstore.index)
+                    self._rebuild_metadata_index()
+                    self._pointer, self._log_offset, self._unsaved = pointer, 0, 0
+                    logger.info(f"Loaded memory snapshot {pointer['snapshot']}")
+                self._replay_log()
+            except OSError as e:
+                # A compaction can retire a generation while we read it; retry on the next refresh
+                logger.warning(f"Could not refresh shared memory: {e}")
+                self._last_refresh = 0.0
+
+    def _replay_log(self) -> None:
+        """Add complete log lines written since the last replay (lock held)."""
+        assert self._pointer is not None
+        with open(self._path(self._pointer["log"]), "rb") as handle:
+            handle.seek(self._log_offset)
+            data = handle.read()
+        end = data.rfind(b"\n") + 1  # a writer may be mid-line; leave the partial tail
+        if not end:
+            return
+
+        entries = [json.loads(line) for line in data[:end].splitlines() if line.strip()]
+        if entries:
+            vectors = [np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32).tolist() for entry in entries]
+            self._add_to_index(
+                [entry["text"] for entry in entries],
+                vectors,
+                [entry["metadata"] for entry in entries],
+            )
+            self._unsaved += len(entries)
+        self._log_offset += end
+
+    # ----- writing -----
+
+    def store_scenes(self, scenes: List[Any]) -> int:
+        """Embed outside the lock, then append one batch to the shared log."""
+        if not self.enabled or not self.vectorstore or not scenes:
+            return 0
+
+        try:
+            documents = [self._scene_document(scene) for scene in scenes]
+            texts = [doc.page_content for doc in documents]
+            vectors = self.embeddings.embed_documents(texts)
+            payload = "".join(
+                json.dumps({
+                    "text": text,
+                    "metadata": doc.metadata,
+                    "vector": base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii"),
+                }) + "\n"
+                for text, vector, doc in zip(texts, vectors, documents)
+            )
+
+            with self._writer_lock():
+                pointer = self._read_pointer()
+                assert pointer is not None  # written when the store was opened
+                with open(self._path(pointer["log"]), "a", encoding="utf-8") as handle:
+                    handle.write(payload)
+                    handle.flush()
+                    os.fsync(handle.fileno())
+                # Our entries (and anyone else's) enter the index through the same replay path
+                self._refresh(force=True)
+                if self._unsaved >= self.flush_every:
+                    self.compact()
+
+            logger.info(f"Appended {len(documents)} scenes to shared memory log")
+            return len(documents)
+
+        except Exception as e:
+            logger.warning(f"Could not store scenes in shared memory: {e}")
+            return 0
+
+    def compact(self) -> None:
+        """Fold the log into a new snapshot so new readers load one file instead of replaying."""
+        with self._writer_lock():
+            self._refresh(force=True)
+            self._write_snapshot()
+
+    def flush(self) -> None:
+        """Log appends are already durable; compact once the log reaches MEMORY_FLUSH_EVERY entries."""
+        if self.enabled and self.vectorstore and self._unsaved >= self.flush_every:
+            self.compact()
+
+    def rebuild_index(self, index_type: Optional[str] = None) -> str:
+        """Rebuild the index under the writer lock and publish it as a new generation."""
+        with self._writer_lock():
+            self._refresh(force=True)
+            description = super().rebuild_index(index_type)
+            self._write_snapshot()
+        return description
+
+    def clear_memory(self) -> None:
+        """Publish an empty generation; readers switch to it on their next refresh."""
+        from langchain_community.vectorstores import FAISS
+        from langchain.schema import Document
+
+        if not self.enabled:
+            return
+        try:
+            with self._writer_lock():
+                dummy_doc = Document(page_content="SceneSmith memory initialized", metadata={"type": "system"})
+                self.vectorstore = FAISS.from_documents([dummy_doc], self.embeddings)
+                self._rebuild_metadata_index()
+                self._write_snapshot()
+            logger.info("Memory cleared successfully")
+        except Exception as e:
+            logger.error(f"Could not clear memory: {e}")
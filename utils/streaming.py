@@ -0,0 +1,61 @@
+"""
+Routing of streamed LLM tokens to per-scene listeners.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+from crewai.utilities.events import LLMStreamChunkEvent, crewai_event_bus
+
+logger = logging.getLogger(__name__)
+
+# (agent_name, chunk) -> None; set per scene so concurrent scenes never see each other's tokens
+ChunkSink = Callable[[str, str], None]
+_chunk_sink: ContextVar[Optional[ChunkSink]] = ContextVar("scene_smith_chunk_sink", default=None)
+
+@contextmanager
+def stream_to(sink: Optional[ChunkSink]) -> Iterator[None]:
+    """Send every chunk produced in this context (and its copies) to `sink`."""
+    token = _chunk_sink.set(sink)
+    try:
+        yield
+    finally:
+        _chunk_sink.reset(token)
+
+@contextmanager
+def held_chunks() -> Iterator[List[Tuple[str, str]]]:
+    """
+    Collect this context's chunks instead of delivering them. The caller
+    releases them once the output is known to be good, or drops them.
+    """
+    held: List[Tuple[str, str]] = []
+    sink = _chunk_sink.get()
+    with stream_to((lambda agent_name, chunk: held.append((agent_name, chunk))) if sink else None):
+        yield held
+
+def has_listener() -> bool:
+    """True when chunks produced in this context are delivered somewhere."""
+    return _chunk_sink.get() is not None
+
+def release_chunks(held: List[Tuple[str, str]]) -> None:
+    """Deliver chunks collected by held_chunks() to the active sink."""
+    for agent_name, chunk in held:
+        emit_chunk(agent_name, chunk)
+
+def emit_chunk(agent_name: str, chunk: str) -> None:
+    """Deliver one chunk to the active sink, if any."""
+    sink = _chunk_sink.get()
+    if sink is None or not chunk:
+        return
+    try:
+        sink(agent_name, chunk)
+    except Exception as e:
+        logger.warning(f"Stream listener failed: {e}")
+
+@crewai_event_bus.on(LLMStreamChunkEvent)
+def _forward_stream_chunk(source: Any, event: LLMStreamChunkEvent) -> None:
+    """crewai emits chunks synchronously on the calling thread, so the context var is live."""
+    agent_name = getattr(source, "agent_name", None)
+    if agent_name is not None:
+        emit_chunk(agent_name, event.chunk)
@@ -0,0 +1,54 @@
+"""
+Token counting helpers (tiktoken when available, character estimate otherwise).
+"""
+
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=8)
+def _encoding(model: str) -> Optional[Any]:
+    """tiktoken encoding for `model`, or None when tiktoken cannot provide one."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+
+    name = model.split("/")[-1]
+    try:
+        return tiktoken.encoding_for_model(name)
+    except KeyError:
+        pass  # non-OpenAI models (Claude) are approximated with a GPT-4 encoding
+    except Exception as e:
+        logger.debug(f"tiktoken lookup failed for {name}: {e}")
+        return None
+
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # Encodings are downloaded on first use; offline machines fall back to estimates
+        logger.debug(f"tiktoken encoding unavailable: {e}")
+        return None
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Number of tokens in `text` for `model` (approximate for non-OpenAI models)."""
+    if not text:
+        return 0
+    encoding = _encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+def count_message_tokens(messages: Union[str, List[Dict[str, Any]]], model: str = "gpt-4o") -> int:
+    """Tokens in a chat prompt, including a small per-message overhead."""
+    if isinstance(messages, str):
+        return count_tokens(messages, model)
+    total = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):  # list-style content blocks
+            content = "".join(str(block.get("text", "")) for block in content if isinstance(block, dict))
+        total += count_tokens(str(content), model) + 4
+    return total